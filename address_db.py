@@ -0,0 +1,527 @@
+"""
+Indexed Address Database
+
+This module exports the collected `iller/*.json` files into a single SQLite
+database: il, ilçe, mahalle and sokak tables with their AFAD ids, the
+gathering areas and the neighborhoods they were found in, an R*Tree over
+area coordinates and FTS5 indexes over unidecode-normalized names.
+
+Names are searched without regard to case and Turkish diacritics, so
+"ataturk antakya" finds "ATATÜRK" streets of ANTAKYA. A query is matched as
+a prefix of whole names first, then word by word against names and their
+parents' names; misspelled words are corrected against the vocabulary of
+all name words, which is small enough to keep a trigram index of in memory.
+"""
+
+import argparse
+import difflib
+import glob
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from city_format import name_key
+from city_stream import CityStreamReader
+from spatial_index import EARTH_RADIUS_M, METERS_PER_DEGREE
+
+KINDS = ('il', 'ilce', 'mahalle', 'sokak', 'alan')
+AREA_FIELDS = ('tesis_adi', 'il_adi', 'ilce_adi', 'mahalle_adi', 'sokak_adi', 'acik_adres', 'tabela_kod')
+
+# Words spelling correction knows about; shorter words and numbers are left as typed
+_CORRECTABLE = re.compile(r'[a-z]{4,}')
+_WORD = re.compile(r'[a-z0-9]+')
+
+
+def search_key(name: str) -> str:
+    """Lower-case, diacritic-free form of a name that is stored in and matched against the indexes."""
+    return name_key(name).lower()
+
+
+class AddressDatabase:
+    """
+    A SQLite database of the collected address hierarchy and gathering areas.
+
+    Cities are imported one file at a time; importing a city again replaces
+    its rows, so the database can be kept up to date after every collected
+    city. The connection is shared by threads behind a lock.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS cities (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS districts (
+            id INTEGER PRIMARY KEY,
+            city_id INTEGER NOT NULL,
+            name TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS neighborhoods (
+            id INTEGER PRIMARY KEY,
+            district_id INTEGER NOT NULL,
+            city_id INTEGER NOT NULL,
+            name TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS streets (
+            id INTEGER NOT NULL,
+            neighborhood_id INTEGER NOT NULL,
+            city_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            PRIMARY KEY (neighborhood_id, id)
+        );
+        CREATE TABLE IF NOT EXISTS areas (
+            id INTEGER PRIMARY KEY,
+            tesis_adi TEXT,
+            il_adi TEXT,
+            ilce_adi TEXT,
+            mahalle_adi TEXT,
+            sokak_adi TEXT,
+            acik_adres TEXT,
+            tabela_kod TEXT,
+            x REAL,
+            y REAL
+        );
+        CREATE TABLE IF NOT EXISTS neighborhood_areas (
+            neighborhood_id INTEGER NOT NULL,
+            area_id INTEGER NOT NULL,
+            city_id INTEGER NOT NULL,
+            PRIMARY KEY (neighborhood_id, area_id)
+        );
+        CREATE INDEX IF NOT EXISTS districts_city ON districts (city_id);
+        CREATE INDEX IF NOT EXISTS neighborhoods_city ON neighborhoods (city_id);
+        CREATE INDEX IF NOT EXISTS streets_city ON streets (city_id);
+        CREATE INDEX IF NOT EXISTS neighborhood_areas_city ON neighborhood_areas (city_id);
+        CREATE INDEX IF NOT EXISTS neighborhood_areas_area ON neighborhood_areas (area_id);
+
+        -- One row per searchable name; the FTS tables share its rowids
+        CREATE TABLE IF NOT EXISTS entries (
+            rowid INTEGER PRIMARY KEY,
+            kind TEXT NOT NULL,
+            ref INTEGER NOT NULL,
+            city_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            key TEXT NOT NULL,
+            city TEXT,
+            district TEXT,
+            neighborhood TEXT
+        );
+        CREATE INDEX IF NOT EXISTS entries_city ON entries (city_id);
+        CREATE INDEX IF NOT EXISTS entries_ref ON entries (kind, ref);
+        CREATE INDEX IF NOT EXISTS entries_key ON entries (key);
+        CREATE INDEX IF NOT EXISTS entries_kind_key ON entries (kind, key);
+        CREATE VIRTUAL TABLE IF NOT EXISTS names USING fts5(name, context, kind, tokenize='unicode61', prefix='1 2 3');
+
+        -- Words of the names, for spelling correction; never shrinks
+        CREATE TABLE IF NOT EXISTS words (word TEXT PRIMARY KEY) WITHOUT ROWID;
+        CREATE VIRTUAL TABLE IF NOT EXISTS area_rtree USING rtree(id, min_x, max_x, min_y, max_y);
+    """
+
+    def __init__(self, path: str = "adres.sqlite3"):
+        """
+        Open (or create) the database.
+
+        Args:
+            path (str): SQLite file path
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        # Words already in the vocabulary, filled on the first import
+        self._words: Optional[set] = None
+        # Trigram -> vocabulary words, built on the first spelling correction
+        self._trigrams: Optional[Dict[str, List[str]]] = None
+
+    def import_city(self, path: str) -> Dict[str, int]:
+        """
+        Import a city file, replacing the city if it was imported before.
+
+        Args:
+            path (str): City file in either the nested or the normalized format
+
+        Returns:
+            Dict[str, int]: Number of districts, neighborhoods, streets and distinct gathering areas of the city
+        """
+        reader = CityStreamReader(path)
+        counts = {'ilce': 0, 'mahalle': 0, 'sokak': 0}
+        areas = set()
+        with self._lock, self._conn:
+            cur = self._conn.cursor()
+            if self._words is None:
+                self._words = {row[0] for row in cur.execute("SELECT word FROM words")}
+            city_id = None
+            district_done = set()
+            areas_written = set()
+            for district_name, neighborhood_name, data in reader:
+                if city_id is None:
+                    # The city code is parsed before the first neighborhood
+                    city_id = reader.city_id
+                    self._begin_city(cur, city_id, reader.city_name)
+                if district_name not in district_done:
+                    self._add_district(cur, city_id, reader.city_name, district_name, reader.district_ids[district_name])
+                    district_done.add(district_name)
+                    counts['ilce'] += 1
+                counts['sokak'] += len(data['sokaklar'])
+                areas.update(data['toplanmaAlanlari'])
+                self._add_neighborhood(
+                    cur, city_id, reader.city_name, district_name, reader.district_ids[district_name],
+                    neighborhood_name, data, areas_written
+                )
+                counts['mahalle'] += 1
+            if city_id is None:
+                city_id = reader.city_id
+                self._begin_city(cur, city_id, reader.city_name)
+            # Districts without neighborhoods are only known once the whole file is read
+            for district_name, district_id in reader.district_ids.items():
+                if district_name not in district_done:
+                    self._add_district(cur, city_id, reader.city_name, district_name, district_id)
+                    counts['ilce'] += 1
+            self._drop_orphan_areas(cur)
+        counts['alan'] = len(areas)
+        return counts
+
+    def _add_entry(self, cur: sqlite3.Cursor, kind: str, ref: int, city_id: int, name: str,
+                   city: Optional[str] = None, district: Optional[str] = None,
+                   neighborhood: Optional[str] = None) -> None:
+        """Add a searchable name; its parents' names are indexed as context."""
+        key = search_key(name)
+        cur.execute(
+            "INSERT INTO entries (kind, ref, city_id, name, key, city, district, neighborhood) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (kind, ref, city_id, name, key, city, district, neighborhood)
+        )
+        rowid = cur.lastrowid
+        context = ' '.join(search_key(parent) for parent in (neighborhood, district, city) if parent)
+        cur.execute("INSERT INTO names (rowid, name, context, kind) VALUES (?, ?, ?, ?)", (rowid, key, context, kind))
+        for word in _CORRECTABLE.findall(key):
+            if word not in self._words:
+                self._words.add(word)
+                self._trigrams = None
+                cur.execute("INSERT OR IGNORE INTO words (word) VALUES (?)", (word,))
+
+    def _begin_city(self, cur: sqlite3.Cursor, city_id: int, city_name: str) -> None:
+        """
+        Remove every row of a previous import of the city and add the city itself.
+
+        Gathering areas are not owned by one city (neighborhoods near a border
+        list areas of the neighboring city), so their rows and names are kept
+        here; the neighborhoods rewrite them and orphans are dropped at the end.
+        """
+        cur.execute("DELETE FROM names WHERE rowid IN "
+                    "(SELECT rowid FROM entries WHERE city_id = ? AND kind != 'alan')", (city_id,))
+        cur.execute("DELETE FROM entries WHERE city_id = ? AND kind != 'alan'", (city_id,))
+        for table in ('districts', 'neighborhoods', 'streets', 'neighborhood_areas'):
+            cur.execute(f"DELETE FROM {table} WHERE city_id = ?", (city_id,))
+        cur.execute("INSERT OR REPLACE INTO cities (id, name) VALUES (?, ?)", (city_id, city_name))
+        self._add_entry(cur, 'il', city_id, city_id, city_name)
+
+    def _add_district(self, cur: sqlite3.Cursor, city_id: int, city_name: str,
+                      district_name: str, district_id: int) -> None:
+        """Add a district row and its name."""
+        cur.execute("INSERT OR REPLACE INTO districts (id, city_id, name) VALUES (?, ?, ?)",
+                    (district_id, city_id, district_name))
+        self._add_entry(cur, 'ilce', district_id, city_id, district_name, city_name)
+
+    def _add_neighborhood(self, cur: sqlite3.Cursor, city_id: int, city_name: str, district_name: str,
+                          district_id: int, neighborhood_name: str, data: Dict[str, Any], written: set) -> None:
+        """Add a neighborhood with its streets and gathering areas; written holds the areas this import has written."""
+        neighborhood_id = data['mahalleId']
+        cur.execute("INSERT OR REPLACE INTO neighborhoods (id, district_id, city_id, name) VALUES (?, ?, ?, ?)",
+                    (neighborhood_id, district_id, city_id, neighborhood_name))
+        self._add_entry(cur, 'mahalle', neighborhood_id, city_id, neighborhood_name, city_name, district_name)
+
+        for street_name, street in data['sokaklar'].items():
+            cur.execute("INSERT OR REPLACE INTO streets (id, neighborhood_id, city_id, name) VALUES (?, ?, ?, ?)",
+                        (street['sokakId'], neighborhood_id, city_id, street_name))
+            self._add_entry(cur, 'sokak', street['sokakId'], city_id, street_name,
+                            city_name, district_name, neighborhood_name)
+
+        for area_id, area in data['toplanmaAlanlari'].items():
+            area_id = int(area_id)
+            cur.execute("INSERT OR IGNORE INTO neighborhood_areas (neighborhood_id, area_id, city_id) VALUES (?, ?, ?)",
+                        (neighborhood_id, area_id, city_id))
+            if area_id in written:
+                continue
+            written.add(area_id)
+            # Always rewritten, so a re-import picks up changed names and coordinates
+            self._remove_area_entries(cur, area_id)
+            x, y = float(area['x']), float(area['y'])
+            cur.execute(
+                f"INSERT OR REPLACE INTO areas (id, {', '.join(AREA_FIELDS)}, x, y) "
+                f"VALUES ({', '.join('?' * (len(AREA_FIELDS) + 3))})",
+                (area_id, *(area.get(field) for field in AREA_FIELDS), x, y)
+            )
+            cur.execute("INSERT OR REPLACE INTO area_rtree (id, min_x, max_x, min_y, max_y) VALUES (?, ?, ?, ?, ?)",
+                        (area_id, x, x, y, y))
+            self._add_entry(cur, 'alan', area_id, city_id, area.get('tesis_adi') or '',
+                            area.get('il_adi'), area.get('ilce_adi'), area.get('mahalle_adi'))
+
+    @staticmethod
+    def _remove_area_entries(cur: sqlite3.Cursor, area_id: int) -> None:
+        """Remove the searchable name of a gathering area, whichever city added it."""
+        for rowid, in cur.execute("SELECT rowid FROM entries WHERE kind = 'alan' AND ref = ?", (area_id,)).fetchall():
+            cur.execute("DELETE FROM names WHERE rowid = ?", (rowid,))
+            cur.execute("DELETE FROM entries WHERE rowid = ?", (rowid,))
+
+    def _drop_orphan_areas(self, cur: sqlite3.Cursor) -> None:
+        """Remove gathering areas no imported neighborhood refers to any more."""
+        orphans = [row[0] for row in cur.execute(
+            "SELECT id FROM areas WHERE id NOT IN (SELECT area_id FROM neighborhood_areas)"
+        )]
+        for area_id in orphans:
+            self._remove_area_entries(cur, area_id)
+            cur.execute("DELETE FROM area_rtree WHERE id = ?", (area_id,))
+            cur.execute("DELETE FROM areas WHERE id = ?", (area_id,))
+
+    def optimize(self) -> None:
+        """Merge the FTS index segments and update planner statistics after a bulk import."""
+        with self._lock, self._conn:
+            self._conn.execute("INSERT INTO names (names) VALUES ('optimize')")
+            self._conn.execute("ANALYZE")
+
+    @staticmethod
+    def _result(row: Tuple[Any, ...]) -> Dict[str, Any]:
+        """Turn an entries row into a search result."""
+        kind, ref, name, city, district, neighborhood = row
+        result = {'tur': kind, 'id': ref, 'ad': name}
+        for key, value in (('il', city), ('ilce', district), ('mahalle', neighborhood)):
+            if value is not None:
+                result[key] = value
+        return result
+
+    def search(self,
+               text: str,
+               kind: Optional[str] = None,
+               limit: int = 10,
+               fuzzy: bool = True) -> List[Dict[str, Any]]:
+        """
+        Find names by prefix, correcting misspelled words if that finds too few.
+
+        Names that start with the query come first, then names in which
+        every word of the query is the prefix of a word of the name or of its
+        neighborhood, district or city names. Neither step ranks the whole
+        match set, so a query costs about the same however common its words are.
+
+        Args:
+            text (str): Query, with or without Turkish characters
+            kind (Optional[str]): Only return "il", "ilce", "mahalle", "sokak" or "alan" entries
+            limit (int): Maximum number of results
+            fuzzy (bool): Retry with misspelled words replaced by the closest known words
+
+        Returns:
+            List[Dict[str, Any]]: Results with tur (kind), id (AFAD id), ad (name) and parent names
+
+        Raises:
+            ValueError: If kind is not one of KINDS
+        """
+        # The kind is matched inside the FTS query, so it must never be arbitrary text
+        if kind is not None and kind not in KINDS:
+            raise ValueError(f"Geçersiz tür: {kind!r}; {', '.join(KINDS)} olmalı")
+        key = search_key(text)
+        words = _WORD.findall(key)
+        if not words:
+            return []
+
+        with self._lock:
+            rows = self._match(key, words, kind, limit)
+            if fuzzy and len(rows) < limit:
+                corrected = [self._correct(word) for word in words]
+                if corrected != words:
+                    seen = {row[0] for row in rows}
+                    rows += [row for row in self._match(' '.join(corrected), corrected, kind, limit)
+                             if row[0] not in seen]
+        return [self._result(row[1:]) for row in rows[:limit]]
+
+    def _match(self, key: str, words: List[str], kind: Optional[str], limit: int) -> List[Tuple[Any, ...]]:
+        """Entries whose name starts with key, then entries matching every word; the caller holds the lock."""
+        columns = "e.rowid, e.kind, e.ref, e.name, e.city, e.district, e.neighborhood"
+        kind_filter = "AND e.kind = ?" if kind is not None else ""
+        kind_params = (kind,) if kind is not None else ()
+        rows = self._conn.execute(
+            f"SELECT {columns} FROM entries e WHERE e.key >= ? AND e.key < ? {kind_filter} ORDER BY e.key LIMIT ?",
+            (key, key + '\uffff', *kind_params, limit)
+        ).fetchall()
+
+        seen = {row[0] for row in rows}
+        terms = ' AND '.join(f'"{word}"*' for word in words)
+        # The kind is matched inside the index, so rare kinds do not scan every match of common words
+        kind_terms = f' AND kind : "{kind}"' if kind is not None else ''
+        # Matches within the name itself before matches that need the parents' names
+        queries = [f"name : ({terms}){kind_terms}"]
+        if kind != 'il':
+            # Cities have no parents
+            queries.append(f"{{name context}} : ({terms}){kind_terms}")
+        for query in queries:
+            if len(rows) >= limit:
+                break
+            for row in self._conn.execute(
+                f"SELECT {columns} FROM names JOIN entries e ON e.rowid = names.rowid WHERE names MATCH ? LIMIT ?",
+                (query, limit + len(seen))
+            ):
+                if row[0] not in seen:
+                    seen.add(row[0])
+                    rows.append(row)
+        return rows[:limit]
+
+    def _correct(self, word: str, candidates: int = 20, cutoff: float = 0.75) -> str:
+        """The known word closest to a misspelled one, or the word itself; the caller holds the lock."""
+        if not _CORRECTABLE.fullmatch(word) or self._conn.execute(
+                "SELECT 1 FROM words WHERE word >= ? AND word < ? LIMIT 1", (word, word + '\uffff')).fetchone():
+            return word
+        if self._trigrams is None:
+            self._trigrams = {}
+            for known, in self._conn.execute("SELECT word FROM words"):
+                for i in range(len(known) - 2):
+                    self._trigrams.setdefault(known[i:i + 3], []).append(known)
+        shared = Counter()
+        for trigram in {word[i:i + 3] for i in range(len(word) - 2)}:
+            shared.update(self._trigrams.get(trigram, ()))
+        # Most shared trigrams first, then closest in length
+        ranked = sorted(shared.items(), key=lambda item: (-item[1], abs(len(item[0]) - len(word))))
+        close = difflib.get_close_matches(word, [known for known, _ in ranked[:candidates]], n=1, cutoff=cutoff)
+        return close[0] if close else word
+
+    def areas_in_box(self, min_lng: float, min_lat: float, max_lng: float, max_lat: float) -> List[Dict[str, Any]]:
+        """
+        Gathering areas inside a bounding box.
+
+        Args:
+            min_lng (float): Western edge
+            min_lat (float): Southern edge
+            max_lng (float): Eastern edge
+            max_lat (float): Northern edge
+
+        Returns:
+            List[Dict[str, Any]]: Area properties in the collected format
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT a.id, {', '.join('a.' + field for field in AREA_FIELDS)}, a.x, a.y "
+                "FROM area_rtree r JOIN areas a ON a.id = r.id "
+                "WHERE r.min_x <= ? AND r.max_x >= ? AND r.min_y <= ? AND r.max_y >= ?",
+                (max_lng, min_lng, max_lat, min_lat)
+            ).fetchall()
+        return [dict(zip(('id', *AREA_FIELDS, 'x', 'y'), row)) for row in rows]
+
+    def nearest(self, lat: float, lng: float, k: int = 5, max_radius_m: float = 50_000) -> List[Dict[str, Any]]:
+        """
+        The k gathering areas closest to a point, searching growing boxes of the R*Tree.
+
+        Args:
+            lat (float): Latitude
+            lng (float): Longitude
+            k (int): Number of areas
+            max_radius_m (float): Areas farther than this are not returned
+
+        Returns:
+            List[Dict[str, Any]]: Area properties with distance_m, closest first
+        """
+        radius = 500.0
+        while True:
+            radius = min(radius, max_radius_m)
+            dlat = radius / METERS_PER_DEGREE
+            dlng = dlat / max(math.cos(math.radians(lat)), 1e-6)
+            areas = self.areas_in_box(lng - dlng, lat - dlat, lng + dlng, lat + dlat)
+            for area in areas:
+                area['distance_m'] = round(_haversine(lat, lng, area['y'], area['x']), 1)
+            # Only areas within the inscribed circle are certainly closer than everything outside the box
+            inside = sorted((area for area in areas if area['distance_m'] <= radius), key=lambda a: a['distance_m'])
+            if len(inside) >= k or radius >= max_radius_m:
+                return inside[:k]
+            radius *= 4
+
+    def stats(self) -> Dict[str, int]:
+        """Row counts of the tables."""
+        with self._lock:
+            return {
+                table: self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ('cities', 'districts', 'neighborhoods', 'streets', 'areas')
+            }
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._conn.close()
+
+
+def _haversine(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance in meters."""
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(min(1.0, a)))
+
+
+def build(paths: Iterable[str], output: str) -> AddressDatabase:
+    """
+    Import city files into a database and optimize its indexes.
+
+    Args:
+        paths (Iterable[str]): City files
+        output (str): Database path
+
+    Returns:
+        AddressDatabase: The open database
+    """
+    database = AddressDatabase(output)
+    for path in paths:
+        counts = database.import_city(path)
+        print(f"{path}: {counts['ilce']} ilçe, {counts['mahalle']} mahalle, {counts['sokak']} sokak, {counts['alan']} alan")
+    database.optimize()
+    return database
+
+
+def main() -> None:
+    """Build or query the address database from the command line."""
+    parser = argparse.ArgumentParser(description="Adres ve toplanma alanı veritabanı oluşturur ve sorgular")
+    parser.add_argument("--db", default="adres.sqlite3", help="Veritabanı dosyası")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_command = commands.add_parser("build", help="Şehir dosyalarını veritabanına aktar")
+    build_command.add_argument("paths", nargs="*", help="Şehir dosyaları (varsayılan: iller/*.json)")
+
+    search_command = commands.add_parser("search", help="İl, ilçe, mahalle, sokak ya da toplanma alanı adı ara")
+    search_command.add_argument("text", help="Aranan ad; Türkçe karakterler olmadan da yazılabilir")
+    search_command.add_argument("--kind", choices=KINDS, help="Yalnızca bu türdeki kayıtlar")
+    search_command.add_argument("--limit", type=int, default=10, help="En fazla sonuç sayısı")
+    search_command.add_argument("--exact", action="store_true", help="Benzer adlarla tamamlama yapma")
+
+    near_command = commands.add_parser("near", help="Bir noktaya en yakın toplanma alanları")
+    near_command.add_argument("lat", type=float, help="Enlem")
+    near_command.add_argument("lng", type=float, help="Boylam")
+    near_command.add_argument("-k", type=int, default=5, help="Alan sayısı")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        paths = args.paths or sorted(glob.glob(os.path.join("iller", "*.json")))
+        start = time.perf_counter()
+        database = build(paths, args.db)
+        print(f"{args.db}: {database.stats()} ({time.perf_counter() - start:.1f} sn)")
+        database.close()
+        return
+
+    database = AddressDatabase(args.db)
+    start = time.perf_counter()
+    if args.command == "search":
+        results = database.search(args.text, kind=args.kind, limit=args.limit, fuzzy=not args.exact)
+    else:
+        results = database.nearest(args.lat, args.lng, k=args.k)
+    elapsed = time.perf_counter() - start
+    database.close()
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+    print(f"{len(results)} sonuç, {elapsed * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,487 @@
+"""
+Memory-Mapped Binary Area Store
+
+This module provides a compact binary export of the collected `iller/*.json`
+files. Loading the JSON parses ~19 MB into millions of small dicts and
+strings in every process that needs the data; the store keeps everything in
+flat NumPy arrays inside a single file instead. Readers map the file with
+`mmap` and wrap each section with np.frombuffer, so opening it takes
+milliseconds, nothing is copied, and every process on the machine shares the
+same pages of the OS cache.
+
+Layout (little endian):
+
+    "AFADBIN\\0" | version u32 | directory length u32 | directory (UTF-8 JSON)
+    | sections, each aligned to 64 bytes from the end of the directory
+
+The directory maps section names to their dtype, offset and element count.
+Sections:
+
+    str_offsets, str_blob     Interned UTF-8 strings: every name and address
+                              once, referenced everywhere by a u32 string id
+    city_*, district_*,       AFAD id and name of every il/ilçe/mahalle/sokak
+    neighborhood_*, street_*  in file order; the children of node i of one level
+                              are rows *_start[i]:*_start[i + 1] of the next
+    link_area, link_street    Areas of each neighborhood (rows of the area
+                              table) and the sokak_adi of that copy when it
+                              differs from the area row
+    area_*                    id, x, y, first neighborhood listing the area and
+                              one string column per text property
+
+AFAD reports the same area with a different sokak_adi in different
+neighborhoods; that is kept per link, and any other difference between
+copies gets its own area row, so converting back to JSON is lossless.
+
+    python area_store.py build                     # iller/*.json -> iller.bin
+    python area_store.py export --output-dir iller_geri
+    python area_store.py report
+"""
+
+import argparse
+import glob
+import json
+import math
+import mmap
+import os
+import struct
+import time
+import tracemalloc
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import unidecode
+
+from city_format import load_city_file, name_key
+from city_stream import write_city
+from spatial_index import GatheringAreaIndex
+
+MAGIC = b'AFADBIN\0'
+STORE_VERSION = 1
+HEADER = struct.Struct('<8sII')
+ALIGNMENT = 64
+
+# Property order of a gathering area as AFAD returns it; the text ones are string columns
+AREA_FIELDS = ('tesis_adi', 'il_adi', 'sokak_adi', 'acik_adres', 'ilce_adi', 'mahalle_adi', 'x', 'y', 'tabela_kod', 'id')
+AREA_TEXT_FIELDS = ('tesis_adi', 'il_adi', 'sokak_adi', 'acik_adres', 'ilce_adi', 'mahalle_adi', 'tabela_kod')
+
+# Special string ids: JSON null, key absent from the area, and (link_street only) same as the area row
+NULL = 0xFFFFFFFF
+MISSING = 0xFFFFFFFE
+SAME = 0xFFFFFFFD
+
+SECTION_DTYPES = {
+    'str_offsets': '<u4', 'str_blob': 'u1',
+    'city_id': '<i8', 'city_name': '<u4', 'city_start': '<u4',
+    'district_id': '<i8', 'district_name': '<u4', 'district_start': '<u4',
+    'neighborhood_id': '<i8', 'neighborhood_name': '<u4', 'neighborhood_street_start': '<u4',
+    'neighborhood_area_start': '<u4',
+    'street_id': '<i8', 'street_name': '<u4',
+    'link_area': '<u4', 'link_street': '<u4',
+    'area_id': '<i8', 'area_x': '<f8', 'area_y': '<f8', 'area_neighborhood': '<u4', 'area_extra': '<u4',
+    **{f'area_{field}': '<u4' for field in AREA_TEXT_FIELDS},
+}
+
+
+class _StringTable:
+    """Interns strings while a store is built."""
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._encoded: List[bytes] = []
+
+    def add(self, value: Optional[str]) -> int:
+        """String id of a value; None is NULL."""
+        if value is None:
+            return NULL
+        string_id = self._ids.get(value)
+        if string_id is None:
+            string_id = self._ids[value] = len(self._encoded)
+            self._encoded.append(value.encode('utf-8'))
+        return string_id
+
+    def arrays(self) -> Tuple[List[int], bytes]:
+        """Offsets (one more than strings) and the concatenated UTF-8 blob."""
+        offsets = [0]
+        for encoded in self._encoded:
+            offsets.append(offsets[-1] + len(encoded))
+        return offsets, b''.join(self._encoded)
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def write_store(paths: Iterable[str], output: str) -> Dict[str, int]:
+    """
+    Convert city files into a binary store.
+
+    Args:
+        paths (Iterable[str]): City files in either JSON format
+        output (str): Path of the store; written to output.tmp and moved into place when complete
+
+    Returns:
+        Dict[str, int]: Number of cities, districts, neighborhoods, streets, area rows, links and strings
+    """
+    strings = _StringTable()
+    columns: Dict[str, List[Any]] = {name: [] for name in SECTION_DTYPES if not name.startswith('str_')}
+    # Area row of each id holding its canonical copy, and the copies themselves for comparison
+    rows_by_id: Dict[int, int] = {}
+    copies: List[Dict[str, Any]] = []
+
+    def add_area(area: Dict[str, Any], neighborhood: int) -> int:
+        row = len(copies)
+        copies.append(area)
+        columns['area_id'].append(int(area['id']))
+        columns['area_x'].append(math.nan if area.get('x') is None else float(area['x']))
+        columns['area_y'].append(math.nan if area.get('y') is None else float(area['y']))
+        columns['area_neighborhood'].append(neighborhood)
+        for field in AREA_TEXT_FIELDS:
+            columns[f'area_{field}'].append(strings.add(area[field]) if field in area else MISSING)
+        extra = {key: value for key, value in area.items() if key not in AREA_FIELDS}
+        columns['area_extra'].append(strings.add(json.dumps(extra, ensure_ascii=False)) if extra else NULL)
+        return row
+
+    for path in paths:
+        for city_name, city in load_city_file(path).items():
+            columns['city_id'].append(city['ilId'])
+            columns['city_name'].append(strings.add(city_name))
+            columns['city_start'].append(len(columns['district_id']))
+            for district_name, district in city['ilceler'].items():
+                columns['district_id'].append(district['ilceId'])
+                columns['district_name'].append(strings.add(district_name))
+                columns['district_start'].append(len(columns['neighborhood_id']))
+                for neighborhood_name, neighborhood in district['mahalleler'].items():
+                    position = len(columns['neighborhood_id'])
+                    columns['neighborhood_id'].append(neighborhood['mahalleId'])
+                    columns['neighborhood_name'].append(strings.add(neighborhood_name))
+                    columns['neighborhood_street_start'].append(len(columns['street_id']))
+                    columns['neighborhood_area_start'].append(len(columns['link_area']))
+                    for street_name, street in neighborhood['sokaklar'].items():
+                        columns['street_id'].append(street['sokakId'])
+                        columns['street_name'].append(strings.add(street_name))
+
+                    for area in neighborhood['toplanmaAlanlari'].values():
+                        street = SAME
+                        row = rows_by_id.get(int(area['id']))
+                        if row is None:
+                            row = rows_by_id[int(area['id'])] = add_area(area, position)
+                        elif copies[row] != area:
+                            canonical = copies[row]
+                            if (area.keys() == canonical.keys() and 'sokak_adi' in area
+                                    and all(area[key] == canonical[key] for key in area if key != 'sokak_adi')):
+                                street = strings.add(area['sokak_adi'])
+                            else:
+                                row = add_area(area, position)
+                        columns['link_area'].append(row)
+                        columns['link_street'].append(street)
+
+    # Closing offsets, so that children of the last node end where the next level ends
+    columns['city_start'].append(len(columns['district_id']))
+    columns['district_start'].append(len(columns['neighborhood_id']))
+    columns['neighborhood_street_start'].append(len(columns['street_id']))
+    columns['neighborhood_area_start'].append(len(columns['link_area']))
+
+    offsets, blob = strings.arrays()
+    arrays = {name: np.asarray(values, dtype=SECTION_DTYPES[name]) for name, values in columns.items()}
+    arrays['str_offsets'] = np.asarray(offsets, dtype=SECTION_DTYPES['str_offsets'])
+    arrays['str_blob'] = np.frombuffer(blob, dtype=SECTION_DTYPES['str_blob'])
+
+    meta = {
+        'il': len(arrays['city_id']), 'ilce': len(arrays['district_id']),
+        'mahalle': len(arrays['neighborhood_id']), 'sokak': len(arrays['street_id']),
+        'alan': len(arrays['area_id']), 'baglanti': len(arrays['link_area']), 'metin': len(offsets) - 1,
+    }
+    sections = {}
+    position = 0
+    for name in SECTION_DTYPES:
+        position = _align(position)
+        sections[name] = {'dtype': SECTION_DTYPES[name], 'offset': position, 'count': len(arrays[name])}
+        position += arrays[name].nbytes
+    directory = json.dumps({'meta': meta, 'sections': sections}).encode('utf-8')
+
+    tmp_path = output + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, STORE_VERSION, len(directory)))
+        f.write(directory)
+        data_start = _align(f.tell())
+        for name in SECTION_DTYPES:
+            f.seek(data_start + sections[name]['offset'])
+            f.write(arrays[name].tobytes())
+    os.replace(tmp_path, output)
+    return meta
+
+
+class AreaStore:
+    """
+    Read-only view of a binary store.
+
+    All arrays are views into one shared read-only mapping of the file;
+    the store can be opened before forking, or separately in every process.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open a store written by write_store().
+
+        Args:
+            path (str): Path of the store
+
+        Raises:
+            ValueError: If the file is not a store or was written by an incompatible version
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < HEADER.size:
+            self._mmap.close()
+            raise ValueError(f"Geçerli bir alan deposu değil: {path}")
+        magic, version, length = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"Geçerli bir alan deposu değil: {path}")
+        if version != STORE_VERSION:
+            self._mmap.close()
+            raise ValueError(f"Desteklenmeyen depo sürümü: {version}")
+        directory = json.loads(self._mmap[HEADER.size:HEADER.size + length])
+        self.meta: Dict[str, int] = directory['meta']
+
+        data_start = _align(HEADER.size + length)
+        self._arrays: Dict[str, np.ndarray] = {
+            name: np.frombuffer(self._mmap, dtype=np.dtype(section['dtype']), count=section['count'],
+                                offset=data_start + section['offset'])
+            for name, section in directory['sections'].items()
+        }
+        self._blob = memoryview(self._mmap)[data_start + directory['sections']['str_blob']['offset']:]
+
+    def __getattr__(self, name: str) -> np.ndarray:
+        # Sections are exposed as attributes, e.g. store.area_x or store.city_start
+        try:
+            return self.__dict__['_arrays'][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def close(self) -> None:
+        """Release the mapping; arrays still referenced elsewhere keep it alive until dropped."""
+        self._arrays = {}
+        self._blob.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass
+
+    def __enter__(self) -> 'AreaStore':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def string(self, string_id: int) -> Optional[str]:
+        """
+        Decode an interned string.
+
+        Args:
+            string_id (int): Id from one of the string columns
+
+        Returns:
+            Optional[str]: The string, None for NULL
+        """
+        if string_id == NULL:
+            return None
+        offsets = self._arrays['str_offsets']
+        return str(self._blob[offsets[string_id]:offsets[string_id + 1]], 'utf-8')
+
+    def districts(self, city: int) -> range:
+        """District rows of a city row."""
+        return range(self.city_start[city], self.city_start[city + 1])
+
+    def neighborhoods(self, district: int) -> range:
+        """Neighborhood rows of a district row."""
+        return range(self.district_start[district], self.district_start[district + 1])
+
+    def streets(self, neighborhood: int) -> range:
+        """Street rows of a neighborhood row."""
+        return range(self.neighborhood_street_start[neighborhood], self.neighborhood_street_start[neighborhood + 1])
+
+    def links(self, neighborhood: int) -> range:
+        """Link rows of a neighborhood row; link_area maps them to area rows."""
+        return range(self.neighborhood_area_start[neighborhood], self.neighborhood_area_start[neighborhood + 1])
+
+    def find(self, city: str, district: Optional[str] = None, neighborhood: Optional[str] = None) -> Optional[int]:
+        """
+        Find the row of a city, district or neighborhood by name, case and diacritic insensitively.
+
+        Args:
+            city (str): City name
+            district (Optional[str]): District name within the city
+            neighborhood (Optional[str]): Neighborhood name within the district
+
+        Returns:
+            Optional[int]: Row of the deepest given level, None if not found
+        """
+        row = None
+        candidates: Iterable[int] = range(len(self.city_id))
+        for name, names, children in ((city, self.city_name, self.districts),
+                                      (district, self.district_name, self.neighborhoods),
+                                      (neighborhood, self.neighborhood_name, None)):
+            if name is None:
+                break
+            key = name_key(name)
+            row = next((i for i in candidates if name_key(self.string(names[i])) == key), None)
+            if row is None or children is None:
+                return row
+            candidates = children(row)
+        return row
+
+    def area(self, row: int, link: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Rebuild the property dict of an area.
+
+        Args:
+            row (int): Area row
+            link (Optional[int]): Link row the area was reached through, for its sokak_adi
+
+        Returns:
+            Dict[str, Any]: Gathering area properties as in the city files
+        """
+        area: Dict[str, Any] = {}
+        for field in AREA_FIELDS:
+            if field == 'id':
+                area[field] = int(self.area_id[row])
+            elif field in ('x', 'y'):
+                value = float(self._arrays[f'area_{field}'][row])
+                area[field] = None if math.isnan(value) else value
+            else:
+                string_id = int(self._arrays[f'area_{field}'][row])
+                if field == 'sokak_adi' and link is not None and self.link_street[link] != SAME:
+                    string_id = int(self.link_street[link])
+                if string_id != MISSING:
+                    area[field] = self.string(string_id)
+        if self.area_extra[row] != NULL:
+            area.update(json.loads(self.string(int(self.area_extra[row]))))
+        return area
+
+    def city(self, row: int) -> Dict[str, Any]:
+        """
+        Rebuild a city in the nested JSON format.
+
+        Args:
+            row (int): City row
+
+        Returns:
+            Dict[str, Any]: {city_name: {...}} as load_city_file() returns it
+        """
+        districts = {}
+        for district in self.districts(row):
+            neighborhoods = {}
+            for neighborhood in self.neighborhoods(district):
+                areas = {}
+                for link in self.links(neighborhood):
+                    area = self.area(int(self.link_area[link]), link)
+                    areas[str(area['id'])] = area
+                neighborhoods[self.string(self.neighborhood_name[neighborhood])] = {
+                    'mahalleId': int(self.neighborhood_id[neighborhood]),
+                    'sokaklar': {
+                        self.string(self.street_name[street]): {'sokakId': int(self.street_id[street])}
+                        for street in self.streets(neighborhood)
+                    },
+                    'toplanmaAlanlari': areas,
+                }
+            districts[self.string(self.district_name[district])] = {
+                'ilceId': int(self.district_id[district]), 'mahalleler': neighborhoods,
+            }
+        return {self.string(self.city_name[row]): {'ilId': int(self.city_id[row]), 'ilceler': districts}}
+
+    def spatial_index(self, cell_size: float = 0.05) -> GatheringAreaIndex:
+        """
+        Build a GatheringAreaIndex over the areas, one per id.
+
+        Args:
+            cell_size (float): Grid cell size in degrees
+
+        Returns:
+            GatheringAreaIndex: The built index
+        """
+        _, rows = np.unique(self.area_id, return_index=True)
+        rows = rows[~(np.isnan(self.area_x[rows]) | np.isnan(self.area_y[rows]))]
+        properties = [json.dumps(self.area(int(row)), ensure_ascii=False).encode('utf-8') for row in rows]
+        return GatheringAreaIndex(self.area_id[rows], self.area_y[rows], self.area_x[rows], properties, cell_size)
+
+
+def report(paths: List[str], store_path: str) -> Dict[str, Any]:
+    """
+    Compare loading the city files with opening the store.
+
+    Args:
+        paths (List[str]): City files the store was built from
+        store_path (str): Path of the store
+
+    Returns:
+        Dict[str, Any]: Sizes, load times and peak Python allocations of both
+    """
+    tracemalloc.start()
+    started = time.perf_counter()
+    for path in paths:
+        load_city_file(path)
+    json_ms = (time.perf_counter() - started) * 1000
+    _, json_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    with AreaStore(store_path) as store:
+        open_ms = (time.perf_counter() - started) * 1000
+        _, store_peak = tracemalloc.get_traced_memory()
+        meta = store.meta
+    tracemalloc.stop()
+
+    return {
+        'json_kb': round(sum(os.path.getsize(path) for path in paths) / 1024),
+        'depo_kb': round(os.path.getsize(store_path) / 1024),
+        'json_okuma_ms': round(json_ms, 1),
+        'depo_acma_ms': round(open_ms, 2),
+        'json_bellek_mb': round(json_peak / 1e6, 1),
+        'depo_bellek_mb': round(store_peak / 1e6, 3),
+        'icerik': meta,
+    }
+
+
+def main() -> None:
+    """Build, export and measure the binary store from the command line."""
+    parser = argparse.ArgumentParser(description="Toplanma alanları ve il/ilçe/mahalle/sokak için ikili veri deposu")
+    parser.add_argument("--store", default="iller.bin", help="Depo dosyası")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build = subparsers.add_parser("build", help="iller/*.json dosyalarından depo oluştur")
+    build.add_argument("files", nargs="*", help="Şehir dosyaları (varsayılan: iller/*.json)")
+
+    export = subparsers.add_parser("export", help="Depodaki şehirleri JSON dosyalarına geri yaz")
+    export.add_argument("--output-dir", required=True, help="Şehir dosyalarının yazılacağı klasör")
+    export.add_argument("--format", dest="output_format", choices=["nested", "normalized"], default="nested",
+                        help="Çıktı biçimi")
+
+    report_parser = subparsers.add_parser("report", help="JSON okuma ile depo açma süresini ve belleğini karşılaştır")
+    report_parser.add_argument("files", nargs="*", help="Şehir dosyaları (varsayılan: iller/*.json)")
+
+    args = parser.parse_args()
+    default_paths = sorted(glob.glob(os.path.join("iller", "*.json")))
+
+    if args.command == "build":
+        started = time.perf_counter()
+        meta = write_store(args.files or default_paths, args.store)
+        print(f"{args.store}: {json.dumps(meta, ensure_ascii=False)} "
+              f"({os.path.getsize(args.store) / 1024:.0f} KB, {time.perf_counter() - started:.1f} sn)")
+    elif args.command == "export":
+        os.makedirs(args.output_dir, exist_ok=True)
+        with AreaStore(args.store) as store:
+            for row in range(len(store.city_id)):
+                data = store.city(row)
+                (city_name, _), = data.items()
+                output_path = os.path.join(args.output_dir, f"{unidecode.unidecode(city_name)}.json")
+                write_city(output_path, data, normalized=args.output_format == 'normalized')
+                print(f"{city_name} -> {output_path}")
+    else:
+        print(json.dumps(report(args.files or default_paths, args.store), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+"""
+AFAD Emergency Gathering Areas Async Collector
+
+This module provides an asyncio based collection engine that runs the whole
+crawl as one continuous pipeline (city → districts → neighborhoods →
+map polygon → point queries) under a single global in-flight limit, so the
+connection budget stays full across district and city boundaries.
+"""
+
+import asyncio
+import contextvars
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from tqdm import tqdm
+
+from address_db import AddressDatabase
+from collect import GatheringAreaCollector
+from journal import CollectionJournal
+from metrics import MetricsRegistry
+from point_cache import CacheStats, PointCache
+from scraper import Transport
+
+
+class AsyncGatheringAreaCollector(GatheringAreaCollector):
+    """
+    Collect emergency gathering area data with an asyncio pipeline.
+
+    Every blocking scraper call runs in a worker thread, but the number of
+    requests in flight is bounded by one semaphore shared by all cities,
+    districts and neighborhoods. Output files are identical to the threaded
+    collector's.
+    """
+
+    def __init__(self,
+                 cities_file: str = "cities.json",
+                 max_in_flight: int = 10,
+                 max_cities: int = 2,
+                 point_cache: Optional[PointCache] = None,
+                 journal: Optional[CollectionJournal] = None,
+                 output_format: str = "nested",
+                 transport: Optional[Transport] = None,
+                 base_url: Optional[str] = None,
+                 metrics: Optional[MetricsRegistry] = None,
+                 address_db: Optional[AddressDatabase] = None):
+        """
+        Initialize the async collector.
+
+        Args:
+            cities_file (str): Path to the JSON file containing city information
+            max_in_flight (int): Maximum number of concurrent requests across the whole crawl
+            max_cities (int): Maximum number of cities whose work may overlap
+            point_cache (Optional[PointCache]): Persistent cache for query_point results
+            journal (Optional[CollectionJournal]): Journal finished neighborhoods are appended to
+            output_format (str): "nested" for the published format, "normalized" for a shared area table
+            transport (Optional[Transport]): Transport for the scraper's requests, e.g. a recording or a replay
+            base_url (Optional[str]): Server to collect from instead of turkiye.gov.tr
+            metrics (Optional[MetricsRegistry]): Registry request and progress metrics are recorded into
+            address_db (Optional[AddressDatabase]): Searchable database every saved city is imported into
+        """
+        super().__init__(cities_file, max_workers=max_in_flight, point_cache=point_cache, journal=journal,
+                         output_format=output_format, transport=transport, base_url=base_url, metrics=metrics,
+                         address_db=address_db)
+        self.max_in_flight = max_in_flight
+        self.max_cities = max_cities
+
+    async def _call(self, func: Callable, *args: Any) -> Any:
+        """
+        Run a blocking scraper call in a worker thread once an in-flight slot is free.
+
+        Args:
+            func (Callable): Blocking function to run
+            *args: Arguments for the function
+
+        Returns:
+            Any: Return value of the function
+        """
+        async with self._semaphore:
+            # Run inside a copy of the task's context so per-city cache counters follow the call
+            context = contextvars.copy_context()
+            return await asyncio.get_running_loop().run_in_executor(self._executor, context.run, func, *args)
+
+    async def fetch_data_async(self, query_string: str) -> Dict[str, Any]:
+        """
+        Async counterpart of fetch_data_with_retry.
+
+        The backoff sleep happens outside the in-flight slot so that waiting
+        requests do not eat into the connection budget.
+
+        Args:
+            query_string (str): Query parameters for the API
+
+        Returns:
+            Dict[str, Any]: Parsed JSON response
+
+        Raises:
+            RuntimeError: If all retry attempts fail
+        """
+        max_retries = 3
+        for attempt in range(max_retries):
+            try:
+                return await self._call(self.scraper.get_data, query_string)
+            except Exception as e:
+                if attempt < max_retries - 1:
+                    logging.warning(f"Hata sonrası yeniden deneme {attempt+1}/{max_retries}: {e}")
+                    self.scraper.count_retry('get_data', 'error')
+                    await asyncio.sleep(self.scraper.limiter.backoff_delay(attempt + 1))
+                else:
+                    logging.error(f"{max_retries} deneme sonrası veri çekilemedi: {e}")
+                    raise RuntimeError(f"Veri çekme işlemi başarısız oldu: {e}")
+
+    def _query_point_attempt(self, lng: float, lat: float) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """One query_point attempt, with the token it was made with so a failure refreshes only that token."""
+        token = self.scraper.token
+        return token, self.scraper.query_point(lng, lat)
+
+    async def query_point_async(self, lng: float, lat: float, max_retries: int = 3) -> Optional[Dict[str, Any]]:
+        """
+        Async counterpart of query_point_with_retry.
+
+        Like fetch_data_async, only the attempts hold an in-flight slot; the
+        backoff between them is slept in the event loop.
+
+        Args:
+            lng (float): Longitude of the point
+            lat (float): Latitude of the point
+            max_retries (int): Maximum number of attempts
+
+        Returns:
+            Optional[Dict[str, Any]]: JSON response or None if every attempt failed
+        """
+        for attempt in range(max_retries):
+            token, result = await self._call(self._query_point_attempt, lng, lat)
+            if result is not None or attempt + 1 == max_retries:
+                return result
+            self.scraper.count_retry('query_point', 'error')
+            await self._call(self.scraper.refresh_token, token)
+            await asyncio.sleep(self.scraper.limiter.backoff_delay(attempt))
+        return None
+
+    async def collect_areas_async(self, city_code: int, district_id: int, neighborhood_id: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Fetch a neighborhood polygon and query each sampling round's points concurrently.
+
+        Args:
+            city_code (int): City code
+            district_id (int): District code
+            neighborhood_id (int): Neighborhood code
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: Gathering area features or None if the polygon is missing
+        """
+        areas = await self._call(self.scraper.fetch_map_areas, city_code, district_id, neighborhood_id)
+        try:
+            session = self.scraper.sampler.start(areas)
+        except (IndexError, KeyError, TypeError, ValueError):
+            return None
+        if session is None:
+            return None
+
+        while True:
+            points = session.next_batch()
+            if not points:
+                break
+            session.record(await asyncio.gather(*(
+                self.query_point_async(lng, lat) for lng, lat in points
+            )))
+        return session.features()
+
+    async def process_neighborhood_async(self,
+                                         city_code: int,
+                                         district: Dict[str, Any],
+                                         neighborhood: Dict[str, Any]) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Async counterpart of process_neighborhood.
+
+        Args:
+            city_code (int): City code
+            district (Dict[str, Any]): District information
+            neighborhood (Dict[str, Any]): Neighborhood information
+
+        Returns:
+            Tuple[str, Optional[Dict[str, Any]]]: Neighborhood name and processed data or None if error
+        """
+        try:
+            neighborhood_result = {
+                'mahalleId': neighborhood['id'],
+                'sokaklar': {},
+                'toplanmaAlanlari': {}
+            }
+
+            street_data, query_results = await asyncio.gather(
+                self.fetch_data_async(
+                    f"ilKodu={city_code}&ilceKodu={district['id']}&sokakKodu={neighborhood['id']}&islem=sokakKodu"
+                ),
+                self.collect_areas_async(city_code, district['id'], neighborhood['id']),
+            )
+
+            if query_results is not None:
+                for query_res in query_results:
+                    neighborhood_result['toplanmaAlanlari'][query_res['properties']['id']] = query_res['properties']
+
+            for street in street_data['data']['dataArr']:
+                neighborhood_result['sokaklar'][street['name']] = {'sokakId': street['id']}
+
+            return (neighborhood['name'], neighborhood_result)
+        except Exception as e:
+            logging.error(f"{district['name']} ilçesindeki {neighborhood['name']} mahallesi işlenirken hata: {e}")
+            return (neighborhood['name'], None)
+
+    async def process_district_async(self,
+                                     city_code: int,
+                                     city_name: str,
+                                     district: Dict[str, Any],
+                                     district_data: Dict[str, Any],
+                                     progress: tqdm) -> None:
+        """
+        Fetch a district's neighborhoods and process them all concurrently.
+
+        Args:
+            city_code (int): City code
+            city_name (str): City name
+            district (Dict[str, Any]): District information
+            district_data (Dict[str, Any]): Output dict of the district to fill in
+            progress (tqdm): City progress bar
+        """
+        neighborhood_data = await self.fetch_data_async(
+            f"ilKodu={city_code}&ilceKodu={district['id']}&islem=mahalleKodu"
+        )
+        neighborhoods = neighborhood_data['data']['dataArr']
+
+        logging.info(f"{district['name']} ilçesi {len(neighborhoods)} mahalle ile işleniyor")
+        pending = self.resume_neighborhoods(city_code, district, neighborhoods, district_data['mahalleler'])
+        for _ in district_data['mahalleler']:
+            self.count_neighborhood(city_name, 'resumed')
+        progress.total += len(pending)
+        progress.refresh()
+
+        async def run_one(neighborhood: Dict[str, Any]) -> Tuple[str, Optional[Dict[str, Any]]]:
+            neighborhood_name, result = await self.process_neighborhood_async(city_code, district, neighborhood)
+            self.count_neighborhood(city_name, 'ok' if result is not None else 'error')
+            if self.journal is not None:
+                self.journal.record_neighborhood(city_code, district, neighborhood, result)
+            progress.update(1)
+            return (neighborhood_name, result)
+
+        results = await asyncio.gather(*(run_one(neighborhood) for neighborhood in pending))
+        for neighborhood_name, result in results:
+            if result is not None:
+                district_data['mahalleler'][neighborhood_name] = result
+
+        logging.info(f"İlçe tamamlandı: {district['name']}")
+
+    async def process_city_async(self, city_code: int, city_name: str) -> None:
+        """
+        Process a city with all of its districts in flight at once.
+
+        Args:
+            city_code (int): City code
+            city_name (str): City name
+        """
+        start_time = time.time()
+        logging.info(f"{city_name} işlemeye başlandı - Saat: {time.strftime('%H:%M:%S')}")
+
+        if self.rebuild_from_journal(city_code, city_name, start_time):
+            return
+
+        district_data = await self.fetch_data_async(f"ilKodu={city_code}&islem=ilceKodu")
+        districts = district_data['data']['dataArr']
+
+        logging.info(f"{city_name} için {len(districts)} ilçe işlenecek")
+
+        with self.open_city_writer(city_code, city_name) as writer, \
+                tqdm(total=0, desc=f"{city_name} ilerleme") as progress:
+            # Districts finish out of order; each is written as soon as all districts before it
+            # are, which keeps the API's district order without holding the whole city
+            finished: Dict[int, Dict[str, Any]] = {}
+            next_district = 0
+
+            async def run_district(position: int, district: Dict[str, Any]) -> None:
+                nonlocal next_district
+                district_output = {'ilceId': district['id'], 'mahalleler': {}}
+                started = time.perf_counter()
+                await self.process_district_async(city_code, city_name, district, district_output, progress)
+                self.observe_district(city_name, started)
+                finished[position] = district_output
+                while next_district in finished:
+                    output = finished.pop(next_district)
+                    writer.write_district(districts[next_district]['name'], output['ilceId'], output['mahalleler'])
+                    next_district += 1
+
+            await asyncio.gather(*(run_district(position, district) for position, district in enumerate(districts)))
+
+        self.log_city_saved(city_name, writer.path, start_time)
+        # Importing a large city takes a while; its own thread keeps it from taking a request thread
+        await asyncio.get_running_loop().run_in_executor(self._export_executor, self.export_city, writer.path)
+        if self.journal is not None:
+            self.journal.record_city(city_code, city_name, districts)
+
+    async def process_cities_async(self, cities: List[Tuple[int, str]]) -> None:
+        """
+        Process cities so that the next city starts while the previous one drains.
+
+        Args:
+            cities (List[Tuple[int, str]]): Cities in format [(code, name), ...]
+        """
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        city_slots = asyncio.Semaphore(self.max_cities)
+
+        async def run_city(city_code: int, city_name: str) -> None:
+            async with city_slots:
+                cache_stats = CacheStats()
+                started = time.perf_counter()
+                try:
+                    with PointCache.scope(cache_stats):
+                        await self.process_city_async(city_code, city_name)
+                except Exception as e:
+                    logging.error(f"{city_name} işlenirken hata: {e}")
+                    raise
+                finally:
+                    self._city_seconds.set(round(time.perf_counter() - started, 3), il=city_name)
+                self.log_city_stats(city_name, cache_stats)
+
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as self._executor, \
+                ThreadPoolExecutor(max_workers=1) as self._export_executor:
+            await asyncio.gather(*(run_city(city_code, city_name) for city_code, city_name in cities))
+
+    def process_cities(self, cities: List[Tuple[int, str]]) -> None:
+        """
+        Process the given cities through the asyncio pipeline.
+
+        Args:
+            cities (List[Tuple[int, str]]): Cities in format [(code, name), ...]
+        """
+        asyncio.run(self.process_cities_async(cities))
+
+
+if __name__ == "__main__":
+    collector = AsyncGatheringAreaCollector()
+    collector.run()
+    logging.info("Veri toplama işlemi tamamlandı.")
@@ -0,0 +1,457 @@
+"""
+Hot Path Benchmark Suite
+
+This module measures the collector's hot paths and the data access layer
+offline, on the same inputs every run, and compares the numbers with a
+stored baseline so that a change making one of them slower or hungrier is
+flagged. The end-to-end views live in collector_bench.py (whole crawls),
+sampler_bench.py (query counts) and loadtest.py (serve.py).
+
+Fixtures:
+    polygons    synthetic neighborhood polygons around iller/*.json
+                (sampler_bench.synthesize_polygons), or a
+                `sampler_bench.py record` file given with --polygons
+    map pages   map pages from a `collect.py --record` recording given with
+                --recording, or pages mock_afad.py renders at --page-kb
+    city files  the real iller/*.json files
+    transport   mock_afad.MockTransport answering in-process after --latency-ms
+
+Each benchmark is warmed up once and then run for --rounds rounds of at
+least --min-time / --rounds seconds; ops/sec is the median round. One more
+call runs under tracemalloc for the peak of traced memory above the start
+and the number of memory blocks still allocated after it (caches, leaks).
+Against --baseline, an ops/sec drop or a peak growth beyond --tolerance is
+a regression and makes the exit status 1.
+
+    python bench.py --save-baseline              # store the current numbers
+    python bench.py                              # compare with them
+    python bench.py map_extract city_dump --min-time 5
+"""
+
+import argparse
+import gc
+import glob
+import json
+import logging
+import os
+import platform
+import random
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+# tqdm reads its environment overrides at import time; progress bars would only add noise here
+os.environ.setdefault('TQDM_DISABLE', '1')
+
+import numpy as np
+
+from area_store import AreaStore, write_store
+from city_format import load_city_file
+from city_stream import CityStreamWriter, iter_neighborhoods, write_city
+from collect import GatheringAreaCollector
+from metrics import format_table
+from mock_afad import MockAFADServer, MockDataset, MockTransport
+from sampler import AdaptiveSampler
+from sampler_bench import IndexOracle, run_adaptive, synthesize_polygons
+from scraper import AFADScraper
+from spatial_index import GatheringAreaIndex
+
+BASELINE_VERSION = 1
+# Peak memory changes below this many bytes are noise, whatever the ratio
+MEMORY_SLACK = 64 * 1024
+
+
+class Workload(NamedTuple):
+    """A prepared benchmark: one call of `run` does `ops` operations over `size` bytes of input."""
+    run: Callable[[], Any]
+    ops: int
+    size: int = 0
+
+
+class Fixtures:
+    """Inputs shared by the benchmarks, built on first use."""
+
+    def __init__(self, args: argparse.Namespace, workdir: str):
+        self.args = args
+        self.workdir = workdir
+        self.paths = args.files or sorted(glob.glob(os.path.join("iller", "*.json")))
+        if not self.paths:
+            raise FileNotFoundError("Ölçüm için iller/*.json dosyaları gerekli")
+        self._cache: Dict[str, Any] = {}
+
+    def _get(self, name: str, build: Callable[[], Any]) -> Any:
+        if name not in self._cache:
+            self._cache[name] = build()
+        return self._cache[name]
+
+    @property
+    def polygons(self) -> List[Dict[str, Any]]:
+        """Neighborhood polygon records with an `areas` feature list."""
+        def build() -> List[Dict[str, Any]]:
+            if self.args.polygons:
+                with open(self.args.polygons, 'r', encoding='utf-8') as f:
+                    return [json.loads(line) for line in f if line.strip()]
+            return synthesize_polygons(self.paths, self.args.synthetic, self.args.seed)
+        return self._get('polygons', build)
+
+    @property
+    def index(self) -> GatheringAreaIndex:
+        return self._get('index', lambda: GatheringAreaIndex.from_json_files(self.paths))
+
+    @property
+    def pages(self) -> List[str]:
+        """Map page HTML as the scraper receives it."""
+        def build() -> List[str]:
+            if self.args.recording:
+                with open(self.args.recording, 'r', encoding='utf-8') as f:
+                    pages = [exchange['text'] for exchange in map(json.loads, filter(str.strip, f))
+                             if 'toplanmaAlanlari = ' in exchange['text']]
+                if not pages:
+                    raise ValueError(f"Kayıtta harita sayfası yok: {self.args.recording}")
+                return pages
+            server = MockAFADServer(MockDataset(cities=1, districts=2, neighborhoods=25), page_kb=self.args.page_kb)
+            transport = MockTransport(server)
+            scraper = AFADScraper(transport=transport, base_url='http://mock')
+            return [
+                transport.request('POST', f"{scraper.toplanma_alani_url}?submit", data={
+                    'ilKodu': 1, 'ilceKodu': district, 'mahalleKodu': district * 100 + j,
+                    'sokakKodu': '', 'token': scraper.token, 'btn': 'Sorgula',
+                }).text
+                for district in (101, 102) for j in range(1, 26)
+            ]
+        return self._get('pages', build)
+
+    @property
+    def cities(self) -> List[Dict[str, Any]]:
+        """The city files, parsed."""
+        return self._get('cities', lambda: [load_city_file(path) for path in self.paths])
+
+    def mock(self, dataset: MockDataset) -> MockTransport:
+        """A fresh in-process transport over a dataset with the configured latency."""
+        return MockTransport(MockAFADServer(dataset, latency_ms=self.args.latency_ms, page_kb=self.args.page_kb))
+
+
+def bench_vertices(fixtures: Fixtures) -> Workload:
+    """AFADScraper._extract_significant_vertices over the polygons (the fixed five-point sampling)."""
+    polygons = []
+    for record in fixtures.polygons:
+        geometry = record['areas'][0]['geometry']
+        polygons.append(geometry['coordinates'][0] if geometry['type'] == 'MultiPolygon' else geometry['coordinates'])
+
+    def run() -> None:
+        for polygon in polygons:
+            AFADScraper._extract_significant_vertices(polygon)
+    return Workload(run, len(polygons))
+
+
+def bench_sampler(fixtures: Fixtures) -> Workload:
+    """AdaptiveSampler sessions over the polygons, point queries answered by the spatial index."""
+    oracle = IndexOracle(fixtures.index)
+    sampler = AdaptiveSampler()
+    records = fixtures.polygons
+
+    def run() -> None:
+        for record in records:
+            run_adaptive(oracle, sampler, record['areas'])
+    return Workload(run, len(records))
+
+
+def bench_map_extract(fixtures: Fixtures) -> Workload:
+    """The toplanmaAlanlari regex of fetch_map_areas over whole map pages, and the JSON decode of its match."""
+    pages = fixtures.pages
+
+    def run() -> None:
+        for page in pages:
+            match = re.search(r'toplanmaAlanlari = (.*);', page)
+            json.loads(match.group(1))
+    return Workload(run, len(pages), sum(len(page.encode('utf-8')) for page in pages))
+
+
+def bench_city_dump(fixtures: Fixtures) -> Workload:
+    """Writing the real cities through write_city, as save_city does."""
+    cities = fixtures.cities
+    output = os.path.join(fixtures.workdir, 'dump.json')
+
+    def run() -> None:
+        for city in cities:
+            write_city(output, city)
+    return Workload(run, len(cities), sum(os.path.getsize(path) for path in fixtures.paths))
+
+
+def bench_query_points(fixtures: Fixtures) -> Workload:
+    """AFADScraper.query_points fanning 200 point queries out to a thread pool over the mock transport."""
+    dataset = MockDataset(cities=1, districts=4, neighborhoods=50)
+    scraper = AFADScraper(pool_size=fixtures.args.max_workers, transport=fixtures.mock(dataset), base_url='http://mock')
+    rng = random.Random(fixtures.args.seed)
+    points = [(26.0 + rng.uniform(0, 0.15), 36.0 + rng.uniform(0, 0.15)) for _ in range(200)]
+
+    def run() -> None:
+        scraper.query_points(points)
+    return Workload(run, len(points))
+
+
+def bench_collect_district(fixtures: Fixtures) -> Workload:
+    """GatheringAreaCollector.collect_district: neighborhood fan-out, map pages, sampling and streaming output."""
+    dataset = MockDataset(cities=1, districts=1, neighborhoods=30)
+    cwd = os.getcwd()
+    # The collector creates iller/ and its log file in the working directory
+    os.chdir(fixtures.workdir)
+    try:
+        collector = GatheringAreaCollector(max_workers=fixtures.args.max_workers, point_cache=None,
+                                           transport=fixtures.mock(dataset), base_url='http://mock')
+    finally:
+        os.chdir(cwd)
+    district = dataset.district_list(1)[0]
+    output = os.path.join(fixtures.workdir, 'district.json')
+
+    def run() -> None:
+        with CityStreamWriter(output, 'Şehir 01', 1) as writer:
+            collector.collect_district(1, 'Şehir 01', district, writer)
+    return Workload(run, dataset.neighborhoods)
+
+
+def bench_json_load(fixtures: Fixtures) -> Workload:
+    """load_city_file over the real city files."""
+    paths = fixtures.paths
+
+    def run() -> None:
+        for path in paths:
+            load_city_file(path)
+    return Workload(run, len(paths), sum(os.path.getsize(path) for path in paths))
+
+
+def bench_stream_read(fixtures: Fixtures) -> Workload:
+    """iter_neighborhoods over the real city files; one op is one neighborhood."""
+    paths = fixtures.paths
+    neighborhoods = sum(1 for path in paths for _ in iter_neighborhoods(path))
+
+    def run() -> None:
+        for path in paths:
+            for _ in iter_neighborhoods(path):
+                pass
+    return Workload(run, neighborhoods, sum(os.path.getsize(path) for path in paths))
+
+
+def bench_store_open(fixtures: Fixtures) -> Workload:
+    """Opening the binary store of the real files and looking a neighborhood up."""
+    path = os.path.join(fixtures.workdir, 'iller.bin')
+    write_store(fixtures.paths, path)
+    with AreaStore(path) as store:
+        district = store.districts(0)[0]
+        names = (store.string(store.city_name[0]), store.string(store.district_name[district]),
+                 store.string(store.neighborhood_name[store.neighborhoods(district)[0]]))
+
+    def run() -> None:
+        with AreaStore(path) as store:
+            store.find(*names)
+    return Workload(run, 1)
+
+
+def bench_nearest(fixtures: Fixtures) -> Workload:
+    """GatheringAreaIndex.nearest_batch, k=3, for 10000 points around the collected areas."""
+    index = fixtures.index
+    rng = np.random.default_rng(fixtures.args.seed)
+    picks = rng.integers(0, len(index), 10_000)
+    lats = index.lat[picks] + rng.normal(0, 0.02, len(picks))
+    lngs = index.lng[picks] + rng.normal(0, 0.02, len(picks))
+
+    def run() -> None:
+        index.nearest_batch(lats, lngs, 3)
+    return Workload(run, len(picks))
+
+
+BENCHMARKS: Dict[str, Callable[[Fixtures], Workload]] = {
+    'vertices': bench_vertices,
+    'sampler': bench_sampler,
+    'map_extract': bench_map_extract,
+    'city_dump': bench_city_dump,
+    'query_points': bench_query_points,
+    'collect_district': bench_collect_district,
+    'json_load': bench_json_load,
+    'stream_read': bench_stream_read,
+    'store_open': bench_store_open,
+    'nearest': bench_nearest,
+}
+
+
+def measure(workload: Workload, min_time: float, rounds: int) -> Dict[str, Any]:
+    """
+    Time a workload and trace the memory of one call.
+
+    Args:
+        workload (Workload): Prepared benchmark
+        min_time (float): Total seconds of timed calls, split over the rounds
+        rounds (int): Number of rounds; the median is reported
+
+    Returns:
+        Dict[str, Any]: ops/sec (median, min, max), MB/s if the input size is known,
+        peak traced memory and blocks left allocated by one call
+    """
+    workload.run()
+    rates = []
+    for _ in range(rounds):
+        calls = 0
+        started = time.perf_counter()
+        while True:
+            workload.run()
+            calls += 1
+            elapsed = time.perf_counter() - started
+            if elapsed >= min_time / rounds:
+                break
+        rates.append(workload.ops * calls / elapsed)
+
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    tracemalloc.start()
+    start_size, _ = tracemalloc.get_traced_memory()
+    workload.run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    gc.collect()
+
+    ops_per_second = statistics.median(rates)
+    result = {
+        'ops_sn': round(ops_per_second, 1),
+        'ops_sn_min': round(min(rates), 1),
+        'ops_sn_max': round(max(rates), 1),
+        'tepe_bellek_kb': round((peak - start_size) / 1024, 1),
+        'kalan_blok': sys.getallocatedblocks() - blocks,
+    }
+    if workload.size:
+        result['mb_sn'] = round(workload.size / workload.ops * ops_per_second / 1e6, 1)
+    return result
+
+
+def environment() -> Dict[str, Any]:
+    """What the numbers depend on besides the code."""
+    return {
+        'python': platform.python_version(), 'numpy': np.__version__,
+        'platform': platform.platform(), 'cpu': os.cpu_count(),
+    }
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Mark every result against its baseline.
+
+    Args:
+        results (Dict[str, Dict[str, Any]]): Measurements by benchmark, annotated in place
+        baseline (Dict[str, Any]): Stored baseline file contents
+        tolerance (float): Allowed relative ops/sec drop and peak memory growth
+
+    Returns:
+        List[str]: Descriptions of the regressions
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get('sonuclar', {}).get(name)
+        if base is None:
+            result['durum'] = 'yeni'
+            continue
+        change = result['ops_sn'] / base['ops_sn'] - 1
+        result['degisim_yuzde'] = round(100 * change, 1)
+        problems = []
+        if change < -tolerance:
+            problems.append(f"ops/sn %{-100 * change:.1f} düştü ({base['ops_sn']:.1f} -> {result['ops_sn']:.1f})")
+        growth = (result['tepe_bellek_kb'] - base['tepe_bellek_kb']) * 1024
+        if growth > MEMORY_SLACK and result['tepe_bellek_kb'] > base['tepe_bellek_kb'] * (1 + tolerance):
+            problems.append(f"tepe bellek {base['tepe_bellek_kb']} KB -> {result['tepe_bellek_kb']} KB")
+        result['durum'] = 'GERİLEME' if problems else ('iyileşme' if change > tolerance else 'ok')
+        regressions.extend(f"{name}: {problem}" for problem in problems)
+    return regressions
+
+
+def load_baseline(path: str) -> Optional[Dict[str, Any]]:
+    """The stored baseline, None if there is none yet."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        return None
+    if baseline.get('version') != BASELINE_VERSION:
+        raise ValueError(f"Desteklenmeyen referans dosyası sürümü: {baseline.get('version')}")
+    return baseline
+
+
+def save_baseline(path: str, results: Dict[str, Dict[str, Any]], baseline: Optional[Dict[str, Any]]) -> None:
+    """Store the results as the new baseline, keeping the benchmarks that were not run."""
+    stored = dict(baseline.get('sonuclar', {})) if baseline else {}
+    for name, result in results.items():
+        stored[name] = {key: result[key] for key in ('ops_sn', 'tepe_bellek_kb', 'kalan_blok', 'mb_sn') if key in result}
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'version': BASELINE_VERSION, 'ortam': environment(),
+                   'tarih': time.strftime('%Y-%m-%d %H:%M:%S'), 'sonuclar': stored}, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+
+
+def main() -> None:
+    """Run the benchmarks from the command line."""
+    parser = argparse.ArgumentParser(description="Toplayıcının sıcak yollarını ve veri erişim katmanını ağsız ölçer")
+    parser.add_argument("benchmarks", nargs="*",
+                        help=f"Çalıştırılacak ölçümler (varsayılan: hepsi): {', '.join(BENCHMARKS)}")
+    parser.add_argument("--min-time", type=float, default=2.0, help="Ölçüm başına en az toplam süre (sn)")
+    parser.add_argument("--rounds", type=int, default=5, help="Tur sayısı; ortanca tur raporlanır")
+    parser.add_argument("--baseline", default="bench_baseline.json", help="Referans sonuç dosyası")
+    parser.add_argument("--save-baseline", action="store_true", help="Sonuçları referans olarak kaydet")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Gerileme sayılmadan önce izin verilen göreli ops/sn düşüşü ve bellek artışı")
+    parser.add_argument("--json", help="Tüm sonuçların yazılacağı JSON dosyası")
+    parser.add_argument("--polygons", help="sampler_bench.py record ile kaydedilmiş mahalle sınırları (JSONL)")
+    parser.add_argument("--synthetic", type=int, default=300, help="Kayıt yoksa üretilecek sentetik sınır sayısı")
+    parser.add_argument("--recording", help="Harita sayfaları için collect.py --record kaydı (JSONL)")
+    parser.add_argument("--page-kb", type=int, default=40, help="Kayıt yoksa üretilen HTML sayfalarının boyutu (KB)")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Sahte taşıyıcının ortalama yanıt gecikmesi (ms)")
+    parser.add_argument("--max-workers", type=int, default=10, help="Sahte taşıyıcı ölçümlerinde eşzamanlı istek sayısı")
+    parser.add_argument("--seed", type=int, default=7, help="Sentetik girdiler için rastgele tohum")
+    parser.add_argument("--files", nargs="+", help="Şehir dosyaları (varsayılan: iller/*.json)")
+    args = parser.parse_args()
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"bilinmeyen ölçüm: {', '.join(unknown)}")
+
+    logging.disable(logging.WARNING)
+    names = args.benchmarks or list(BENCHMARKS)
+    baseline = load_baseline(args.baseline)
+    if baseline is not None and baseline.get('ortam') != environment() and not args.save_baseline:
+        print(f"Uyarı: referans farklı bir ortamda alınmış: {baseline.get('ortam')}", file=sys.stderr)
+
+    workdir = tempfile.mkdtemp(prefix='bench_')
+    results: Dict[str, Dict[str, Any]] = {}
+    try:
+        fixtures = Fixtures(args, workdir)
+        for name in names:
+            print(f"{name}...", file=sys.stderr)
+            results[name] = measure(BENCHMARKS[name](fixtures), args.min_time, args.rounds)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    regressions = compare(results, baseline, args.tolerance) if baseline is not None and not args.save_baseline else []
+    rows = [
+        [name, r['ops_sn'], r.get('degisim_yuzde'), r.get('mb_sn'), r['tepe_bellek_kb'], r['kalan_blok'], r.get('durum')]
+        for name, r in results.items()
+    ]
+    print(format_table(['ölçüm', 'ops/sn', 'değişim %', 'MB/sn', 'tepe bellek KB', 'kalan blok', 'durum'], rows))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'ortam': environment(), 'sonuclar': results}, f, ensure_ascii=False, indent=2)
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results, baseline)
+        print(f"Referans kaydedildi: {args.baseline}")
+    elif baseline is None:
+        print(f"Referans yok; --save-baseline ile {args.baseline} oluşturulabilir")
+    if regressions:
+        print("Gerilemeler:\n  " + "\n  ".join(regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Normalized City File Format
+
+This module provides the normalized variant of the published city JSON.
+In the nested format the full property dict of a gathering area is copied
+into every neighborhood whose sample points hit it; the normalized format
+stores every area once in a top-level `toplanmaAlanlari` table keyed by id
+and lets neighborhoods list area ids only. A few areas come back from AFAD
+with slightly different properties in different neighborhoods; such a copy
+is kept inline in the neighborhood's list instead of its id, so the
+conversion is lossless:
+
+    {
+      "Hatay": {"ilId": 31, "ilceler": {"ANTAKYA": {"ilceId": 2080, "mahalleler": {
+          "AKASYA": {"mahalleId": 99748, "sokaklar": {...}, "toplanmaAlanlari": [151436035, ...]}}}}},
+      "toplanmaAlanlari": {"151436035": {"tesis_adi": ..., "x": ..., "y": ..., "id": 151436035}}
+    }
+
+load_city_file() reads either format and always returns the nested shape,
+so readers do not need to care which one a file is in.
+"""
+
+import argparse
+import glob
+import json
+import os
+import time
+import tracemalloc
+from typing import Any, Dict, List
+
+import unidecode
+
+AREA_TABLE = 'toplanmaAlanlari'
+
+
+def name_key(name: str) -> str:
+    """Case, diacritic and whitespace insensitive key of an il/ilçe/mahalle/sokak name."""
+    return ' '.join(unidecode.unidecode(name).upper().split())
+
+
+def is_normalized(data: Dict[str, Any]) -> bool:
+    """Return whether parsed city data is in the normalized format."""
+    return isinstance(data.get(AREA_TABLE), dict)
+
+
+def normalize_neighborhood(neighborhood: Dict[str, Any], table: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Replace a neighborhood's areas with references into a shared table.
+
+    Args:
+        neighborhood (Dict[str, Any]): Neighborhood data in the nested format
+        table (Dict[str, Dict[str, Any]]): Area table keyed by id, extended in place
+
+    Returns:
+        Dict[str, Any]: Neighborhood data with area ids (or inline copies that differ from the table)
+    """
+    area_ids = []
+    for area_id, area in neighborhood['toplanmaAlanlari'].items():
+        shared = table.setdefault(str(area_id), area)
+        area_ids.append(int(area_id) if shared == area else area)
+    return {**neighborhood, 'toplanmaAlanlari': area_ids}
+
+
+def denormalize_neighborhood(neighborhood: Dict[str, Any], table: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Resolve a normalized neighborhood's area references.
+
+    Args:
+        neighborhood (Dict[str, Any]): Neighborhood data in the normalized format
+        table (Dict[str, Dict[str, Any]]): Area table keyed by id
+
+    Returns:
+        Dict[str, Any]: Neighborhood data in the nested format
+    """
+    areas = {}
+    for ref in neighborhood['toplanmaAlanlari']:
+        if isinstance(ref, dict):
+            areas[str(ref['id'])] = ref
+        else:
+            areas[str(ref)] = table[str(ref)]
+    return {**neighborhood, 'toplanmaAlanlari': areas}
+
+
+def normalize_city(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert nested city data to the normalized format.
+
+    Args:
+        data (Dict[str, Any]): City data in the nested format ({city_name: {...}})
+
+    Returns:
+        Dict[str, Any]: City data with a shared gathering area table
+    """
+    table: Dict[str, Dict[str, Any]] = {}
+    result: Dict[str, Any] = {}
+    for city_name, city in data.items():
+        districts = {}
+        for district_name, district in city['ilceler'].items():
+            neighborhoods = {
+                neighborhood_name: normalize_neighborhood(neighborhood, table)
+                for neighborhood_name, neighborhood in district['mahalleler'].items()
+            }
+            districts[district_name] = {**district, 'mahalleler': neighborhoods}
+        result[city_name] = {**city, 'ilceler': districts}
+    result[AREA_TABLE] = table
+    return result
+
+
+def denormalize_city(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert normalized city data back to the nested format.
+
+    The property dict of an area is shared, not copied, between the
+    neighborhoods referencing it, so the result also stays smaller in memory.
+
+    Args:
+        data (Dict[str, Any]): City data in the normalized format
+
+    Returns:
+        Dict[str, Any]: City data in the nested format
+    """
+    table = data[AREA_TABLE]
+    result: Dict[str, Any] = {}
+    for city_name, city in data.items():
+        if city_name == AREA_TABLE:
+            continue
+        districts = {}
+        for district_name, district in city['ilceler'].items():
+            neighborhoods = {
+                neighborhood_name: denormalize_neighborhood(neighborhood, table)
+                for neighborhood_name, neighborhood in district['mahalleler'].items()
+            }
+            districts[district_name] = {**district, 'mahalleler': neighborhoods}
+        result[city_name] = {**city, 'ilceler': districts}
+    return result
+
+
+def load_city_file(path: str) -> Dict[str, Any]:
+    """
+    Read a city file in either format.
+
+    Args:
+        path (str): Path of the city file
+
+    Returns:
+        Dict[str, Any]: City data in the nested format
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return denormalize_city(data) if is_normalized(data) else data
+
+
+def _measure_load(encoded: bytes, expand: bool) -> Dict[str, float]:
+    """Parse time and peak allocation of loading an encoded city file."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    data = json.loads(encoded)
+    if expand:
+        denormalize_city(data)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'ms': round(elapsed * 1000, 1), 'bellek_mb': round(peak / 1e6, 1)}
+
+
+def report(paths: List[str]) -> List[Dict[str, Any]]:
+    """
+    Compare size, parse time and memory of the two formats for each city file.
+
+    Args:
+        paths (List[str]): City files in either format
+
+    Returns:
+        List[Dict[str, Any]]: One row per city
+    """
+    rows = []
+    for path in paths:
+        nested = load_city_file(path)
+        normalized = normalize_city(nested)
+        nested_bytes = json.dumps(nested, ensure_ascii=False).encode('utf-8')
+        normalized_bytes = json.dumps(normalized, ensure_ascii=False).encode('utf-8')
+
+        references = sum(
+            len(neighborhood['toplanmaAlanlari'])
+            for city in nested.values()
+            for district in city['ilceler'].values()
+            for neighborhood in district['mahalleler'].values()
+        )
+        rows.append({
+            'dosya': os.path.basename(path),
+            'alan_referansi': references,
+            'benzersiz_alan': len(normalized[AREA_TABLE]),
+            'ic_ice_kb': round(len(nested_bytes) / 1024),
+            'normalize_kb': round(len(normalized_bytes) / 1024),
+            'boyut_kazanci_yuzde': round(100 * (1 - len(normalized_bytes) / len(nested_bytes)), 1),
+            'ic_ice_okuma': _measure_load(nested_bytes, expand=False),
+            'normalize_okuma': _measure_load(normalized_bytes, expand=False),
+            'normalize_okuma_ve_acma': _measure_load(normalized_bytes, expand=True),
+        })
+    return rows
+
+
+def main() -> None:
+    """Convert city files or report the savings of the normalized format."""
+    parser = argparse.ArgumentParser(description="Normalize edilmiş şehir dosyası biçimi")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    convert = subparsers.add_parser("convert", help="Şehir dosyalarını normalize ya da iç içe biçime dönüştür")
+    convert.add_argument("--to", choices=["normalized", "nested"], default="normalized", help="Hedef biçim")
+    convert.add_argument("--output-dir", required=True, help="Dönüştürülen dosyaların yazılacağı klasör")
+    convert.add_argument("files", nargs="*", help="Şehir dosyaları (varsayılan: iller/*.json)")
+
+    report_parser = subparsers.add_parser("report", help="Şehir başına boyut ve okuma süresi kazancını raporla")
+    report_parser.add_argument("files", nargs="*", help="Şehir dosyaları (varsayılan: iller/*.json)")
+
+    args = parser.parse_args()
+    paths = args.files or sorted(glob.glob(os.path.join("iller", "*.json")))
+
+    if args.command == "convert":
+        os.makedirs(args.output_dir, exist_ok=True)
+        for path in paths:
+            data = load_city_file(path)
+            if args.to == "normalized":
+                data = normalize_city(data)
+            output_path = os.path.join(args.output_dir, os.path.basename(path))
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            print(f"{path} -> {output_path}")
+    else:
+        rows = report(paths)
+        for row in rows:
+            print(json.dumps(row, ensure_ascii=False))
+        nested_total = sum(row['ic_ice_kb'] for row in rows)
+        normalized_total = sum(row['normalize_kb'] for row in rows)
+        if nested_total:
+            print(f"Toplam: {nested_total} KB -> {normalized_total} KB "
+                  f"(%{100 * (1 - normalized_total / nested_total):.1f} daha küçük)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+"""
+Streaming City File I/O
+
+This module provides a writer that appends a city file district by
+district (or neighborhood by neighborhood) as collection progresses, and a
+reader that yields one neighborhood at a time. Neither ever holds a whole
+city in memory; the writer's output is byte-identical to
+`json.dump(all_data, f, ensure_ascii=False)` of the same data, in both the
+nested and the normalized format.
+"""
+
+import json
+import mmap
+import os
+import re
+from typing import Any, Dict, Iterator, Optional, TextIO, Tuple
+
+from city_format import AREA_TABLE, denormalize_neighborhood, normalize_neighborhood
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+def _dumps(value: Any) -> str:
+    """Encode a value the way the collector's json.dump does."""
+    return json.dumps(value, ensure_ascii=False)
+
+
+class CityStreamWriter:
+    """
+    Write a city file incrementally.
+
+    Data goes to a temporary file next to the target, which only replaces
+    the target once close() succeeds, so a crash or an exception never
+    leaves a truncated city file behind. Used as a context manager the
+    writer closes on success and aborts on an exception.
+    """
+
+    def __init__(self, path: str, city_name: str, city_code: int, normalized: bool = False):
+        """
+        Start a city file.
+
+        Args:
+            path (str): Output path
+            city_name (str): City name
+            city_code (int): City code
+            normalized (bool): Write the normalized format with a shared area table
+        """
+        self.path = path
+        self._temp_path = f"{path}.tmp"
+        self._file = open(self._temp_path, 'w', encoding='utf-8')
+        # The area table is the only part of a city that stays in memory
+        self._table: Optional[Dict[str, Dict[str, Any]]] = {} if normalized else None
+        self._districts = 0
+        self._neighborhoods = 0
+        self._district_open = False
+        self._file.write('{' + _dumps(city_name) + ': {"ilId": ' + _dumps(city_code) + ', "ilceler": {')
+
+    def begin_district(self, district_name: str, district_id: int) -> None:
+        """
+        Start a district, closing the previous one if still open.
+
+        Args:
+            district_name (str): District name
+            district_id (int): District code
+        """
+        if self._district_open:
+            self.end_district()
+        separator = ', ' if self._districts else ''
+        self._file.write(
+            separator + _dumps(district_name) + ': {"ilceId": ' + _dumps(district_id) + ', "mahalleler": {'
+        )
+        self._districts += 1
+        self._neighborhoods = 0
+        self._district_open = True
+
+    def write_neighborhood(self, neighborhood_name: str, data: Dict[str, Any]) -> None:
+        """
+        Append a neighborhood to the open district.
+
+        Args:
+            neighborhood_name (str): Neighborhood name
+            data (Dict[str, Any]): Neighborhood data in the nested format
+
+        Raises:
+            RuntimeError: If no district is open
+        """
+        if not self._district_open:
+            raise RuntimeError("Mahalle yazılmadan önce begin_district çağrılmalı")
+        if self._table is not None:
+            data = normalize_neighborhood(data, self._table)
+        separator = ', ' if self._neighborhoods else ''
+        self._file.write(separator + _dumps(neighborhood_name) + ': ' + _dumps(data))
+        self._neighborhoods += 1
+
+    def end_district(self) -> None:
+        """Close the open district."""
+        self._file.write('}}')
+        self._district_open = False
+
+    def write_district(self, district_name: str, district_id: int, neighborhoods: Dict[str, Any]) -> None:
+        """
+        Write a whole district at once.
+
+        Args:
+            district_name (str): District name
+            district_id (int): District code
+            neighborhoods (Dict[str, Any]): Neighborhood data keyed by name
+        """
+        self.begin_district(district_name, district_id)
+        for neighborhood_name, data in neighborhoods.items():
+            self.write_neighborhood(neighborhood_name, data)
+        self.end_district()
+
+    def close(self) -> None:
+        """Finish the file and move it into place."""
+        if self._district_open:
+            self.end_district()
+        self._file.write('}}')
+        if self._table is not None:
+            self._file.write(', ' + _dumps(AREA_TABLE) + ': ' + _dumps(self._table))
+        self._file.write('}')
+        self._file.close()
+        os.replace(self._temp_path, self.path)
+
+    def abort(self) -> None:
+        """Discard the partial file, leaving any previous version of the target untouched."""
+        self._file.close()
+        os.remove(self._temp_path)
+
+    def __enter__(self) -> 'CityStreamWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def write_city(path: str, data: Dict[str, Any], normalized: bool = False) -> None:
+    """
+    Write in-memory nested city data through a CityStreamWriter.
+
+    Args:
+        path (str): Output path
+        data (Dict[str, Any]): City data in the nested format ({city_name: {...}})
+        normalized (bool): Write the normalized format
+    """
+    (city_name, city), = data.items()
+    with CityStreamWriter(path, city_name, city['ilId'], normalized=normalized) as writer:
+        for district_name, district in city['ilceler'].items():
+            writer.write_district(district_name, district['ilceId'], district['mahalleler'])
+
+
+class _Scanner:
+    """Pull JSON tokens from a text file through a bounded buffer."""
+
+    def __init__(self, f: TextIO, chunk_size: int):
+        self._file = f
+        self._chunk_size = chunk_size
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self, size: Optional[int] = None) -> bool:
+        """Drop consumed text and read another chunk; False at end of file."""
+        if self._eof:
+            return False
+        chunk = self._file.read(size or self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        """Next non-whitespace character without consuming it, '' at end of file."""
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ''
+
+    def _expect(self, char: str) -> None:
+        found = self._peek()
+        if found != char:
+            raise ValueError(f"Geçersiz şehir dosyası: '{char}' beklenirken '{found}' bulundu")
+        self._pos += 1
+
+    def read_value(self) -> Any:
+        """Decode the next complete JSON value."""
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                # Grow the window geometrically so that a large value is not re-parsed once per chunk
+                if not self._fill(max(self._chunk_size, len(self._buffer) - self._pos)):
+                    raise
+                continue
+            # A number ending exactly at the buffer end may continue in the next chunk
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def iter_object(self) -> Iterator[str]:
+        """Yield the keys of the next object; the caller consumes each value before resuming."""
+        self._expect('{')
+        if self._peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            key = self.read_value()
+            self._expect(':')
+            yield key
+            char = self._peek()
+            self._pos += 1
+            if char == '}':
+                return
+            if char != ',':
+                raise ValueError(f"Geçersiz şehir dosyası: ',' ya da '}}' beklenirken '{char}' bulundu")
+
+
+class CityStreamReader:
+    """
+    Iterate the neighborhoods of a city file lazily.
+
+    Works on both formats. For a normalized file the area table, which is
+    small and stored last, is read first straight from the end of the file.
+    City and district codes become available as parsing reaches them.
+    """
+
+    def __init__(self, path: str, chunk_size: int = 64 * 1024):
+        """
+        Initialize the reader.
+
+        Args:
+            path (str): Path of the city file
+            chunk_size (int): Characters read from the file at a time
+        """
+        self.path = path
+        self.chunk_size = chunk_size
+        self.city_name: Optional[str] = None
+        self.city_id: Optional[int] = None
+        self.district_ids: Dict[str, int] = {}
+
+    def area_table(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Read the area table of a normalized file without parsing the rest.
+
+        Returns:
+            Optional[Dict[str, Dict[str, Any]]]: The table, or None for a nested file
+        """
+        if os.path.getsize(self.path) == 0:
+            return None
+        with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            # In a nested file the last "toplanmaAlanlari" belongs to a neighborhood and is followed by
+            # several closing braces; the top-level table of a normalized file is followed by just one
+            start = data.rfind(_dumps(AREA_TABLE).encode('utf-8'))
+            if start < 0:
+                return None
+            tail = data[start:].decode('utf-8')
+        decoder = json.JSONDecoder()
+        try:
+            _, colon = decoder.raw_decode(tail)
+            colon = _WHITESPACE.match(tail, colon).end()
+            if tail[colon] != ':':
+                return None
+            table, end = decoder.raw_decode(tail, _WHITESPACE.match(tail, colon + 1).end())
+        except (json.JSONDecodeError, IndexError):
+            return None
+        if not isinstance(table, dict) or tail[end:].strip() != '}':
+            return None
+        return table
+
+    def __iter__(self) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        """
+        Yield neighborhoods in file order.
+
+        Yields:
+            Tuple[str, str, Dict[str, Any]]: District name, neighborhood name and
+            neighborhood data in the nested format
+        """
+        table = self.area_table()
+        with open(self.path, 'r', encoding='utf-8') as f:
+            scanner = _Scanner(f, self.chunk_size)
+            for key in scanner.iter_object():
+                if key == AREA_TABLE and table is not None:
+                    scanner.read_value()
+                    continue
+                self.city_name = key
+                for city_key in scanner.iter_object():
+                    if city_key != 'ilceler':
+                        value = scanner.read_value()
+                        if city_key == 'ilId':
+                            self.city_id = value
+                        continue
+                    for district_name in scanner.iter_object():
+                        for district_key in scanner.iter_object():
+                            if district_key != 'mahalleler':
+                                value = scanner.read_value()
+                                if district_key == 'ilceId':
+                                    self.district_ids[district_name] = value
+                                continue
+                            for neighborhood_name in scanner.iter_object():
+                                data = scanner.read_value()
+                                if table is not None:
+                                    data = denormalize_neighborhood(data, table)
+                                yield district_name, neighborhood_name, data
+
+
+def iter_neighborhoods(path: str) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+    """
+    Lazily yield (ilçe, mahalle, data) tuples of a city file in either format.
+
+    Args:
+        path (str): Path of the city file
+
+    Returns:
+        Iterator[Tuple[str, str, Dict[str, Any]]]: District name, neighborhood name and data
+    """
+    return iter(CityStreamReader(path))
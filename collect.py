@@ -5,6 +5,9 @@ This module provides a class-based interface to collect data about
 emergency gathering areas in Turkey from the AFAD website.
 """
 
+import argparse
+import contextvars
+import glob
 import json
 import os
 import time
@@ -15,7 +18,12 @@ from typing import Dict, List, Tuple, Any, Optional
 import unidecode
 from tqdm import tqdm
 
-from scraper import AFADScraper
+from address_db import AddressDatabase
+from city_stream import CityStreamWriter, write_city
+from journal import CollectionJournal
+from metrics import DURATION_BUCKETS, MetricsRegistry, MetricsServer, SnapshotWriter, format_table
+from point_cache import CacheStats, PointCache
+from scraper import AFADScraper, RecordingTransport, ReplayTransport, SessionPool, Transport
 
 
 class GatheringAreaCollector:
@@ -26,13 +34,29 @@ class GatheringAreaCollector:
     district and neighborhood data retrieval, and saving results to files.
     """
     
-    def __init__(self, cities_file: str = "cities.json", max_workers: int = 10):
+    def __init__(self,
+                 cities_file: str = "cities.json",
+                 max_workers: int = 10,
+                 point_cache: Optional[PointCache] = None,
+                 journal: Optional[CollectionJournal] = None,
+                 output_format: str = "nested",
+                 transport: Optional[Transport] = None,
+                 base_url: Optional[str] = None,
+                 metrics: Optional[MetricsRegistry] = None,
+                 address_db: Optional[AddressDatabase] = None):
         """
         Initialize the collector.
         
         Args:
             cities_file (str): Path to the JSON file containing city information
             max_workers (int): Maximum number of parallel workers for processing neighborhoods
+            point_cache (Optional[PointCache]): Persistent cache for query_point results
+            journal (Optional[CollectionJournal]): Journal finished neighborhoods are appended to
+            output_format (str): "nested" for the published format, "normalized" for a shared area table
+            transport (Optional[Transport]): Transport for the scraper's requests, e.g. a recording or a replay
+            base_url (Optional[str]): Server to collect from instead of turkiye.gov.tr
+            metrics (Optional[MetricsRegistry]): Registry request and progress metrics are recorded into
+            address_db (Optional[AddressDatabase]): Searchable database every saved city is imported into
         """
         # Set up logging
         logging.basicConfig(
@@ -46,7 +70,19 @@ class GatheringAreaCollector:
         
         self.cities_file = cities_file
         self.max_workers = max_workers
-        self.scraper = AFADScraper()
+        self.scraper = AFADScraper(pool_size=max_workers, point_cache=point_cache,
+                                   transport=transport, base_url=base_url, metrics=metrics)
+        self.metrics = self.scraper.metrics
+        self._city_seconds = self.metrics.gauge('collector_city_seconds', 'Şehrin toplanma süresi (sn)', ('il',))
+        self._district_seconds = self.metrics.histogram(
+            'collector_district_seconds', 'İlçelerin toplanma süresi (sn)', ('il',), buckets=DURATION_BUCKETS
+        )
+        self._neighborhoods = self.metrics.counter(
+            'collector_neighborhoods_total', 'İşlenen mahalleler (ok, error, resumed)', ('il', 'result')
+        )
+        self.journal = journal
+        self.output_format = output_format
+        self.address_db = address_db
         
         # Ensure output directory exists
         os.makedirs("iller", exist_ok=True)
@@ -112,7 +148,8 @@ class GatheringAreaCollector:
             except Exception as e:
                 if attempt < max_retries - 1:
                     logging.warning(f"Hata sonrası yeniden deneme {attempt+1}/{max_retries}: {e}")
-                    time.sleep(2 * (attempt + 1))  # Exponential backoff
+                    self.scraper.count_retry('get_data', 'error')
+                    self.scraper.limiter.sleep_backoff(attempt + 1)  # Jittered exponential backoff
                 else:
                     logging.error(f"{max_retries} deneme sonrası veri çekilemedi: {e}")
                     raise RuntimeError(f"Veri çekme işlemi başarısız oldu: {e}")
@@ -164,7 +201,64 @@ class GatheringAreaCollector:
     
     def process_city(self, city_code: int, city_name: str) -> None:
         """
-        Process a city to collect all its emergency gathering areas data.
+        Process a city and report how much the point cache saved for it.
+        
+        Args:
+            city_code (int): City code
+            city_name (str): City name
+        """
+        cache_stats = CacheStats()
+        started = time.perf_counter()
+        try:
+            with PointCache.scope(cache_stats):
+                self.collect_city(city_code, city_name)
+        finally:
+            self._city_seconds.set(round(time.perf_counter() - started, 3), il=city_name)
+        self.log_city_stats(city_name, cache_stats)
+    
+    def count_neighborhood(self, city_name: str, result: str) -> None:
+        """
+        Count a finished neighborhood.
+        
+        Args:
+            city_name (str): City name
+            result (str): "ok", "error" or "resumed"
+        """
+        self._neighborhoods.inc(il=city_name, result=result)
+    
+    def observe_district(self, city_name: str, started: float) -> None:
+        """
+        Record how long a district took.
+        
+        Args:
+            city_name (str): City name
+            started (float): time.perf_counter() at the start of the district
+        """
+        self._district_seconds.observe(time.perf_counter() - started, il=city_name)
+    
+    def log_city_stats(self, city_name: str, cache_stats: CacheStats) -> None:
+        """
+        Log the request controller state and point cache hit rate after a city.
+        
+        Args:
+            city_name (str): City name
+            cache_stats (CacheStats): Cache counters collected while processing the city
+        """
+        limiter = self.scraper.limiter.snapshot()
+        logging.info(
+            f"{city_name} sonrası istek denetleyicisi - Pencere: {limiter['window']}, "
+            f"verim: {limiter['throughput_rps']} istek/sn, hata: {limiter['failures']}, daraltma: {limiter['cuts']}"
+        )
+        if self.scraper.point_cache is None:
+            return
+        logging.info(
+            f"{city_name} nokta önbelleği - İsabet oranı: %{cache_stats.hit_rate * 100:.1f}, "
+            f"kaydedilen istek: {cache_stats.hits}, sunucuya giden: {cache_stats.misses}"
+        )
+    
+    def collect_city(self, city_code: int, city_name: str) -> None:
+        """
+        Collect all emergency gathering areas data of a city.
         
         Args:
             city_code (int): City code
@@ -173,7 +267,8 @@ class GatheringAreaCollector:
         start_time = time.time()
         logging.info(f"{city_name} işlemeye başlandı - Saat: {time.strftime('%H:%M:%S')}")
         
-        all_data = {city_name: {'ilId': city_code, 'ilceler': {}}}
+        if self.rebuild_from_journal(city_code, city_name, start_time):
+            return
         
         # Get districts
         district_data = self.fetch_data_with_retry(f"ilKodu={city_code}&islem=ilceKodu")
@@ -181,63 +276,259 @@ class GatheringAreaCollector:
         
         logging.info(f"{city_name} için {len(districts)} ilçe işlenecek")
         
-        # Process each district
-        for district in districts:
-            all_data[city_name]['ilceler'][district['name']] = {
-                'ilceId': district['id'], 
-                'mahalleler': {}
+        # Neighborhoods are written out as they complete instead of being kept until the city is done
+        with self.open_city_writer(city_code, city_name) as writer:
+            for district in districts:
+                self.collect_district(city_code, city_name, district, writer)
+        
+        self.log_city_saved(city_name, writer.path, start_time)
+        self.export_city(writer.path)
+        if self.journal is not None:
+            self.journal.record_city(city_code, city_name, districts)
+    
+    def collect_district(self,
+                         city_code: int,
+                         city_name: str,
+                         district: Dict[str, Any],
+                         writer: CityStreamWriter) -> None:
+        """
+        Collect all neighborhoods of a district into an open city writer.
+        
+        Args:
+            city_code (int): City code
+            city_name (str): City name
+            district (Dict[str, Any]): District information
+            writer (CityStreamWriter): Writer of the city file the district is appended to
+        """
+        district_started = time.perf_counter()
+        writer.begin_district(district['name'], district['id'])
+        
+        # Get neighborhoods
+        neighborhood_data = self.fetch_data_with_retry(
+            f"ilKodu={city_code}&ilceKodu={district['id']}&islem=mahalleKodu"
+        )
+        neighborhoods = neighborhood_data['data']['dataArr']
+        
+        logging.info(f"{district['name']} ilçesi {len(neighborhoods)} mahalle ile işleniyor")
+        
+        resumed = {}
+        pending = self.resume_neighborhoods(city_code, district, neighborhoods, resumed)
+        for neighborhood_name, result in resumed.items():
+            writer.write_neighborhood(neighborhood_name, result)
+            self.count_neighborhood(city_name, 'resumed')
+        
+        # Process neighborhoods in parallel
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            future_to_neighborhood = {
+                executor.submit(
+                    contextvars.copy_context().run,
+                    self.process_neighborhood, 
+                    city_code, city_name, district, neighborhood
+                ): neighborhood for neighborhood in pending
             }
             
-            # Get neighborhoods
-            neighborhood_data = self.fetch_data_with_retry(
-                f"ilKodu={city_code}&ilceKodu={district['id']}&islem=mahalleKodu"
-            )
-            neighborhoods = neighborhood_data['data']['dataArr']
+            for future in tqdm(
+                as_completed(future_to_neighborhood), 
+                total=len(pending), 
+                desc=f"{district['name']} ilerleme"
+            ):
+                neighborhood_name, result = future.result()
+                self.count_neighborhood(city_name, 'ok' if result is not None else 'error')
+                if self.journal is not None:
+                    self.journal.record_neighborhood(city_code, district, future_to_neighborhood[future], result)
+                if result is not None:
+                    writer.write_neighborhood(neighborhood_name, result)
+        
+        writer.end_district()
+        self.observe_district(city_name, district_started)
+        logging.info(f"İlçe tamamlandı: {district['name']}")
+    
+    def rebuild_from_journal(self, city_code: int, city_name: str, start_time: float) -> bool:
+        """
+        Write a city finished in a previous run straight from the journal.
+        
+        Args:
+            city_code (int): City code
+            city_name (str): City name
+            start_time (float): Time the city processing started at
             
-            logging.info(f"{district['name']} ilçesi {len(neighborhoods)} mahalle ile işleniyor")
+        Returns:
+            bool: True if the city was rebuilt and needs no fetching
+        """
+        if self.journal is None or not self.journal.is_city_done(city_code):
+            return False
+        
+        logging.info(f"{city_name} önceki çalıştırmada tamamlanmış, günlükten yeniden oluşturuluyor")
+        self.save_city(city_name, self.journal.rebuild_city(city_code, city_name), start_time)
+        return True
+    
+    def resume_neighborhoods(self,
+                             city_code: int,
+                             district: Dict[str, Any],
+                             neighborhoods: List[Dict[str, Any]],
+                             district_neighborhoods: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Fill in neighborhoods already collected in a previous run.
+        
+        Args:
+            city_code (int): City code
+            district (Dict[str, Any]): District information
+            neighborhoods (List[Dict[str, Any]]): Neighborhoods of the district
+            district_neighborhoods (Dict[str, Any]): Output dict of the district's neighborhoods
             
-            # Process neighborhoods in parallel
-            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                future_to_neighborhood = {
-                    executor.submit(
-                        self.process_neighborhood, 
-                        city_code, city_name, district, neighborhood
-                    ): neighborhood for neighborhood in neighborhoods
-                }
-                
-                for future in tqdm(
-                    as_completed(future_to_neighborhood), 
-                    total=len(neighborhoods), 
-                    desc=f"{district['name']} ilerleme"
-                ):
-                    neighborhood_name, result = future.result()
-                    if result is not None:
-                        all_data[city_name]['ilceler'][district['name']]['mahalleler'][neighborhood_name] = result
+        Returns:
+            List[Dict[str, Any]]: Neighborhoods that still have to be fetched
+        """
+        if self.journal is None:
+            return neighborhoods
+        
+        pending = []
+        for neighborhood in neighborhoods:
+            result = self.journal.completed_neighborhood(city_code, district['id'], neighborhood['id'])
+            if result is None:
+                pending.append(neighborhood)
+            else:
+                district_neighborhoods[neighborhood['name']] = result
+        
+        if len(pending) < len(neighborhoods):
+            logging.info(
+                f"{district['name']} ilçesinde {len(neighborhoods) - len(pending)} mahalle günlükten alındı, "
+                f"{len(pending)} mahalle çekilecek"
+            )
+        return pending
+    
+    def save_city(self, city_name: str, all_data: Dict[str, Any], start_time: float) -> str:
+        """
+        Write a collected city to its output file and log the elapsed time.
+        
+        Args:
+            city_name (str): City name
+            all_data (Dict[str, Any]): Nested city data in the published JSON format
+            start_time (float): Time the city processing started at
             
-            logging.info(f"İlçe tamamlandı: {district['name']}")
+        Returns:
+            str: Path of the written file
+        """
+        output_filename = self.city_path(city_name)
+        write_city(output_filename, all_data, normalized=self.output_format == "normalized")
+        self.log_city_saved(city_name, output_filename, start_time)
+        self.export_city(output_filename)
+        return output_filename
+    
+    def city_path(self, city_name: str) -> str:
+        """Return the output file path of a city."""
+        return f"iller/{unidecode.unidecode(city_name)}.json"
+    
+    def open_city_writer(self, city_code: int, city_name: str) -> CityStreamWriter:
+        """
+        Start streaming a city to its output file.
         
-        # Save results to file
-        output_filename = f"iller/{unidecode.unidecode(city_name)}.json"
-        with open(output_filename, 'w', encoding='utf-8') as f:
-            json.dump(all_data, f, ensure_ascii=False)
+        Args:
+            city_code (int): City code
+            city_name (str): City name
+            
+        Returns:
+            CityStreamWriter: Writer that replaces the city file once closed
+        """
+        return CityStreamWriter(
+            self.city_path(city_name), city_name, city_code, normalized=self.output_format == "normalized"
+        )
+    
+    def log_city_saved(self, city_name: str, output_filename: str, start_time: float) -> None:
+        """Log the elapsed time and output file of a finished city."""
+        logging.info(f"{city_name} tamamlandı - Süre: {self._format_duration(time.time() - start_time)}")
+        logging.info(f"{city_name} verileri şu dosyaya kaydedildi: {output_filename}")
+    
+    def export_city(self, output_filename: str) -> None:
+        """
+        Import a saved city file into the address database, if one is configured.
         
-        # Calculate and log elapsed time
-        end_time = time.time()
-        elapsed_time = end_time - start_time
+        Args:
+            output_filename (str): Path of the city file
+        """
+        if self.address_db is None:
+            return
+        counts = self.address_db.import_city(output_filename)
+        logging.info(f"{output_filename} adres veritabanına aktarıldı: {counts}")
+    
+    @staticmethod
+    def _format_duration(elapsed_time: float) -> str:
+        """Format a duration in seconds as HH:MM:SS."""
         hours, remainder = divmod(elapsed_time, 3600)
         minutes, seconds = divmod(remainder, 60)
+        return f"{int(hours):02d}:{int(minutes):02d}:{int(seconds):02d}"
+    
+    def metrics_summary(self) -> str:
+        """
+        Render per-endpoint request metrics and per-city timings as text tables.
         
-        logging.info(f"{city_name} tamamlandı - Süre: {int(hours):02d}:{int(minutes):02d}:{int(seconds):02d}")
-        logging.info(f"{city_name} verileri şu dosyaya kaydedildi: {output_filename}")
+        Returns:
+            str: The summary
+        """
+        def value(name: str, **labels: Any) -> float:
+            metric = self.metrics.get(name)
+            if metric is None:
+                return 0
+            return sum(v for metric_labels, v in metric.items()
+                       if all(metric_labels.get(k) == w for k, w in labels.items()))
+        
+        def ms(seconds: Optional[float]) -> Optional[float]:
+            return None if seconds is None else round(seconds * 1000, 1)
+        
+        endpoint_rows = []
+        for labels, summary in self.metrics.get('afad_request_seconds').summaries():
+            endpoint = labels['endpoint']
+            endpoint_rows.append([
+                endpoint, summary['count'], int(value('afad_request_errors_total', endpoint=endpoint)),
+                int(value('afad_retries_total', endpoint=endpoint)),
+                round(value('afad_response_bytes_total', endpoint=endpoint) / 1024),
+                ms(summary['mean']), ms(summary['p50']), ms(summary['p90']), ms(summary['p99']),
+            ])
+        
+        districts = {labels['il']: summary for labels, summary in self._district_seconds.summaries()}
+        city_rows = []
+        for labels, seconds in self._city_seconds.items():
+            city = labels['il']
+            district = districts.get(city, {})
+            city_rows.append([
+                city, round(seconds, 1), district.get('count', 0),
+                int(value('collector_neighborhoods_total', il=city, result='ok')),
+                int(value('collector_neighborhoods_total', il=city, result='error')),
+                int(value('collector_neighborhoods_total', il=city, result='resumed')),
+                district.get('p50'), district.get('p90'),
+            ])
+        
+        tokens = (f"Jeton: {int(value('afad_token_fetches_total'))} sayfa çekildi, "
+                  f"{int(value('afad_token_refresh_requests_total'))} yenileme istendi")
+        return '\n\n'.join([
+            format_table(['uç nokta', 'istek', 'hata', 'yeniden', 'KB', 'ort ms', 'p50 ms', 'p90 ms', 'p99 ms'],
+                         endpoint_rows),
+            tokens,
+            format_table(['il', 'süre sn', 'ilçe', 'mahalle', 'hatalı', 'günlükten', 'ilçe p50 sn', 'ilçe p90 sn'],
+                         city_rows),
+        ])
+    
+    def process_cities(self, cities: List[Tuple[int, str]]) -> None:
+        """
+        Process the given cities one after another.
+        
+        Args:
+            cities (List[Tuple[int, str]]): Cities in format [(code, name), ...]
+        """
+        for city_code, city_name in cities:
+            self.process_city(city_code, city_name)
     
     def run(self) -> None:
         """
         Run the collection process for all cities in the cities file.
         """
         try:
+            start_time = time.time()
             cities = self.load_cities()
-            for city_code, city_name in cities:
-                self.process_city(city_code, city_name)
+            self.process_cities(cities)
+            logging.info(f"Tüm şehirler tamamlandı - Toplam süre: {self._format_duration(time.time() - start_time)}")
+            logging.info(f"Bağlantı ve jeton istatistikleri: {self.scraper.stats()}")
+            logging.info(f"Ölçüm özeti:\n{self.metrics_summary()}")
         except FileNotFoundError as e:
             logging.critical(f"Kritik hata: {e}")
             print(f"Hata: {e}")
@@ -252,7 +543,115 @@ class GatheringAreaCollector:
             exit(1)
 
 
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="AFAD acil toplanma alanı verilerini toplar")
+    parser.add_argument("--cities-file", default="cities.json", help="İşlenecek şehirlerin bulunduğu JSON dosyası")
+    parser.add_argument("--max-workers", type=int, default=10, help="Aynı anda yapılacak en fazla istek sayısı")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="İlçe ve şehir sınırlarında durmayan asyncio motorunu kullan")
+    parser.add_argument("--journal", default="journal/collection.jsonl", help="Tamamlanan mahallelerin yazıldığı günlük dosyası")
+    start = parser.add_mutually_exclusive_group()
+    start.add_argument("--resume", action="store_true",
+                       help="Günlükte tamamlanmış mahalleleri atla, yalnızca eksik ve hatalı olanları yeniden dene")
+    start.add_argument("--fresh", action="store_true",
+                       help="Boş olmayan mevcut günlüğü silip taramaya baştan başla")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Mevcut iller/*.json dosyalarını yenile, yalnızca sınırı değişen mahalleleri yeniden sorgula")
+    parser.add_argument("--refresh-seed", action="store_true",
+                        help="Kayıtlı sınır özeti olmayan mahallelerde mevcut toplanma alanlarını doğru kabul et")
+    parser.add_argument("--format", dest="output_format", choices=["nested", "normalized"], default="nested",
+                        help="Çıktı biçimi: iç içe (yayınlanan biçim) ya da ortak toplanma alanı tablolu normalize biçim")
+    parser.add_argument("--cache", default="cache/query_point.sqlite3", help="Nokta sorgusu önbelleğinin SQLite dosyası")
+    parser.add_argument("--no-cache", action="store_true", help="Nokta sorgusu önbelleğini kullanma")
+    parser.add_argument("--cache-precision", type=int, default=5, help="Önbellek anahtarındaki ondalık basamak sayısı")
+    parser.add_argument("--cache-ttl", type=float, default=24 * 3600, help="Önbellek kayıtlarının saniye cinsinden ömrü")
+    parser.add_argument("--base-url", help="turkiye.gov.tr yerine kullanılacak sunucu (ör. mock_afad.py için http://127.0.0.1:8081)")
+    recording = parser.add_mutually_exclusive_group()
+    recording.add_argument("--record", help="Tüm sunucu yanıtlarını bu JSONL dosyasına kaydet")
+    recording.add_argument("--replay", help="Sunucuya gitmeden --record ile kaydedilmiş yanıtları kullan")
+    parser.add_argument("--metrics-port", type=int,
+                        help="Prometheus metriklerini bu porttan sun (/metrics, /metrics.json)")
+    parser.add_argument("--metrics-json", help="Metriklerin anlık görüntüsünün düzenli olarak yazılacağı JSON dosyası")
+    parser.add_argument("--metrics-interval", type=float, default=10.0, help="JSON anlık görüntü aralığı (sn)")
+    parser.add_argument("--address-db", help="Kaydedilen her şehrin aktarılacağı aranabilir SQLite adres veritabanı")
+    parser.add_argument("--store", help="Toplama bitince iller/*.json dosyalarından yazılacak ikili veri deposu (ör. iller.bin)")
+    parser.add_argument("--tiles", help="Toplama bitince harita karolarının güncelleneceği klasör (ör. tiles)")
+    parser.add_argument("--publish", help="Toplama bitince değişen şehirlerin sıkıştırılıp yayınlanacağı klasör (ör. yayin)")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    collector = GatheringAreaCollector()
-    collector.run()
+    args = parse_args()
+    journal = None
+    if not args.refresh:
+        # Refresh mode does not journal; opening the journal there could only wipe it
+        try:
+            journal = CollectionJournal(args.journal, resume=args.resume, fresh=args.fresh)
+        except FileExistsError as e:
+            raise SystemExit(str(e))
+    point_cache = None
+    if not args.no_cache:
+        point_cache = PointCache(args.cache, precision=args.cache_precision, ttl=args.cache_ttl)
+    transport = None
+    if args.replay:
+        transport = ReplayTransport(args.replay)
+    elif args.record:
+        transport = RecordingTransport(args.record, SessionPool(max_idle=args.max_workers))
+    address_db = AddressDatabase(args.address_db) if args.address_db else None
+    metrics = MetricsRegistry()
+    exporters = []
+    if args.metrics_port is not None:
+        exporters.append(MetricsServer(metrics, port=args.metrics_port).start())
+    if args.metrics_json:
+        exporters.append(SnapshotWriter(metrics, args.metrics_json, args.metrics_interval).start())
+    if args.refresh:
+        from refresh import IncrementalRefresher
+        collector = IncrementalRefresher(
+            args.cities_file, max_workers=args.max_workers, point_cache=point_cache, seed=args.refresh_seed,
+            output_format=args.output_format, transport=transport, base_url=args.base_url,
+            metrics=metrics, address_db=address_db
+        )
+    elif args.use_async:
+        from async_collect import AsyncGatheringAreaCollector
+        collector = AsyncGatheringAreaCollector(
+            args.cities_file, max_in_flight=args.max_workers, point_cache=point_cache, journal=journal,
+            output_format=args.output_format, transport=transport, base_url=args.base_url,
+            metrics=metrics, address_db=address_db
+        )
+    else:
+        collector = GatheringAreaCollector(
+            args.cities_file, max_workers=args.max_workers, point_cache=point_cache, journal=journal,
+            output_format=args.output_format, transport=transport, base_url=args.base_url,
+            metrics=metrics, address_db=address_db
+        )
+    try:
+        collector.run()
+        if args.store:
+            from area_store import write_store
+            counts = write_store(sorted(glob.glob(os.path.join("iller", "*.json"))), args.store)
+            logging.info(f"İkili veri deposu yazıldı: {args.store} - {counts['il']} il, {counts['mahalle']} mahalle, "
+                         f"{counts['sokak']} sokak, {counts['alan']} alan")
+        if args.tiles:
+            from tiles import build_tiles, load_points
+            stats = build_tiles(load_points(store_path=args.store), args.tiles)
+            logging.info(f"Harita karoları güncellendi: {args.tiles} - {stats['toplam']} karo, "
+                         f"{stats['yazilan']} yazıldı, {stats['degismeyen']} değişmedi, {stats['silinen']} silindi")
+        if args.publish:
+            from publish import Publisher
+            result = Publisher(args.publish).publish(sorted(glob.glob(os.path.join("iller", "*.json"))))
+            logging.info(f"Yayın güncellendi: {args.publish} - {len(result['degisen'])} şehir değişti, "
+                         f"{result['degismeyen']} değişmedi")
+    finally:
+        if journal is not None:
+            journal.close()
+        collector.scraper.transport.close()
+        for exporter in exporters:
+            exporter.stop()
+        if address_db is not None:
+            address_db.optimize()
+            address_db.close()
+        if point_cache is not None:
+            # Writes the buffered access times the LRU eviction relies on
+            point_cache.close()
     logging.info("Veri toplama işlemi tamamlandı.")
\ No newline at end of file
@@ -0,0 +1,203 @@
+"""
+Collector Throughput Benchmark
+
+This module measures end-to-end collection throughput without network
+access. Each engine (the threaded GatheringAreaCollector and the asyncio
+AsyncGatheringAreaCollector) collects a synthetic country from a
+mock_afad.py server started in a subprocess, or replays a recording made
+with `--record` straight from memory. Every run happens in its own
+temporary directory, so `iller/`, the journal and the log of the checkout
+are never touched.
+
+Reported per engine: wall time, neighborhoods and server requests per
+second, completeness of the output, per-endpoint latency and the scraper's
+token, transport and limiter counters.
+"""
+
+import argparse
+import glob
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from async_collect import AsyncGatheringAreaCollector
+from city_stream import iter_neighborhoods
+from collect import GatheringAreaCollector
+from mock_afad import MockDataset, add_dataset_arguments, dataset_from_args
+from scraper import RecordingTransport, ReplayTransport, SessionPool, Transport
+
+ENGINES = {'threaded': GatheringAreaCollector, 'async': AsyncGatheringAreaCollector}
+
+
+def free_port() -> int:
+    """A TCP port nobody listens on right now."""
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_mock_server(args: argparse.Namespace) -> subprocess.Popen:
+    """
+    Start mock_afad.py in a subprocess and wait until it answers.
+
+    Args:
+        args (argparse.Namespace): Benchmark options; args.url is set to the server
+
+    Returns:
+        subprocess.Popen: The server process
+    """
+    port = free_port()
+    command = [
+        sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mock_afad.py'),
+        '--port', str(port), '--cities', str(args.cities), '--districts', str(args.districts),
+        '--neighborhoods', str(args.neighborhoods), '--streets', str(args.streets), '--areas', str(args.areas),
+        '--point-k', str(args.point_k), '--seed', str(args.seed), '--latency-ms', str(args.latency_ms),
+        '--error-rate', str(args.error_rate), '--token-ttl', str(args.token_ttl), '--page-kb', str(args.page_kb),
+    ]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    args.url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        if server_stats(args.url) is not None:
+            return process
+        time.sleep(0.05)
+    process.kill()
+    raise RuntimeError("Sahte AFAD sunucusu başlatılamadı")
+
+
+def server_stats(url: Optional[str]) -> Optional[Dict[str, int]]:
+    """Request counters of a mock server, None if it is not reachable."""
+    if url is None:
+        return None
+    try:
+        return requests.get(f"{url}/_stats", timeout=1).json()
+    except (requests.RequestException, ValueError):
+        return None
+
+
+def count_output(directory: str) -> Dict[str, int]:
+    """Neighborhoods, streets and distinct gathering areas written under directory/iller."""
+    neighborhoods = streets = 0
+    areas = set()
+    for path in glob.glob(os.path.join(directory, 'iller', '*.json')):
+        for _, _, data in iter_neighborhoods(path):
+            neighborhoods += 1
+            streets += len(data['sokaklar'])
+            areas.update(data['toplanmaAlanlari'])
+    return {'mahalle': neighborhoods, 'sokak': streets, 'alan': len(areas)}
+
+
+def make_transport(args: argparse.Namespace) -> Optional[Transport]:
+    """The transport the scraper should use for one run."""
+    if args.replay:
+        return ReplayTransport(args.replay)
+    if args.record:
+        return RecordingTransport(os.path.abspath(args.record), SessionPool(max_idle=args.max_workers))
+    return None
+
+
+def run_engine(engine: str, dataset: MockDataset, args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Collect the whole dataset with one engine.
+
+    Args:
+        engine (str): Key of ENGINES
+        dataset (MockDataset): Dataset the server serves
+        args (argparse.Namespace): Benchmark options
+
+    Returns:
+        Dict[str, Any]: Measurements of the run
+    """
+    workdir = tempfile.mkdtemp(prefix=f"collector_bench_{engine}_")
+    cwd = os.getcwd()
+    transport = make_transport(args)
+    try:
+        cities_file = os.path.join(workdir, 'cities.json')
+        with open(cities_file, 'w', encoding='utf-8') as f:
+            json.dump(dataset.city_list(), f, ensure_ascii=False)
+        os.chdir(workdir)
+
+        before = server_stats(args.url)
+        kwargs = {'point_cache': None, 'transport': transport, 'base_url': args.url}
+        if engine == 'async':
+            collector = AsyncGatheringAreaCollector(cities_file, max_in_flight=args.max_workers, **kwargs)
+        else:
+            collector = GatheringAreaCollector(cities_file, max_workers=args.max_workers, **kwargs)
+        start = time.perf_counter()
+        collector.process_cities(collector.load_cities())
+        elapsed = time.perf_counter() - start
+        after = server_stats(args.url)
+
+        output = count_output(workdir)
+        result: Dict[str, Any] = {
+            'motor': engine,
+            'sure_sn': round(elapsed, 2),
+            'mahalle_sn': round(output['mahalle'] / elapsed, 1),
+            'cikti': output,
+            'eksik_mahalle': dataset.total_neighborhoods - output['mahalle'],
+            'alan_kapsama': round(output['alan'] / (dataset.total_neighborhoods * dataset.areas), 3),
+            'istemci': collector.scraper.stats(),
+            'uc_noktalar': {
+                labels['endpoint']: summary
+                for labels, summary in collector.metrics.get('afad_request_seconds').summaries()
+            },
+        }
+        if before is not None and after is not None:
+            served = {key: after[key] - before.get(key, 0) for key in after}
+            result['sunucu'] = served
+            result['istek_sn'] = round(served['requests'] / elapsed, 1)
+        return result
+    finally:
+        os.chdir(cwd)
+        if transport is not None:
+            transport.close()
+        if args.keep:
+            print(f"{engine} çıktısı: {workdir}", file=sys.stderr)
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description="Toplayıcının uçtan uca verimini ağsız ölçer")
+    parser.add_argument("--engine", choices=["threaded", "async", "both"], default="both", help="Ölçülecek motor")
+    parser.add_argument("--max-workers", type=int, default=10, help="Aynı anda yapılacak en fazla istek sayısı")
+    add_dataset_arguments(parser)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Sunucu yanıtlarına eklenen ortalama gecikme (ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="503 ile yanıtlanan isteklerin oranı")
+    parser.add_argument("--token-ttl", type=float, default=0.0, help="Jetonun geçerlilik süresi (sn, 0: süresiz)")
+    parser.add_argument("--page-kb", type=int, default=40, help="HTML sayfalarının boyutu (KB)")
+    parser.add_argument("--url", help="Zaten çalışan bir mock_afad.py sunucusu (veri seçenekleri aynı olmalı)")
+    recording = parser.add_mutually_exclusive_group()
+    recording.add_argument("--record", help="Sunucu yanıtlarını bu JSONL dosyasına kaydet")
+    recording.add_argument("--replay", help="Sunucu yerine kayıttan yanıtla")
+    parser.add_argument("--keep", action="store_true", help="Geçici çıktı klasörlerini silme")
+    args = parser.parse_args()
+
+    dataset = dataset_from_args(args)
+    process = None
+    if args.replay:
+        args.url = None
+    elif args.url is None:
+        process = start_mock_server(args)
+
+    engines: List[str] = list(ENGINES) if args.engine == 'both' else [args.engine]
+    try:
+        results = [run_engine(engine, dataset, args) for engine in engines]
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
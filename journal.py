@@ -0,0 +1,207 @@
+"""
+Collection Journal
+
+This module provides an append-only JSONL journal of collected neighborhoods.
+The collector appends one line per neighborhood as soon as it finishes (or
+fails), so an interrupted crawl can be resumed without re-fetching finished
+neighborhoods and a finished city can be rebuilt from the journal alone.
+"""
+
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+# (city code, district id, neighborhood id)
+NeighborhoodKey = Tuple[int, int, int]
+
+
+class CollectionJournal:
+    """
+    An append-only, line-per-record journal of a collection run.
+
+    Only byte offsets are kept in memory; record bodies are read back from the
+    file when needed, so resuming a country-wide crawl stays cheap in RAM.
+    """
+
+    def __init__(self, path: str = "journal/collection.jsonl", resume: bool = False, fresh: bool = False):
+        """
+        Open the journal.
+
+        Args:
+            path (str): Path of the JSONL journal file
+            resume (bool): Keep and index existing records instead of starting a new journal
+            fresh (bool): Allow starting a new journal over an existing non-empty one
+
+        Raises:
+            FileExistsError: If a non-empty journal exists and neither resume nor fresh is set
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self._lock = threading.Lock()
+        # Latest (status, offset) of every neighborhood and offset of every finished city
+        self._neighborhoods: Dict[NeighborhoodKey, Tuple[str, int]] = {}
+        self._cities: Dict[int, int] = {}
+
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        if exists and not resume and not fresh:
+            # The checkpoint of an interrupted crawl must not be wiped by a forgotten --resume
+            raise FileExistsError(
+                f"'{path}' günlüğü boş değil; kaldığı yerden devam etmek için --resume, "
+                f"günlüğü silip baştan başlamak için --fresh kullanın"
+            )
+        if resume and exists:
+            self._load()
+            self._file = open(path, 'ab')
+        else:
+            self._file = open(path, 'wb')
+
+    def _load(self) -> None:
+        """Index the existing journal and cut off a line torn by a crash."""
+        offset = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                self._index(record, offset)
+                offset += len(line)
+
+        if offset != os.path.getsize(self.path):
+            with open(self.path, 'r+b') as f:
+                f.truncate(offset)
+
+    def _index(self, record: Dict[str, Any], offset: int) -> None:
+        """Remember where the latest state of a record's key lives."""
+        if record['tur'] == 'mahalle':
+            key = (record['ilId'], record['ilceId'], record['mahalleId'])
+            self._neighborhoods[key] = (record['durum'], offset)
+        elif record['tur'] == 'il':
+            self._cities[record['ilId']] = offset
+
+    def _append(self, record: Dict[str, Any], sync: bool = False) -> None:
+        """Append a record and flush it to the operating system, and to the disk if sync is set."""
+        line = json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n'
+        with self._lock:
+            offset = self._file.tell()
+            self._file.write(line)
+            self._file.flush()
+            if sync:
+                os.fsync(self._file.fileno())
+            self._index(record, offset)
+
+    def _read(self, offset: int) -> Dict[str, Any]:
+        """Read the record starting at the given offset."""
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+
+    def record_neighborhood(self,
+                            city_code: int,
+                            district: Dict[str, Any],
+                            neighborhood: Dict[str, Any],
+                            result: Optional[Dict[str, Any]]) -> None:
+        """
+        Record the outcome of a neighborhood.
+
+        Args:
+            city_code (int): City code
+            district (Dict[str, Any]): District information
+            neighborhood (Dict[str, Any]): Neighborhood information
+            result (Optional[Dict[str, Any]]): Collected data, or None if processing failed
+        """
+        self._append({
+            'tur': 'mahalle',
+            'ilId': city_code,
+            'ilceId': district['id'],
+            'ilce': district['name'],
+            'mahalleId': neighborhood['id'],
+            'mahalle': neighborhood['name'],
+            'durum': 'tamam' if result is not None else 'hata',
+            'veri': result,
+        })
+
+    def record_city(self, city_code: int, city_name: str, districts: List[Dict[str, Any]]) -> None:
+        """
+        Mark a city as finished and sync the journal to disk, so a power loss keeps the finished city.
+
+        Args:
+            city_code (int): City code
+            city_name (str): City name
+            districts (List[Dict[str, Any]]): Districts of the city in API order
+        """
+        self._append({
+            'tur': 'il',
+            'ilId': city_code,
+            'il': city_name,
+            'ilceler': [{'id': district['id'], 'name': district['name']} for district in districts],
+        }, sync=True)
+
+    def completed_neighborhood(self, city_code: int, district_id: int, neighborhood_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Look up a neighborhood that was already collected successfully.
+
+        Args:
+            city_code (int): City code
+            district_id (int): District code
+            neighborhood_id (int): Neighborhood code
+
+        Returns:
+            Optional[Dict[str, Any]]: Journaled data, or None if the neighborhood is missing or failed
+        """
+        entry = self._neighborhoods.get((city_code, district_id, neighborhood_id))
+        if entry is None or entry[0] != 'tamam':
+            return None
+        return self._read(entry[1])['veri']
+
+    def is_city_done(self, city_code: int) -> bool:
+        """Return whether the city was finished in a previous run without failed neighborhoods."""
+        if city_code not in self._cities:
+            return False
+        return not any(
+            code == city_code and status != 'tamam'
+            for (code, _, _), (status, _) in self._neighborhoods.items()
+        )
+
+    def rebuild_city(self, city_code: int, city_name: str) -> Dict[str, Any]:
+        """
+        Rebuild the nested city output from journaled records only.
+
+        Args:
+            city_code (int): City code
+            city_name (str): City name
+
+        Returns:
+            Dict[str, Any]: City data in the published JSON format
+        """
+        city_record = self._read(self._cities[city_code])
+        all_data = {city_name: {'ilId': city_code, 'ilceler': {}}}
+        district_names = {}
+        for district in city_record['ilceler']:
+            district_names[district['id']] = district['name']
+            all_data[city_name]['ilceler'][district['name']] = {'ilceId': district['id'], 'mahalleler': {}}
+
+        entries = sorted(
+            offset for (code, _, _), (status, offset) in self._neighborhoods.items()
+            if code == city_code and status == 'tamam'
+        )
+        with open(self.path, 'rb') as f:
+            for offset in entries:
+                f.seek(offset)
+                record = json.loads(f.readline())
+                district_name = district_names.get(record['ilceId'])
+                if district_name is not None:
+                    all_data[city_name]['ilceler'][district_name]['mahalleler'][record['mahalle']] = record['veri']
+
+        return all_data
+
+    def close(self) -> None:
+        """Close the journal file."""
+        with self._lock:
+            self._file.close()
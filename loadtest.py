@@ -0,0 +1,142 @@
+"""
+Lookup Service Load Test
+
+This module drives a running `serve.py` instance with many concurrent
+keep-alive connections and reports throughput and latency percentiles.
+Query points are drawn uniformly from a bounding box (by default the
+earthquake region covered by `iller/`).
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Callable, List, Tuple
+from urllib.parse import quote, urlsplit
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return float('nan')
+    rank = max(1, int(round(q / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class LoadTester:
+    """Send requests over persistent connections and record their latencies."""
+
+    def __init__(self, url: str, concurrency: int, total: int, make_request: Callable[[], Tuple[str, str, bytes]]):
+        """
+        Initialize the load test.
+
+        Args:
+            url (str): Base URL of the service
+            concurrency (int): Number of connections sending requests in parallel
+            total (int): Total number of requests to send
+            make_request (Callable[[], Tuple[str, str, bytes]]): Returns (method, path, body) of the next request
+        """
+        parts = urlsplit(url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+        self.concurrency = concurrency
+        self.total = total
+        self.make_request = make_request
+        self.latencies: List[float] = []
+        self.errors = 0
+        self._remaining = total
+
+    async def _worker(self) -> None:
+        """Send requests over one connection until the budget is used up."""
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            while self._remaining > 0:
+                self._remaining -= 1
+                method, path, body = self.make_request()
+                request = (
+                    f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+                ).encode('latin-1') + body
+
+                started = time.perf_counter()
+                writer.write(request)
+                head = await reader.readuntil(b'\r\n\r\n')
+                length = 0
+                for line in head.split(b'\r\n')[1:]:
+                    name, _, value = line.partition(b':')
+                    if name.strip().lower() == b'content-length':
+                        length = int(value)
+                await reader.readexactly(length)
+                self.latencies.append(time.perf_counter() - started)
+                if not head.startswith(b'HTTP/1.1 200'):
+                    self.errors += 1
+        finally:
+            writer.close()
+
+    async def run(self) -> float:
+        """
+        Run the load test.
+
+        Returns:
+            float: Wall clock duration in seconds
+        """
+        started = time.perf_counter()
+        await asyncio.gather(*(self._worker() for _ in range(self.concurrency)))
+        return time.perf_counter() - started
+
+
+def main() -> None:
+    """Run a load test from the command line and print a report."""
+    parser = argparse.ArgumentParser(description="serve.py için yük testi")
+    parser.add_argument("--url", default="http://127.0.0.1:8080", help="Servis adresi")
+    parser.add_argument("--mode", choices=["nearest", "batch", "lookup"], default="nearest", help="Sorgu türü")
+    parser.add_argument("--concurrency", type=int, default=50, help="Eşzamanlı bağlantı sayısı")
+    parser.add_argument("--requests", type=int, default=20000, help="Toplam istek sayısı")
+    parser.add_argument("--batch-size", type=int, default=1000, help="batch modunda istek başına nokta sayısı")
+    parser.add_argument("-k", type=int, default=3, help="Nokta başına döndürülecek alan sayısı")
+    parser.add_argument("--bbox", type=float, nargs=4, default=[35.8, 35.0, 39.0, 41.0],
+                        metavar=("MIN_LAT", "MIN_LNG", "MAX_LAT", "MAX_LNG"), help="Rastgele noktaların alındığı alan")
+    parser.add_argument("--city", action="append", default=[], help="lookup modunda sorgulanacak il (tekrarlanabilir)")
+    args = parser.parse_args()
+
+    min_lat, min_lng, max_lat, max_lng = args.bbox
+
+    def point() -> Tuple[float, float]:
+        return random.uniform(min_lat, max_lat), random.uniform(min_lng, max_lng)
+
+    if args.mode == "nearest":
+        def make_request() -> Tuple[str, str, bytes]:
+            lat, lng = point()
+            return 'GET', f"/nearest?lat={lat:.6f}&lng={lng:.6f}&k={args.k}", b''
+    elif args.mode == "batch":
+        def make_request() -> Tuple[str, str, bytes]:
+            body = json.dumps({'points': [point() for _ in range(args.batch_size)], 'k': args.k})
+            return 'POST', "/nearest", body.encode('utf-8')
+    else:
+        cities = args.city or ["Hatay"]
+
+        def make_request() -> Tuple[str, str, bytes]:
+            return 'GET', f"/iller/{quote(random.choice(cities))}", b''
+
+    tester = LoadTester(args.url, args.concurrency, args.requests, make_request)
+    duration = asyncio.run(tester.run())
+
+    latencies = sorted(tester.latencies)
+    report = {
+        'istek': len(latencies),
+        'hata': tester.errors,
+        'sure_s': round(duration, 2),
+        'istek_per_s': round(len(latencies) / duration, 1),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p90_ms': round(percentile(latencies, 90) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+        'max_ms': round(latencies[-1] * 1000, 2) if latencies else None,
+    }
+    if args.mode == "batch":
+        report['nokta_per_s'] = round(len(latencies) * args.batch_size / duration, 1)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
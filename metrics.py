@@ -0,0 +1,442 @@
+"""
+Collector Metrics
+
+This module provides thread-safe counters, gauges and latency histograms
+that AFADScraper and the collectors record into, with two ways out: a
+Prometheus text endpoint (`/metrics`, plus `/metrics.json`) served from a
+background thread, and a JSON snapshot rewritten to a file periodically.
+
+Histograms use fixed cumulative buckets as Prometheus does; quantiles in
+the snapshot and the end-of-run summary are interpolated within a bucket.
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+DURATION_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+class Metric:
+    """A named family of values, one per combination of label values."""
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        """
+        Initialize the metric.
+
+        Args:
+            name (str): Metric name
+            help_text (str): Description shown in the Prometheus output
+            labels (Sequence[str]): Label names
+        """
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values: Dict[LabelValues, Any] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} etiketleri {self.labels} olmalı, verilen: {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def _label_text(self, key: LabelValues, extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(zip(self.labels, key)) + ([extra] if extra else [])
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+    def items(self) -> List[Tuple[Dict[str, str], Any]]:
+        """Label dicts with their current values."""
+        with self._lock:
+            values = list(self._values.items())
+        return [(dict(zip(self.labels, key)), value) for key, value in values]
+
+    def prometheus(self) -> List[str]:
+        """Lines of the Prometheus text format."""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            lines.append(f"{self.name}{self._label_text(key)} {_format_value(value)}")
+        return lines
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-serializable state."""
+        return {'type': self.kind, 'values': [{'labels': labels, 'value': value} for labels, value in self.items()]}
+
+
+class Counter(Metric):
+    """A value that only goes up."""
+
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        """Add amount to the value of the given labels."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        """Current value of the given labels."""
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Gauge(Metric):
+    """A value that goes up and down, or is read from a function at export time."""
+
+    kind = 'gauge'
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (),
+                 function: Optional[Callable[[], float]] = None):
+        """
+        Initialize the gauge.
+
+        Args:
+            name (str): Metric name
+            help_text (str): Description shown in the Prometheus output
+            labels (Sequence[str]): Label names
+            function (Optional[Callable[[], float]]): Source of the value of an unlabelled gauge
+        """
+        super().__init__(name, help_text, labels)
+        self.function = function
+
+    def set(self, value: float, **labels: Any) -> None:
+        """Replace the value of the given labels."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        """Raise the value of the given labels."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: Any) -> None:
+        """Lower the value of the given labels."""
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track(self, **labels: Any) -> Iterator[None]:
+        """Count the enclosed block as in progress."""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def items(self) -> List[Tuple[Dict[str, str], Any]]:
+        if self.function is not None:
+            return [({}, self.function())]
+        return super().items()
+
+    def prometheus(self) -> List[str]:
+        if self.function is None:
+            return super().prometheus()
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}",
+                f"{self.name} {_format_value(self.function())}"]
+
+
+class Histogram(Metric):
+    """Distribution of observed values over fixed cumulative buckets."""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        """
+        Initialize the histogram.
+
+        Args:
+            name (str): Metric name
+            help_text (str): Description shown in the Prometheus output
+            labels (Sequence[str]): Label names
+            buckets (Sequence[float]): Upper bounds of the buckets, ascending
+        """
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets) + (math.inf,)
+
+    def observe(self, value: float, **labels: Any) -> None:
+        """Add an observation to the series of the given labels."""
+        key = self._key(labels)
+        # First bucket whose upper bound holds the value
+        position = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0, value, value]
+            state[0][position] += 1
+            state[1] += value
+            state[2] += 1
+            state[3] = min(state[3], value)
+            state[4] = max(state[4], value)
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """Observe the duration of the enclosed block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _summary(self, counts: List[int], total: float, count: int, low: float, high: float) -> Dict[str, Any]:
+        summary = {'count': count, 'sum': round(total, 6), 'mean': round(total / count, 6) if count else None,
+                   'max': round(high, 6)}
+        for q in (0.5, 0.9, 0.99):
+            # Interpolation can overshoot the observed range when a bucket holds few values
+            estimate = self.quantile(counts, q)
+            summary[f"p{int(q * 100)}"] = None if estimate is None else round(min(max(estimate, low), high), 6)
+        return summary
+
+    def quantile(self, counts: List[int], q: float) -> Optional[float]:
+        """
+        Estimate a quantile from bucket counts.
+
+        Args:
+            counts (List[int]): Per-bucket (not cumulative) counts
+            q (float): Quantile between 0 and 1
+
+        Returns:
+            Optional[float]: Estimate, None without observations
+        """
+        count = sum(counts)
+        if not count:
+            return None
+        rank = q * count
+        seen = 0
+        for i, bucket_count in enumerate(counts):
+            if seen + bucket_count >= rank and bucket_count:
+                low = self.buckets[i - 1] if i else 0.0
+                high = self.buckets[i]
+                if high == math.inf:
+                    return low
+                return round(low + (high - low) * (rank - seen) / bucket_count, 6)
+            seen += bucket_count
+        return self.buckets[-2]
+
+    def summaries(self) -> List[Tuple[Dict[str, str], Dict[str, Any]]]:
+        """Count, sum, mean, max and p50/p90/p99 per label combination."""
+        with self._lock:
+            values = [(key, (list(state[0]), *state[1:])) for key, state in self._values.items()]
+        return [(dict(zip(self.labels, key)), self._summary(*state)) for key, state in sorted(values)]
+
+    def prometheus(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            values = [(key, (list(state[0]), state[1], state[2])) for key, state in sorted(self._values.items())]
+        for key, (counts, total, count) in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{self._label_text(key, ('le', _format_value(bound)))} {cumulative}")
+            lines.append(f"{self.name}_sum{self._label_text(key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{self._label_text(key)} {count}")
+        return lines
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {'type': self.kind, 'values': [{'labels': labels, **summary} for labels, summary in self.summaries()]}
+
+
+class MetricsRegistry:
+    """
+    Named metrics shared by the scraper and the collector.
+
+    Asking for a metric that already exists returns it, so several scrapers
+    can record into one registry.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls: type, name: str, *args: Any, **kwargs: Any) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"{name} zaten {metric.kind} olarak tanımlı")
+            return metric
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+        """Get or create a counter."""
+        return self._get_or_create(Counter, name, help_text, labels)
+
+    def gauge(self, name: str, help_text: str, labels: Sequence[str] = (),
+              function: Optional[Callable[[], float]] = None) -> Gauge:
+        """Get or create a gauge; a given function replaces the previous one."""
+        gauge = self._get_or_create(Gauge, name, help_text, labels)
+        if function is not None:
+            gauge.function = function
+        return gauge
+
+    def histogram(self, name: str, help_text: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        """Get or create a histogram."""
+        return self._get_or_create(Histogram, name, help_text, labels, buckets=buckets)
+
+    def get(self, name: str) -> Optional[Metric]:
+        """Metric registered under name, if any."""
+        with self._lock:
+            return self._metrics.get(name)
+
+    def prometheus_text(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.prometheus())
+        return '\n'.join(lines) + '\n'
+
+    def snapshot(self) -> Dict[str, Any]:
+        """All metrics as one JSON-serializable dict."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {'zaman': time.strftime('%Y-%m-%dT%H:%M:%S'), 'metrikler': {m.name: m.snapshot() for m in metrics}}
+
+
+class MetricsServer:
+    """Serve `/metrics` (Prometheus text) and `/metrics.json` from a daemon thread."""
+
+    def __init__(self, registry: MetricsRegistry, host: str = "127.0.0.1", port: int = 9108):
+        """
+        Initialize the server.
+
+        Args:
+            registry (MetricsRegistry): Metrics to serve
+            host (str): Address to listen on
+            port (int): Port to listen on
+        """
+        self.registry = registry
+        registry_ref = registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.startswith('/metrics.json'):
+                    body = json.dumps(registry_ref.snapshot(), ensure_ascii=False).encode('utf-8')
+                    content_type = 'application/json; charset=utf-8'
+                elif self.path.startswith('/metrics'):
+                    body = registry_ref.prometheus_text().encode('utf-8')
+                    content_type = 'text/plain; version=0.0.4; charset=utf-8'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def port(self) -> int:
+        """Port actually listened on, useful with port 0."""
+        return self._server.server_address[1]
+
+    def start(self) -> 'MetricsServer':
+        """Start serving in the background."""
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class SnapshotWriter:
+    """Rewrite a JSON snapshot of the registry every `interval` seconds and once more on stop."""
+
+    def __init__(self, registry: MetricsRegistry, path: str, interval: float = 10.0):
+        """
+        Initialize the writer.
+
+        Args:
+            registry (MetricsRegistry): Metrics to write
+            path (str): Snapshot file, replaced atomically
+            interval (float): Seconds between snapshots
+        """
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def write(self) -> None:
+        """Write a snapshot now."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.registry.snapshot(), f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.path)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def start(self) -> 'SnapshotWriter':
+        """Start writing snapshots in the background."""
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the background writer and write a final snapshot."""
+        self._stop.set()
+        self._thread.join()
+        self.write()
+
+
+def format_table(headers: Sequence[str], rows: Sequence[Sequence[Any]]) -> str:
+    """
+    Render rows as a plain text table with right-aligned numbers.
+
+    Args:
+        headers (Sequence[str]): Column titles
+        rows (Sequence[Sequence[Any]]): Table rows
+
+    Returns:
+        str: The table
+    """
+    cells = [[str(h) for h in headers]] + [['-' if v is None else str(v) for v in row] for row in rows]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(headers))]
+    numeric = [all(isinstance(row[i], (int, float)) or row[i] is None for row in rows) for i in range(len(headers))]
+
+    def line(row: List[str]) -> str:
+        return '  '.join(v.rjust(w) if n else v.ljust(w) for v, w, n in zip(row, widths, numeric)).rstrip()
+
+    separator = '  '.join('-' * w for w in widths)
+    return '\n'.join([line(cells[0]), separator] + [line(row) for row in cells[1:]])
@@ -0,0 +1,454 @@
+"""
+Mock AFAD Server
+
+This module serves a synthetic stand-in for the turkiye.gov.tr gathering
+area query pages so that AFADScraper and the collectors can be run and
+measured on one machine without network access. It answers the same four
+kinds of request the scraper sends: the landing page with its
+`data-token`, the `get_data` JSON lists of districts, neighborhoods and
+streets, the map page with the `toplanmaAlanlari = ...;` polygon blob and
+the `getAlanlarForNokta` point query.
+
+The country is generated from a seed: neighborhoods are laid out on a grid
+of 0.01° cells, each with a polygon and a few gathering areas, and a point
+query returns the areas of the cell the point falls in, nearest first.
+Latency, server errors and token expiry can be injected. MockTransport
+answers the same way in-process, without sockets, for benchmarks that
+should measure the client rather than the loopback stack. Point
+`collect.py --base-url` at the server:
+
+    python mock_afad.py --port 8081 --cities 3 --cities-file mock_cities.json
+    python collect.py --base-url http://127.0.0.1:8081 --cities-file mock_cities.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import random
+import secrets
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+
+from scraper import AFADScraper, Transport, build_response
+
+CELL_DEGREES = 0.01
+ORIGIN = (26.0, 36.0)
+MAX_CHILDREN = 99
+MAX_HEADER_BYTES = 16 * 1024
+
+STATUS_TEXT = {200: 'OK', 404: 'Not Found', 405: 'Method Not Allowed', 503: 'Service Unavailable'}
+
+Response = Tuple[int, str, bytes]
+
+
+class MockDataset:
+    """
+    Deterministic synthetic hierarchy and geometry.
+
+    Codes are derived from the parent code so that they stay unique:
+    district = city * 100 + i, neighborhood = district * 100 + j,
+    street and area = neighborhood * 100 + k.
+    """
+
+    def __init__(self,
+                 cities: int = 2,
+                 districts: int = 4,
+                 neighborhoods: int = 10,
+                 streets: int = 8,
+                 areas: int = 6,
+                 point_k: int = 3,
+                 seed: int = 1):
+        """
+        Initialize the dataset.
+
+        Args:
+            cities (int): Number of cities
+            districts (int): Districts per city
+            neighborhoods (int): Neighborhoods per district
+            streets (int): Streets per neighborhood
+            areas (int): Gathering areas per neighborhood
+            point_k (int): Areas returned by a point query
+            seed (int): Seed of the geometry
+
+        Raises:
+            ValueError: If a count does not fit the code scheme
+        """
+        for name, value in (('districts', districts), ('neighborhoods', neighborhoods),
+                            ('streets', streets), ('areas', areas)):
+            if not 1 <= value <= MAX_CHILDREN:
+                raise ValueError(f"{name} 1 ile {MAX_CHILDREN} arasında olmalı")
+        self.cities = cities
+        self.districts = districts
+        self.neighborhoods = neighborhoods
+        self.streets = streets
+        self.areas = areas
+        self.point_k = point_k
+        self.seed = seed
+        self.total_neighborhoods = cities * districts * neighborhoods
+        self.width = math.ceil(math.sqrt(self.total_neighborhoods))
+        self._area_cache: Dict[int, List[Dict[str, Any]]] = {}
+
+    def city_list(self) -> List[Dict[str, Any]]:
+        """Cities in the format of cities.json."""
+        return [{'code': code, 'name': f"Şehir {code:02d}"} for code in range(1, self.cities + 1)]
+
+    def district_list(self, city_code: int) -> List[Dict[str, Any]]:
+        if not 1 <= city_code <= self.cities:
+            return []
+        return [{'id': city_code * 100 + i, 'name': f"İLÇE {i}"} for i in range(1, self.districts + 1)]
+
+    def neighborhood_list(self, district_code: int) -> List[Dict[str, Any]]:
+        if self._cell(district_code * 100 + 1) is None:
+            return []
+        return [{'id': district_code * 100 + j, 'name': f"MAHALLE {j}"} for j in range(1, self.neighborhoods + 1)]
+
+    def street_list(self, neighborhood_code: int) -> List[Dict[str, Any]]:
+        if self._cell(neighborhood_code) is None:
+            return []
+        return [{'id': neighborhood_code * 100 + k, 'name': f"SOKAK {k}"} for k in range(1, self.streets + 1)]
+
+    def _cell(self, neighborhood_code: int) -> Optional[int]:
+        """Grid cell of a neighborhood, None for an unknown code."""
+        district_code, j = divmod(neighborhood_code, 100)
+        city_code, i = divmod(district_code, 100)
+        if not (1 <= city_code <= self.cities and 1 <= i <= self.districts and 1 <= j <= self.neighborhoods):
+            return None
+        return ((city_code - 1) * self.districts + i - 1) * self.neighborhoods + j - 1
+
+    def _center(self, cell: int) -> Tuple[float, float]:
+        row, col = divmod(cell, self.width)
+        return ORIGIN[0] + (col + 0.5) * CELL_DEGREES, ORIGIN[1] + (row + 0.5) * CELL_DEGREES
+
+    def map_features(self, neighborhood_code: int) -> Optional[List[Dict[str, Any]]]:
+        """Boundary features of a neighborhood, as embedded in the map page."""
+        cell = self._cell(neighborhood_code)
+        if cell is None:
+            return None
+        rng = random.Random(self.seed * 1_000_003 + neighborhood_code)
+        cx, cy = self._center(cell)
+        ring = []
+        for v in range(12):
+            angle = 2 * math.pi * v / 12
+            r = CELL_DEGREES * 0.45 * rng.uniform(0.7, 1.0)
+            ring.append([cx + r * math.cos(angle), cy + r * math.sin(angle)])
+        ring.append(ring[0])
+        return [{'type': 'Feature', 'geometry': {'type': 'Polygon', 'coordinates': [ring]},
+                 'properties': {'mahalleKodu': neighborhood_code}}]
+
+    def area_features(self, neighborhood_code: int) -> List[Dict[str, Any]]:
+        """Gathering areas of a neighborhood as point features."""
+        cached = self._area_cache.get(neighborhood_code)
+        if cached is not None:
+            return cached
+        cell = self._cell(neighborhood_code)
+        rng = random.Random(self.seed * 2_000_003 + neighborhood_code)
+        cx, cy = self._center(cell)
+        features = []
+        for k in range(1, self.areas + 1):
+            x = cx + rng.uniform(-0.4, 0.4) * CELL_DEGREES
+            y = cy + rng.uniform(-0.4, 0.4) * CELL_DEGREES
+            features.append({'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': [x, y]}, 'properties': {
+                'tesis_adi': f"TOPLANMA ALANI {k}", 'sokak_adi': f"SOKAK {(k - 1) % self.streets + 1}",
+                'mahalle_adi': f"MAHALLE {neighborhood_code % 100}", 'x': x, 'y': y,
+                'tabela_kod': '0000-000-00', 'id': neighborhood_code * 100 + k,
+            }})
+        self._area_cache[neighborhood_code] = features
+        return features
+
+    def point_features(self, lng: float, lat: float) -> List[Dict[str, Any]]:
+        """The point_k areas nearest to a point within the cell it falls in."""
+        col = math.floor((lng - ORIGIN[0]) / CELL_DEGREES)
+        row = math.floor((lat - ORIGIN[1]) / CELL_DEGREES)
+        if not 0 <= col < self.width:
+            return []
+        cell = row * self.width + col
+        if not 0 <= cell < self.total_neighborhoods:
+            return []
+        rest, j = divmod(cell, self.neighborhoods)
+        city_index, i = divmod(rest, self.districts)
+        neighborhood_code = ((city_index + 1) * 100 + i + 1) * 100 + j + 1
+        features = self.area_features(neighborhood_code)
+        return sorted(features, key=lambda f: (f['properties']['x'] - lng) ** 2 + (f['properties']['y'] - lat) ** 2
+                      )[:self.point_k]
+
+
+class MockAFADServer:
+    """HTTP/1.1 keep-alive server answering the scraper's requests from a MockDataset."""
+
+    def __init__(self,
+                 dataset: MockDataset,
+                 host: str = "127.0.0.1",
+                 port: int = 8081,
+                 latency_ms: float = 0.0,
+                 error_rate: float = 0.0,
+                 token_ttl: float = 0.0,
+                 page_kb: int = 40,
+                 seed: int = 1):
+        """
+        Initialize the server.
+
+        Args:
+            dataset (MockDataset): Data to serve
+            host (str): Address to listen on
+            port (int): Port to listen on
+            latency_ms (float): Mean delay added to every answer, spread uniformly over ±50%
+            error_rate (float): Share of requests answered with a 503 page
+            token_ttl (float): Seconds a token stays valid, 0 for forever
+            page_kb (int): Padding of HTML pages, as the real pages are large
+            seed (int): Seed of the injected errors and delays
+        """
+        self.dataset = dataset
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.token_ttl = token_ttl
+        self.padding = '<!-- ' + 'x' * max(page_kb * 1024 - 9, 0) + ' -->\n'
+        self.random = random.Random(seed)
+        self.tokens: Dict[str, float] = {}
+        self.counters = {
+            'requests': 0, 'token_pages': 0, 'get_data': 0, 'map_pages': 0, 'point_queries': 0,
+            'errors_injected': 0, 'tokens_rejected': 0,
+        }
+
+    def _html(self, body: str) -> Response:
+        return 200, 'text/html; charset=utf-8', (
+            f"<!DOCTYPE html><html><head><title>Acil Toplanma Alanı Sorgulama</title></head><body>\n"
+            f"{self.padding}{body}\n</body></html>"
+        ).encode('utf-8')
+
+    @staticmethod
+    def _json(value: Any) -> Response:
+        return 200, 'application/json; charset=utf-8', json.dumps(value, ensure_ascii=False).encode('utf-8')
+
+    def _landing_page(self) -> Response:
+        token = secrets.token_hex(16)
+        self.tokens[token] = time.monotonic()
+        return self._html(f'<form id="mainForm" data-token="{token}"></form>')
+
+    def _token_valid(self, token: Optional[str]) -> bool:
+        issued = self.tokens.get(token)
+        if issued is None:
+            return False
+        return not self.token_ttl or time.monotonic() - issued < self.token_ttl
+
+    def route(self, method: str, target: str, body: bytes) -> Response:
+        """
+        Answer one request.
+
+        Args:
+            method (str): HTTP method
+            target (str): Request target with query string
+            body (bytes): Urlencoded form body
+
+        Returns:
+            Response: Status, content type and body
+        """
+        parts = urlsplit(target)
+        if parts.path != AFADScraper.TOPLANMA_ALANI_PATH:
+            return 404, 'text/plain; charset=utf-8', b'Bulunamadi'
+        if method == 'GET':
+            self.counters['token_pages'] += 1
+            return self._landing_page()
+        if method != 'POST':
+            return 405, 'text/plain; charset=utf-8', b'Desteklenmeyen istek'
+
+        form = dict(parse_qsl(body.decode('utf-8'), keep_blank_values=True))
+        valid = self._token_valid(form.get('token'))
+        if not valid:
+            self.counters['tokens_rejected'] += 1
+
+        if form.get('islem') == 'getAlanlarForNokta':
+            self.counters['point_queries'] += 1
+            if not valid:
+                return self._landing_page()
+            features = self.dataset.point_features(float(form['lng']), float(form['lat']))
+            return self._json({'type': 'FeatureCollection', 'features': features})
+
+        if form.get('btn') == 'Sorgula':
+            self.counters['map_pages'] += 1
+            if not valid:
+                return self._landing_page()
+            features = self.dataset.map_features(int(form.get('mahalleKodu') or 0))
+            return self._html(f"<script>var toplanmaAlanlari = {json.dumps(features, ensure_ascii=False)};</script>")
+
+        self.counters['get_data'] += 1
+        if not valid:
+            return self._landing_page()
+        operation = form.get('islem')
+        if operation == 'ilceKodu':
+            items = self.dataset.district_list(int(form.get('ilKodu') or 0))
+        elif operation == 'mahalleKodu':
+            items = self.dataset.neighborhood_list(int(form.get('ilceKodu') or 0))
+        elif operation == 'sokakKodu':
+            items = self.dataset.street_list(int(form.get('sokakKodu') or 0))
+        else:
+            items = []
+        return self._json({'data': {'dataArr': items}})
+
+    async def answer(self, method: str, target: str, body: bytes) -> Response:
+        """Route a request after the injected delay, or fail it."""
+        if target.startswith('/_stats'):
+            return self._json({**self.counters, 'tokens_issued': len(self.tokens)})
+        self.counters['requests'] += 1
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms * self.random.uniform(0.5, 1.5) / 1000)
+        if self.random.random() < self.error_rate:
+            self.counters['errors_injected'] += 1
+            return 503, 'text/html; charset=utf-8', b'<html><body>Servis gecici olarak kullanilamiyor</body></html>'
+        return self.route(method, target, body)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve requests of one keep-alive connection."""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    return
+
+                lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, target, version = lines[0].split(' ')
+                except ValueError:
+                    return
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(':')
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                length = int(headers.get('content-length', 0) or 0)
+                request_body = await reader.readexactly(length) if length else b''
+                try:
+                    status, content_type, body = await self.answer(method, target, request_body)
+                except Exception as e:
+                    logging.exception(f"{method} {target} işlenirken hata: {e}")
+                    status, content_type, body = 503, 'text/plain; charset=utf-8', b'Sunucu hatasi'
+
+                writer.write(
+                    f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    return
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self) -> None:
+        """Listen and serve until cancelled."""
+        server = await asyncio.start_server(self.handle, self.host, self.port, limit=MAX_HEADER_BYTES)
+        logging.info(
+            f"{self.dataset.cities} şehir, {self.dataset.total_neighborhoods} mahalle "
+            f"http://{self.host}:{self.port} adresinde sunuluyor"
+        )
+        async with server:
+            await server.serve_forever()
+
+
+class MockTransport(Transport):
+    """
+    Answer the scraper's requests in-process from a MockAFADServer.
+
+    The delay is slept on the calling thread, so a thread pool fanning out
+    requests overlaps them as it would against a slow server.
+    """
+
+    def __init__(self, server: MockAFADServer):
+        """
+        Initialize the transport.
+
+        Args:
+            server (MockAFADServer): Server whose routing, latency, error rate and token expiry are used
+        """
+        self.server = server
+        self.requests = 0
+        # The server keeps its tokens, counters and random state unguarded
+        self._lock = threading.Lock()
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """Route the request to the server after the injected delay."""
+        with self._lock:
+            delay = self.server.latency_ms * self.server.random.uniform(0.5, 1.5) / 1000
+            failed = self.server.random.random() < self.server.error_rate
+        if delay:
+            time.sleep(delay)
+
+        parts = urlsplit(url)
+        target = f"{parts.path}?{parts.query}" if parts.query else parts.path
+        data = kwargs.get('data')
+        body = urlencode(data) if isinstance(data, dict) else (data or '')
+        with self._lock:
+            self.requests += 1
+            self.server.counters['requests'] += 1
+            if failed:
+                self.server.counters['errors_injected'] += 1
+                status, content_type, content = (
+                    503, 'text/html; charset=utf-8', b'<html><body>Servis gecici olarak kullanilamiyor</body></html>'
+                )
+            else:
+                status, content_type, content = self.server.route(method, target, body.encode('utf-8'))
+        return build_response(status, content_type, content.decode('utf-8'), url)
+
+    def stats(self) -> Dict[str, int]:
+        return {'requests': self.requests}
+
+
+def add_dataset_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the MockDataset options to a command line parser."""
+    parser.add_argument("--cities", type=int, default=2, help="Şehir sayısı")
+    parser.add_argument("--districts", type=int, default=4, help="Şehir başına ilçe sayısı")
+    parser.add_argument("--neighborhoods", type=int, default=10, help="İlçe başına mahalle sayısı")
+    parser.add_argument("--streets", type=int, default=8, help="Mahalle başına sokak sayısı")
+    parser.add_argument("--areas", type=int, default=6, help="Mahalle başına toplanma alanı sayısı")
+    parser.add_argument("--point-k", type=int, default=3, help="Bir nokta sorgusunun döndürdüğü alan sayısı")
+    parser.add_argument("--seed", type=int, default=1, help="Rastgele tohum")
+
+
+def dataset_from_args(args: argparse.Namespace) -> MockDataset:
+    """Build the MockDataset described by add_dataset_arguments options."""
+    return MockDataset(args.cities, args.districts, args.neighborhoods, args.streets, args.areas,
+                       point_k=args.point_k, seed=args.seed)
+
+
+def main() -> None:
+    """Run the mock server."""
+    parser = argparse.ArgumentParser(description="Çevrimdışı ölçüm için sahte AFAD sunucusu")
+    parser.add_argument("--host", default="127.0.0.1", help="Dinlenecek adres")
+    parser.add_argument("--port", type=int, default=8081, help="Dinlenecek port")
+    add_dataset_arguments(parser)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Her yanıta eklenen ortalama gecikme (ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="503 ile yanıtlanan isteklerin oranı")
+    parser.add_argument("--token-ttl", type=float, default=0.0, help="Jetonun geçerlilik süresi (sn, 0: süresiz)")
+    parser.add_argument("--page-kb", type=int, default=40, help="HTML sayfalarının boyutu (KB)")
+    parser.add_argument("--cities-file", help="Şehir listesinin collect.py için yazılacağı dosya")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    dataset = dataset_from_args(args)
+    if args.cities_file:
+        with open(args.cities_file, 'w', encoding='utf-8') as f:
+            json.dump(dataset.city_list(), f, ensure_ascii=False, indent=2)
+
+    server = MockAFADServer(dataset, args.host, args.port, latency_ms=args.latency_ms, error_rate=args.error_rate,
+                            token_ttl=args.token_ttl, page_kb=args.page_kb, seed=args.seed)
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
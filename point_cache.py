@@ -0,0 +1,244 @@
+"""
+Persistent query_point Cache
+
+This module provides an on-disk SQLite cache for AFAD point queries. Adjacent
+neighborhoods share boundary vertices, so the collector asks the server about
+the same coordinates over and over; keying the cache by quantized (lng, lat)
+lets all threads, and later runs, reuse those answers.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+
+class CacheStats:
+    """Hit/miss counters for a single scope, e.g. one city of a crawl."""
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups answered from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the counters as a plain dict."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'stores': self.stores,
+            'hit_rate': round(self.hit_rate, 4),
+            'requests_saved': self.hits,
+        }
+
+
+# Counters of the scope the current thread or task is working for
+_scope: ContextVar[Optional[CacheStats]] = ContextVar('point_cache_scope', default=None)
+
+
+class PointCache:
+    """
+    A thread-safe, size-bounded SQLite cache of query_point responses.
+
+    Coordinates are quantized to `precision` decimal places (5 ≈ 1 m), entries
+    older than `ttl` seconds are ignored, and the least recently used entries
+    are evicted once more than `max_entries` are stored. Access times of hits
+    are buffered in memory and written in batches, so lookups do not each
+    commit a transaction.
+    """
+
+    # Buffered access times are written once this many are pending or this many seconds passed
+    ACCESS_FLUSH_SIZE = 1000
+    ACCESS_FLUSH_SECONDS = 30.0
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS points (
+            precision INTEGER NOT NULL,
+            lng_q INTEGER NOT NULL,
+            lat_q INTEGER NOT NULL,
+            response TEXT NOT NULL,
+            created REAL NOT NULL,
+            accessed REAL NOT NULL,
+            PRIMARY KEY (precision, lng_q, lat_q)
+        );
+        CREATE INDEX IF NOT EXISTS points_accessed ON points (accessed);
+    """
+
+    def __init__(self,
+                 path: str = "cache/query_point.sqlite3",
+                 precision: int = 5,
+                 ttl: float = 24 * 3600,
+                 max_entries: int = 500_000):
+        """
+        Open (or create) the cache.
+
+        Args:
+            path (str): SQLite file path
+            precision (int): Number of decimal places coordinates are rounded to
+            ttl (float): Maximum age of a usable entry in seconds
+            max_entries (int): Number of entries above which old entries are evicted
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.precision = precision
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        self._count = self._conn.execute("SELECT COUNT(*) FROM points").fetchone()[0]
+        # key -> last access time of hits not yet written to the database
+        self._accessed: Dict[Tuple[int, int, int], float] = {}
+        self._flushed = time.monotonic()
+
+    def _key(self, lng: float, lat: float) -> Tuple[int, int, int]:
+        """Quantize a coordinate pair into a cache key."""
+        scale = 10 ** self.precision
+        return (self.precision, round(lng * scale), round(lat * scale))
+
+    def _count_hit(self, hit: bool) -> None:
+        """Update global and scoped counters; the caller holds the lock."""
+        for stats in (self.stats, _scope.get()):
+            if stats is None:
+                continue
+            if hit:
+                stats.hits += 1
+            else:
+                stats.misses += 1
+
+    def get(self, lng: float, lat: float) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response.
+
+        Args:
+            lng (float): Longitude of the point
+            lat (float): Latitude of the point
+
+        Returns:
+            Optional[Dict[str, Any]]: Cached response or None on a miss
+        """
+        key = self._key(lng, lat)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created FROM points WHERE precision=? AND lng_q=? AND lat_q=?", key
+            ).fetchone()
+            hit = row is not None and now - row[1] <= self.ttl
+            self._count_hit(hit)
+            if not hit:
+                return None
+            self._accessed[key] = now
+            if (len(self._accessed) >= self.ACCESS_FLUSH_SIZE
+                    or time.monotonic() - self._flushed >= self.ACCESS_FLUSH_SECONDS):
+                self._flush_accessed()
+                self._conn.commit()
+        return json.loads(row[0])
+
+    def _flush_accessed(self) -> None:
+        """Write the buffered access times; the caller holds the lock and commits."""
+        if self._accessed:
+            self._conn.executemany(
+                "UPDATE points SET accessed=? WHERE precision=? AND lng_q=? AND lat_q=?",
+                [(accessed, *key) for key, accessed in self._accessed.items()]
+            )
+            self._accessed.clear()
+        self._flushed = time.monotonic()
+
+    def set(self, lng: float, lat: float, response: Dict[str, Any]) -> None:
+        """
+        Store a response, evicting the least recently used entries if needed.
+
+        Args:
+            lng (float): Longitude of the point
+            lat (float): Latitude of the point
+            response (Dict[str, Any]): query_point response to cache
+        """
+        key = self._key(lng, lat)
+        now = time.time()
+        payload = json.dumps(response, ensure_ascii=False)
+        with self._lock:
+            # Eviction below needs up to date access times
+            self._flush_accessed()
+            inserted = self._conn.execute(
+                "INSERT OR IGNORE INTO points VALUES (?, ?, ?, ?, ?, ?)", (*key, payload, now, now)
+            ).rowcount
+            if not inserted:
+                self._conn.execute(
+                    "UPDATE points SET response=?, created=?, accessed=? WHERE precision=? AND lng_q=? AND lat_q=?",
+                    (payload, now, now, *key)
+                )
+            self._count += inserted
+
+            for stats in (self.stats, _scope.get()):
+                if stats is not None:
+                    stats.stores += 1
+
+            if self._count > self.max_entries:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """Drop expired entries, then the least recently used ones down to 90% of the limit."""
+        expired = self._conn.execute(
+            "DELETE FROM points WHERE created < ?", (time.time() - self.ttl,)
+        ).rowcount
+        self._count -= expired
+        self.evictions += expired
+
+        excess = self._count - int(self.max_entries * 0.9)
+        if excess > 0:
+            removed = self._conn.execute(
+                "DELETE FROM points WHERE rowid IN (SELECT rowid FROM points ORDER BY accessed LIMIT ?)",
+                (excess,)
+            ).rowcount
+            self._count -= removed
+            self.evictions += removed
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self) -> None:
+        """Write the buffered access times and close the underlying database."""
+        with self._lock:
+            self._flush_accessed()
+            self._conn.commit()
+            self._conn.close()
+
+    @staticmethod
+    @contextmanager
+    def scope(stats: CacheStats) -> Iterator[CacheStats]:
+        """
+        Count lookups made in the current context into `stats` as well.
+
+        Worker threads only see the scope if they run inside a copy of the
+        caller's context (see contextvars.copy_context).
+
+        Args:
+            stats (CacheStats): Counters to update
+
+        Yields:
+            CacheStats: The same counters
+        """
+        token = _scope.set(stats)
+        try:
+            yield stats
+        finally:
+            _scope.reset(token)
@@ -0,0 +1,257 @@
+"""
+Precompressed City File Publishing
+
+This module prepares `iller/*.json` for mirrors and CDNs. Each city is
+canonicalized (sorted keys, no whitespace) so that the same data always
+gives the same bytes, hashed with SHA-256 and written under a
+content-addressed name together with gzip and zstd variants:
+
+    yayin/manifest.json
+    yayin/iller/Hatay.3f2a9c1e07b4.json
+    yayin/iller/Hatay.3f2a9c1e07b4.json.gz
+    yayin/iller/Hatay.3f2a9c1e07b4.json.zst
+
+A city whose hash did not change since the last run is not compressed or
+written again, and its entry in the manifest (hash, sizes, ETag and
+Last-Modified) stays as it was, so consumers compare the manifest with
+what they have and download only the changed cities, in the encoding they
+prefer. File names change with the content, so they can be cached forever;
+the files of the version before the current one are kept for consumers
+still holding the previous manifest, older ones are removed.
+
+zstd variants need the `zstandard` package; without it only gzip is written.
+"""
+
+import argparse
+import glob
+import gzip
+import hashlib
+import json
+import logging
+import os
+import time
+from email.utils import formatdate
+from typing import Any, Dict, Iterable, List, Optional
+
+from city_format import load_city_file, normalize_city
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+MANIFEST_VERSION = 1
+GZIP_LEVEL = 9
+ZSTD_LEVEL = 19
+# Hex digits of the hash used in file names
+NAME_HASH_LENGTH = 12
+
+
+def canonical_json(data: Dict[str, Any]) -> bytes:
+    """
+    Encode city data so that equal data always gives equal bytes.
+
+    Args:
+        data (Dict[str, Any]): City data
+
+    Returns:
+        bytes: UTF-8 JSON with sorted keys and no whitespace
+    """
+    return json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+
+def compress(content: bytes) -> Dict[str, bytes]:
+    """
+    Build the precompressed variants of a file.
+
+    Both are deterministic: the gzip header carries no timestamp or name.
+
+    Args:
+        content (bytes): Canonical JSON
+
+    Returns:
+        Dict[str, bytes]: Encoded content by Content-Encoding ('gzip', and 'zstd' if available)
+    """
+    variants = {'gzip': gzip.compress(content, compresslevel=GZIP_LEVEL, mtime=0)}
+    if zstandard is not None:
+        variants['zstd'] = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(content)
+    return variants
+
+
+EXTENSIONS = {'identity': '', 'gzip': '.gz', 'zstd': '.zst'}
+# Variants written for every city
+ENCODINGS = ['identity', 'gzip'] + (['zstd'] if zstandard is not None else [])
+
+
+class Publisher:
+    """Publish city files into a directory with a manifest, rewriting only what changed."""
+
+    def __init__(self, output_dir: str = "yayin", output_format: str = "nested"):
+        """
+        Initialize the publisher.
+
+        Args:
+            output_dir (str): Directory of the manifest and the iller/ files
+            output_format (str): "nested" (the published format) or "normalized"
+        """
+        self.output_dir = output_dir
+        self.output_format = output_format
+        self.manifest_path = os.path.join(output_dir, 'manifest.json')
+
+    def load_manifest(self) -> Dict[str, Any]:
+        """The manifest of the previous run, or an empty one if missing or for another format."""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {'iller': {}}
+        if manifest.get('version') != MANIFEST_VERSION or manifest.get('format') != self.output_format:
+            return {'iller': {}, 'stale': manifest.get('iller', {})}
+        return manifest
+
+    def _write(self, relative_path: str, content: bytes) -> None:
+        path = os.path.join(self.output_dir, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + '.tmp', 'wb') as f:
+            f.write(content)
+        os.replace(path + '.tmp', path)
+
+    def _remove(self, entry: Optional[Dict[str, Any]]) -> None:
+        """Delete the files of a manifest entry."""
+        for variant in (entry or {}).get('files', {}).values():
+            try:
+                os.remove(os.path.join(self.output_dir, variant['path']))
+            except FileNotFoundError:
+                pass
+
+    def _files_exist(self, entry: Dict[str, Any]) -> bool:
+        return all(os.path.exists(os.path.join(self.output_dir, variant['path']))
+                   for variant in entry.get('files', {}).values())
+
+    def publish_city(self, name: str, path: str, previous: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Publish one city file.
+
+        Args:
+            name (str): Name of the city in the manifest (the file name without extension)
+            path (str): City file in either format
+            previous (Optional[Dict[str, Any]]): Manifest entry of the previous run
+
+        Returns:
+            Dict[str, Any]: Manifest entry; the previous one when the content did not change
+        """
+        data = load_city_file(path)
+        if self.output_format == 'normalized':
+            data = normalize_city(data)
+        content = canonical_json(data)
+        digest = hashlib.sha256(content).hexdigest()
+
+        if previous is not None and previous['sha256'] == digest:
+            if set(previous['files']) == set(ENCODINGS) and self._files_exist(previous):
+                return previous
+            # Same content with files missing or another set of encodings: rewrite it as the same version
+            earlier = previous.get('previous')
+        else:
+            earlier = None if previous is None else {key: value for key, value in previous.items() if key != 'previous'}
+
+        stem = f"iller/{name}.{digest[:NAME_HASH_LENGTH]}.json"
+        variants = {'identity': content, **compress(content)}
+        files = {}
+        for encoding, encoded in variants.items():
+            relative_path = stem + EXTENSIONS[encoding]
+            self._write(relative_path, encoded)
+            encoded_digest = hashlib.sha256(encoded).hexdigest()
+            # Every representation needs its own ETag; the entry's own one is that of the plain JSON
+            files[encoding] = {
+                'path': relative_path,
+                'bytes': len(encoded),
+                'sha256': encoded_digest,
+                'etag': f'"{encoded_digest[:32]}"',
+            }
+
+        return {
+            'sha256': digest,
+            'etag': f'"{digest[:32]}"',
+            'last_modified': formatdate(usegmt=True),
+            'content_type': 'application/json; charset=utf-8',
+            'bytes': len(content),
+            'files': files,
+            # Kept until the next change, for consumers holding the previous manifest
+            'previous': earlier,
+        }
+
+    def publish(self, paths: Iterable[str]) -> Dict[str, Any]:
+        """
+        Publish city files and write the manifest.
+
+        Args:
+            paths (Iterable[str]): City files; cities missing from them are removed from the output
+
+        Returns:
+            Dict[str, Any]: Counts of changed, unchanged and removed cities and bytes before and after compression
+        """
+        manifest = self.load_manifest()
+        previous = manifest.get('iller', {})
+        cities: Dict[str, Dict[str, Any]] = {}
+        changed: List[str] = []
+
+        for path in paths:
+            name = os.path.splitext(os.path.basename(path))[0]
+            entry = self.publish_city(name, path, previous.get(name))
+            cities[name] = entry
+            if entry is not previous.get(name):
+                changed.append(name)
+                # Only one earlier version is kept; drop the files of the one before it
+                superseded = previous.get(name, {}).get('previous')
+                kept = {entry['sha256'], (entry['previous'] or {}).get('sha256')}
+                if superseded is not None and superseded['sha256'] not in kept:
+                    self._remove(superseded)
+                logging.info(f"{name} yayınlandı: {entry['sha256'][:NAME_HASH_LENGTH]}, "
+                             + ", ".join(f"{encoding} {variant['bytes'] / 1024:.0f} KB"
+                                         for encoding, variant in entry['files'].items()))
+
+        removed = [name for name in previous if name not in cities]
+        for name in removed:
+            self._remove(previous[name])
+            self._remove(previous[name].get('previous'))
+        for entry in manifest.get('stale', {}).values():
+            self._remove(entry)
+            self._remove(entry.get('previous'))
+
+        totals = {
+            encoding: sum(entry['files'][encoding]['bytes'] for entry in cities.values() if encoding in entry['files'])
+            for encoding in EXTENSIONS
+        }
+        self._write('manifest.json', json.dumps({
+            'version': MANIFEST_VERSION,
+            'format': self.output_format,
+            'generated': formatdate(usegmt=True),
+            'bytes': totals,
+            'iller': cities,
+        }, ensure_ascii=False, indent=2, sort_keys=True).encode('utf-8'))
+        return {'degisen': changed, 'degismeyen': len(cities) - len(changed), 'silinen': removed, 'bayt': totals}
+
+
+def main() -> None:
+    """Publish the city files from the command line."""
+    parser = argparse.ArgumentParser(description="iller/*.json dosyalarını sıkıştırılmış ve içerik adresli olarak yayınlar")
+    parser.add_argument("--output-dir", default="yayin", help="Yayın klasörü")
+    parser.add_argument("--format", dest="output_format", choices=["nested", "normalized"], default="nested",
+                        help="Yayınlanacak biçim")
+    parser.add_argument("files", nargs="*", help="Şehir dosyaları (varsayılan: iller/*.json)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if zstandard is None:
+        logging.warning("zstandard paketi kurulu değil; yalnızca gzip sürümleri yazılacak")
+    started = time.perf_counter()
+    result = Publisher(args.output_dir, args.output_format).publish(
+        args.files or sorted(glob.glob(os.path.join("iller", "*.json")))
+    )
+    sizes = ", ".join(f"{encoding} {size / 1e6:.1f} MB" for encoding, size in result['bayt'].items() if size)
+    logging.info(f"{len(result['degisen'])} şehir değişti, {result['degismeyen']} değişmedi, "
+                 f"{len(result['silinen'])} kaldırıldı ({sizes}) - {time.perf_counter() - started:.1f} sn")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Adaptive Request Rate Control
+
+This module provides an AIMD (additive increase, multiplicative decrease)
+concurrency limiter shared by every request path of AFADScraper, plus the
+jittered backoff used between retries.
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Tuple
+
+# (window epoch the request started in, start time)
+Ticket = Tuple[int, float]
+
+
+class AdaptiveLimiter:
+    """
+    Limits the number of requests in flight with an AIMD window.
+
+    Every healthy response grows the window by `increase / window`, i.e. about
+    `increase` per round trip of a full window. An error, an unexpected
+    content type (AFAD answers throttled requests with HTML error pages) or a
+    latency spike shrinks it by `decrease`. Only one cut is made per window
+    epoch, so a burst of failures from requests that were already in flight
+    does not collapse the window to its minimum.
+    """
+
+    def __init__(self,
+                 initial: float = 10,
+                 min_limit: int = 1,
+                 max_limit: int = 10,
+                 increase: float = 1.0,
+                 decrease: float = 0.5,
+                 spike_factor: float = 3.0,
+                 backoff_base: float = 1.0,
+                 backoff_cap: float = 30.0,
+                 rate_window: float = 30.0):
+        """
+        Initialize the limiter.
+
+        Args:
+            initial (float): Starting window size
+            min_limit (int): Smallest allowed window
+            max_limit (int): Largest allowed window
+            increase (float): Additive increase per window of successful requests
+            decrease (float): Multiplicative factor applied on congestion
+            spike_factor (float): Latency over this multiple of the baseline counts as congestion
+            backoff_base (float): Base delay in seconds of the retry backoff
+            backoff_cap (float): Maximum retry backoff in seconds
+            rate_window (float): Period in seconds throughput is measured over
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.spike_factor = spike_factor
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.rate_window = rate_window
+
+        self._window = float(min(max(initial, min_limit), max_limit))
+        self._in_flight = 0
+        self._epoch = 0
+        self._baseline = None
+        self._samples = 0
+        self._completed = 0
+        self._failures = 0
+        self._cuts = 0
+        self._recent = deque()
+        self._created = time.monotonic()
+        self._condition = threading.Condition()
+
+    @property
+    def window(self) -> float:
+        """Current window size."""
+        return self._window
+
+    def acquire(self) -> Ticket:
+        """
+        Block until the window has room for another request.
+
+        Returns:
+            Ticket: Token to pass back to release()
+        """
+        with self._condition:
+            while self._in_flight >= max(int(self._window), self.min_limit):
+                self._condition.wait()
+            self._in_flight += 1
+            return (self._epoch, time.monotonic())
+
+    def release(self, ticket: Ticket, ok: bool) -> None:
+        """
+        Report the outcome of a request and adjust the window.
+
+        Args:
+            ticket (Ticket): Value returned by acquire()
+            ok (bool): Whether the response was a healthy one
+        """
+        epoch, started = ticket
+        now = time.monotonic()
+        latency = now - started
+
+        with self._condition:
+            self._in_flight -= 1
+            self._completed += 1
+            self._recent.append(now)
+            while self._recent and now - self._recent[0] > self.rate_window:
+                self._recent.popleft()
+
+            spike = (
+                ok and self._baseline is not None and self._samples >= 20
+                and latency > self._baseline * self.spike_factor
+            )
+            if ok:
+                self._samples += 1
+                self._baseline = latency if self._baseline is None else 0.95 * self._baseline + 0.05 * latency
+            else:
+                self._failures += 1
+
+            if not ok or spike:
+                if epoch == self._epoch:
+                    self._window = max(self.min_limit, self._window * self.decrease)
+                    self._epoch += 1
+                    self._cuts += 1
+            else:
+                self._window = min(self.max_limit, self._window + self.increase / self._window)
+
+            self._condition.notify_all()
+
+    def backoff_delay(self, attempt: int) -> float:
+        """
+        Full-jitter exponential backoff delay.
+
+        Args:
+            attempt (int): Zero-based retry attempt
+
+        Returns:
+            float: Seconds to wait before the next attempt
+        """
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def sleep_backoff(self, attempt: int) -> None:
+        """Sleep for backoff_delay(attempt) seconds."""
+        time.sleep(self.backoff_delay(attempt))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Report the controller state for tuning.
+
+        Returns:
+            Dict[str, Any]: Window, in-flight count, throughput and latency baseline
+        """
+        with self._condition:
+            now = time.monotonic()
+            recent = sum(1 for t in self._recent if now - t <= self.rate_window)
+            span = max(min(self.rate_window, now - self._created), 1e-9)
+            return {
+                'window': round(self._window, 2),
+                'in_flight': self._in_flight,
+                'completed': self._completed,
+                'failures': self._failures,
+                'cuts': self._cuts,
+                'throughput_rps': round(recent / span, 2),
+                'baseline_latency_ms': round(self._baseline * 1000, 1) if self._baseline is not None else None,
+            }
@@ -0,0 +1,377 @@
+"""
+AFAD Emergency Gathering Areas Incremental Refresh
+
+This module provides a refresh mode for the collector that starts from the
+existing `iller/*.json` files. Street lists and neighborhood polygons are
+cheap to fetch, so they are re-read every time; the expensive query_point
+fan-out only runs for neighborhoods that are new or whose polygon changed.
+Every refreshed city also gets a machine-readable diff of its gathering areas.
+"""
+
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+
+import unidecode
+from tqdm import tqdm
+
+from address_db import AddressDatabase
+from city_stream import CityStreamReader
+from collect import GatheringAreaCollector
+from metrics import MetricsRegistry
+from point_cache import PointCache
+from scraper import Transport
+
+
+class IncrementalRefresher(GatheringAreaCollector):
+    """
+    Refresh already collected cities, re-querying only what changed.
+
+    Polygon hashes of the last refresh are kept per city in `state_dir`.
+    A neighborhood without a stored hash counts as changed unless `seed`
+    is set, in which case its current polygon is trusted to match the
+    existing file and only the hash is recorded.
+    """
+
+    def __init__(self,
+                 cities_file: str = "cities.json",
+                 max_workers: int = 10,
+                 point_cache: Optional[PointCache] = None,
+                 state_dir: str = "refresh_state",
+                 diff_dir: str = "diffs",
+                 seed: bool = False,
+                 output_format: str = "nested",
+                 transport: Optional[Transport] = None,
+                 base_url: Optional[str] = None,
+                 metrics: Optional[MetricsRegistry] = None,
+                 address_db: Optional[AddressDatabase] = None):
+        """
+        Initialize the refresher.
+
+        Args:
+            cities_file (str): Path to the JSON file containing city information
+            max_workers (int): Maximum number of parallel workers for processing neighborhoods
+            point_cache (Optional[PointCache]): Persistent cache for query_point results
+            state_dir (str): Directory the per-city polygon hashes are kept in
+            diff_dir (str): Directory the per-city diffs are written to
+            seed (bool): Trust existing areas of neighborhoods that have no stored polygon hash
+            output_format (str): "nested" for the published format, "normalized" for a shared area table
+            transport (Optional[Transport]): Transport for the scraper's requests, e.g. a recording or a replay
+            base_url (Optional[str]): Server to collect from instead of turkiye.gov.tr
+            metrics (Optional[MetricsRegistry]): Registry request and progress metrics are recorded into
+            address_db (Optional[AddressDatabase]): Searchable database every saved city is imported into
+        """
+        super().__init__(cities_file, max_workers=max_workers, point_cache=point_cache, output_format=output_format,
+                         transport=transport, base_url=base_url, metrics=metrics, address_db=address_db)
+        self.state_dir = state_dir
+        self.diff_dir = diff_dir
+        self.seed = seed
+        os.makedirs(state_dir, exist_ok=True)
+        os.makedirs(diff_dir, exist_ok=True)
+
+    @staticmethod
+    def polygon_hash(areas: Optional[List[Dict[str, Any]]]) -> Optional[str]:
+        """
+        Hash the map features of a neighborhood independently of key order.
+
+        Args:
+            areas (Optional[List[Dict[str, Any]]]): Features returned by fetch_map_areas
+
+        Returns:
+            Optional[str]: Hex digest, or None if the neighborhood has no polygon
+        """
+        if not areas:
+            return None
+        canonical = json.dumps(areas, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def _read_json(self, path: str) -> Optional[Dict[str, Any]]:
+        """Read a JSON file, returning None if it does not exist."""
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def refresh_neighborhood(self,
+                             city_code: int,
+                             district: Dict[str, Any],
+                             neighborhood: Dict[str, Any],
+                             previous: Optional[Dict[str, Any]],
+                             previous_hash: Optional[str]) -> Tuple[str, Optional[Dict[str, Any]], Optional[str], bool]:
+        """
+        Refresh a single neighborhood.
+
+        Args:
+            city_code (int): City code
+            district (Dict[str, Any]): District information
+            neighborhood (Dict[str, Any]): Neighborhood information
+            previous (Optional[Dict[str, Any]]): Neighborhood data from the existing file
+            previous_hash (Optional[str]): Polygon hash stored by the last refresh
+
+        Returns:
+            Tuple[str, Optional[Dict[str, Any]], Optional[str], bool]: Neighborhood name, refreshed
+            data (None on error), current polygon hash and whether point queries were made
+        """
+        try:
+            neighborhood_result = {
+                'mahalleId': neighborhood['id'],
+                'sokaklar': {},
+                'toplanmaAlanlari': {}
+            }
+
+            street_data = self.fetch_data_with_retry(
+                f"ilKodu={city_code}&ilceKodu={district['id']}&sokakKodu={neighborhood['id']}&islem=sokakKodu"
+            )
+            for street in street_data['data']['dataArr']:
+                neighborhood_result['sokaklar'][street['name']] = {'sokakId': street['id']}
+
+            areas = self.scraper.fetch_map_areas(city_code, district['id'], neighborhood['id'])
+            current_hash = self.polygon_hash(areas)
+
+            unchanged = previous is not None and (
+                current_hash == previous_hash or (previous_hash is None and self.seed)
+            )
+            if unchanged:
+                neighborhood_result['toplanmaAlanlari'] = previous['toplanmaAlanlari']
+                return (neighborhood['name'], neighborhood_result, current_hash, False)
+
+            query_results = self.scraper.query_map_areas(areas)
+            if query_results is not None:
+                for query_res in query_results:
+                    neighborhood_result['toplanmaAlanlari'][query_res['properties']['id']] = query_res['properties']
+
+            return (neighborhood['name'], neighborhood_result, current_hash, True)
+        except Exception as e:
+            logging.error(f"{district['name']} ilçesindeki {neighborhood['name']} mahallesi yenilenirken hata: {e}")
+            return (neighborhood['name'], None, previous_hash, False)
+
+    def collect_city(self, city_code: int, city_name: str) -> None:
+        """
+        Refresh a city from its existing output, falling back to a full crawl.
+
+        Both the existing file and the refreshed one are streamed, so only the
+        district being refreshed and the deduplicated areas the diff needs are
+        held in memory.
+
+        Args:
+            city_code (int): City code
+            city_name (str): City name
+        """
+        existing_path = self.city_path(city_name)
+        previous_city = _PreviousCity(existing_path) if os.path.exists(existing_path) else None
+        if previous_city is None or previous_city.city_name != city_name:
+            logging.info(f"{city_name} için mevcut dosya yok, tam tarama yapılıyor")
+            return super().collect_city(city_code, city_name)
+
+        start_time = time.time()
+        logging.info(f"{city_name} yenilenmeye başlandı - Saat: {time.strftime('%H:%M:%S')}")
+
+        file_name = f"{unidecode.unidecode(city_name)}.json"
+        state_path = os.path.join(self.state_dir, file_name)
+        previous_hashes = self._read_json(state_path)
+        if previous_hashes is None and not self.seed:
+            logging.warning(f"{city_name} için kayıtlı sınır özeti yok, tüm mahalleler yeniden sorgulanacak; "
+                            f"mevcut alanları doğru kabul etmek için --refresh-seed kullanın")
+        previous_hashes = previous_hashes or {}
+        current_hashes: Dict[str, Optional[str]] = {}
+
+        new_areas: Dict[str, Dict[str, Any]] = {}
+        new_neighborhoods = set()
+        requeried = 0
+        reused = 0
+        failed = 0
+
+        district_data = self.fetch_data_with_retry(f"ilKodu={city_code}&islem=ilceKodu")
+        districts = district_data['data']['dataArr']
+
+        with self.open_city_writer(city_code, city_name) as writer:
+            for district in districts:
+                district_started = time.perf_counter()
+                writer.begin_district(district['name'], district['id'])
+                old_neighborhoods = previous_city.district(district['name'])
+
+                neighborhood_data = self.fetch_data_with_retry(
+                    f"ilKodu={city_code}&ilceKodu={district['id']}&islem=mahalleKodu"
+                )
+                neighborhoods = neighborhood_data['data']['dataArr']
+
+                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                    future_to_neighborhood = {
+                        executor.submit(
+                            contextvars.copy_context().run,
+                            self.refresh_neighborhood,
+                            city_code, district, neighborhood,
+                            old_neighborhoods.get(neighborhood['name']),
+                            previous_hashes.get(str(neighborhood['id']))
+                        ): neighborhood for neighborhood in neighborhoods
+                    }
+
+                    for future in tqdm(
+                        as_completed(future_to_neighborhood),
+                        total=len(neighborhoods),
+                        desc=f"{district['name']} yenileme"
+                    ):
+                        neighborhood_name, result, polygon_hash, queried = future.result()
+                        neighborhood = future_to_neighborhood[future]
+                        current_hashes[str(neighborhood['id'])] = polygon_hash
+                        self.count_neighborhood(city_name, 'ok' if result is not None else 'error')
+                        if result is None:
+                            failed += 1
+                            # Keep the last known data rather than dropping the neighborhood
+                            result = old_neighborhoods.get(neighborhood_name)
+                        elif queried:
+                            requeried += 1
+                        else:
+                            reused += 1
+                        if result is not None:
+                            writer.write_neighborhood(neighborhood_name, result)
+                            self._add_areas(new_areas, new_neighborhoods, district['name'], neighborhood_name, result)
+                writer.end_district()
+                self.observe_district(city_name, district_started)
+            # Districts the API no longer lists still count as removed in the diff
+            previous_city.finish()
+
+        self.log_city_saved(city_name, writer.path, start_time)
+        self.export_city(writer.path)
+        self._write_json(state_path, current_hashes)
+
+        diff = self._diff(previous_city.areas, previous_city.neighborhoods, new_areas, new_neighborhoods)
+        diff.update({'il': city_name, 'ilId': city_code, 'zaman': time.strftime('%Y-%m-%dT%H:%M:%S')})
+        diff_path = os.path.join(self.diff_dir, f"{unidecode.unidecode(city_name)}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+        self._write_json(diff_path, diff, indent=2)
+
+        logging.info(
+            f"{city_name} yenilendi - {requeried} mahalle yeniden sorgulandı, {reused} mahalle değişmedi, "
+            f"{failed} mahalle hata nedeniyle eski verisiyle yazıldı; "
+            f"{len(diff['eklenenAlanlar'])} eklenen, {len(diff['kaldirilanAlanlar'])} kaldırılan, "
+            f"{len(diff['tasinanAlanlar'])} taşınan alan. Fark dosyası: {diff_path}"
+        )
+
+    @staticmethod
+    def _write_json(path: str, data: Any, **kwargs: Any) -> None:
+        """Write a JSON file through a temporary file so that a crash never leaves it truncated."""
+        with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, **kwargs)
+        os.replace(f"{path}.tmp", path)
+
+    @staticmethod
+    def _add_areas(areas: Dict[str, Dict[str, Any]], neighborhoods: set,
+                   district_name: str, neighborhood_name: str, data: Dict[str, Any]) -> None:
+        """Add a neighborhood's name and deduplicated areas to a city summary."""
+        neighborhoods.add((district_name, neighborhood_name))
+        for area_id, area in data['toplanmaAlanlari'].items():
+            areas[str(area_id)] = area
+
+    @classmethod
+    def _areas_by_id(cls, city: Dict[str, Any]) -> Tuple[Dict[str, Dict[str, Any]], set]:
+        """Collect the deduplicated areas and (district, neighborhood) names of a city."""
+        areas: Dict[str, Dict[str, Any]] = {}
+        neighborhoods = set()
+        for district_name, district in city['ilceler'].items():
+            for neighborhood_name, neighborhood in district['mahalleler'].items():
+                cls._add_areas(areas, neighborhoods, district_name, neighborhood_name, neighborhood)
+        return areas, neighborhoods
+
+    @classmethod
+    def diff_city(cls, old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Compare the gathering areas of two versions of a city.
+
+        Args:
+            old (Dict[str, Any]): Previous city data (the value under the city name)
+            new (Dict[str, Any]): Refreshed city data
+
+        Returns:
+            Dict[str, Any]: Added, removed and moved areas plus added and removed neighborhoods
+        """
+        return cls._diff(*cls._areas_by_id(old), *cls._areas_by_id(new))
+
+    @staticmethod
+    def _diff(old_areas: Dict[str, Dict[str, Any]], old_neighborhoods: set,
+              new_areas: Dict[str, Dict[str, Any]], new_neighborhoods: set) -> Dict[str, Any]:
+        """Compare two city summaries built by _add_areas."""
+        moved = []
+        for area_id in sorted(old_areas.keys() & new_areas.keys()):
+            before, after = old_areas[area_id], new_areas[area_id]
+            if (before.get('x'), before.get('y')) != (after.get('x'), after.get('y')):
+                moved.append({
+                    'id': after.get('id', area_id),
+                    'eski': {'x': before.get('x'), 'y': before.get('y')},
+                    'yeni': {'x': after.get('x'), 'y': after.get('y')},
+                })
+
+        return {
+            'eklenenAlanlar': [new_areas[area_id] for area_id in sorted(new_areas.keys() - old_areas.keys())],
+            'kaldirilanAlanlar': [old_areas[area_id] for area_id in sorted(old_areas.keys() - new_areas.keys())],
+            'tasinanAlanlar': moved,
+            'eklenenMahalleler': [list(key) for key in sorted(new_neighborhoods - old_neighborhoods)],
+            'kaldirilanMahalleler': [list(key) for key in sorted(old_neighborhoods - new_neighborhoods)],
+        }
+
+
+class _PreviousCity:
+    """
+    The existing file of a city being refreshed, read one district at a time.
+
+    Districts are expected in the order the API lists them, which is the
+    order the file was written in; a district asked for out of order only
+    buffers the districts skipped on the way to it. The deduplicated areas
+    and neighborhood names of every district read are kept for the diff.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open the file and read up to its first neighborhood.
+
+        Args:
+            path (str): Path of the city file
+        """
+        self._reader = CityStreamReader(path)
+        self._neighborhoods = iter(self._reader)
+        self._next = next(self._neighborhoods, None)
+        # The city name is parsed before the first neighborhood, or the whole file if it has none
+        self.city_name = self._reader.city_name
+        self._skipped: Dict[str, Dict[str, Any]] = {}
+        self.areas: Dict[str, Dict[str, Any]] = {}
+        self.neighborhoods = set()
+
+    def _read_district(self) -> Tuple[str, Dict[str, Any]]:
+        """Read the next district of the file."""
+        district_name = self._next[0]
+        neighborhoods = {}
+        while self._next is not None and self._next[0] == district_name:
+            _, neighborhood_name, data = self._next
+            neighborhoods[neighborhood_name] = data
+            IncrementalRefresher._add_areas(self.areas, self.neighborhoods, district_name, neighborhood_name, data)
+            self._next = next(self._neighborhoods, None)
+        return district_name, neighborhoods
+
+    def district(self, district_name: str) -> Dict[str, Any]:
+        """
+        The neighborhoods of a district, or an empty dict if the file does not have it.
+
+        Args:
+            district_name (str): District name
+
+        Returns:
+            Dict[str, Any]: Neighborhood data keyed by name
+        """
+        if district_name in self._skipped:
+            return self._skipped.pop(district_name)
+        while self._next is not None:
+            name, neighborhoods = self._read_district()
+            if name == district_name:
+                return neighborhoods
+            self._skipped[name] = neighborhoods
+        return {}
+
+    def finish(self) -> None:
+        """Read the districts that were never asked for, so that their areas count as removed."""
+        while self._next is not None:
+            self._read_district()
+        self._skipped.clear()
@@ -0,0 +1,433 @@
+"""
+Bulk Address Resolver
+
+This module resolves CSV rows of addresses (il, ilçe, mahalle, sokak) and/or
+coordinates to their gathering areas offline, from the collected
+`iller/*.json` files instead of the live site.
+
+Names are matched against the il/ilçe/mahalle/sokak hierarchy case and
+diacritic insensitively, also when written with or without a "MAHALLESİ",
+"SOKAK", "CAD." style suffix. A row whose neighborhood is found gets that
+neighborhood's gathering areas, the closest first when the row also has
+coordinates; a row with only coordinates, or whose address is not found,
+gets the nearest gathering areas. The input is read lazily in chunks that
+a process pool resolves, and results are written in input order with only
+a few chunks in memory at a time.
+
+    python resolve.py adresler.csv --output sonuc.csv --processes 8
+"""
+
+import argparse
+import csv
+import glob
+import multiprocessing
+import os
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from city_format import name_key
+from serve import LookupData, Node
+from spatial_index import GatheringAreaIndex, haversine
+
+# Accepted header names (after name_key) of each input field
+COLUMNS = {
+    'il': ('IL', 'SEHIR'),
+    'ilce': ('ILCE',),
+    'mahalle': ('MAHALLE', 'MAH'),
+    'sokak': ('SOKAK', 'CADDE', 'SOKAK/CADDE'),
+    'lat': ('LAT', 'LATITUDE', 'ENLEM', 'Y'),
+    'lng': ('LNG', 'LON', 'LONG', 'LONGITUDE', 'BOYLAM', 'X'),
+}
+OUTPUT_COLUMNS = ['eslesme', 'il_id', 'ilce_id', 'mahalle_id', 'sokak_id', 'alan_idler', 'alan_adlari', 'mesafeler_m']
+
+# Words that may follow a name, in the data or in the input, without changing what it refers to
+_SUFFIXES = {
+    'MAHALLESI', 'MAHALLE', 'MAH', 'MH',
+    'SOKAGI', 'SOKAK', 'SOK', 'SK', 'CADDESI', 'CADDE', 'CAD', 'CD', 'BULVARI', 'BULVAR', 'BLV', 'BUL',
+}
+
+# Data of the current process; inherited from the parent on fork, loaded by the initializer otherwise
+_data: Optional[LookupData] = None
+_resolver: Optional['Resolver'] = None
+# Stands for a bare_key shared by several entries, e.g. "ATATÜRK CAD." and "ATATÜRK SK."
+_AMBIGUOUS = object()
+
+
+def bare_key(name: str) -> str:
+    """name_key without punctuation and trailing type suffixes, e.g. "ATATÜRK CAD." -> "ATATURK"."""
+    words = ''.join(c if c.isalnum() else ' ' for c in name_key(name)).split()
+    while len(words) > 1 and words[-1] in _SUFFIXES:
+        words.pop()
+    return ' '.join(words)
+
+
+def bare_keys(items: Dict[str, Any], display: Callable[[Any], str]) -> Dict[str, Any]:
+    """
+    Key the entries of a children or streets dict by bare_key.
+
+    Args:
+        items (Dict[str, Any]): Entries keyed by name_key
+        display (Callable[[Any], str]): Name of an entry as written in the data
+
+    Returns:
+        Dict[str, Any]: Entries by bare_key; _AMBIGUOUS where several entries share one
+    """
+    bare: Dict[str, Any] = {}
+    for value in items.values():
+        key = bare_key(display(value))
+        bare[key] = value if bare.get(key, value) is value else _AMBIGUOUS
+    return bare
+
+
+class Resolver:
+    """Resolve rows of one chunk against the loaded hierarchy and spatial index."""
+
+    def __init__(self, data: LookupData, k: int = 3):
+        """
+        Initialize the resolver.
+
+        Args:
+            data (LookupData): Hierarchy and spatial index of the collected areas
+            k (int): Nearest areas reported for a row with coordinates; a row matched
+                only by address gets all areas of its neighborhood
+        """
+        self.data = data
+        self.k = k
+        # Input names repeat a lot (every row of a city spells it the same way), and so do areas
+        self._keys: Dict[str, str] = {}
+        self._labels: Dict[int, Tuple[str, str]] = {}
+        # id() of a children or streets dict of the data -> (the dict, its bare_keys), built on the first miss;
+        # the dict is kept so that its id cannot be reused, and the data never grows, so neither does this
+        self._bare: Dict[int, Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+
+    def resolve_address(self, fields: Dict[str, str]) -> Tuple[str, List[Any], Optional[Node]]:
+        """
+        Walk the hierarchy as deep as the given names allow.
+
+        Args:
+            fields (Dict[str, str]): il, ilce, mahalle and sokak values of a row
+
+        Returns:
+            Tuple[str, List[Any], Optional[Node]]: Deepest matched level ("" if none),
+            ids of il/ilçe/mahalle/sokak (None where not matched) and the neighborhood node
+        """
+        ids: List[Any] = [None, None, None, None]
+        level = ''
+        children = self.data.cities
+        node = None
+        for depth, field in enumerate(('il', 'ilce', 'mahalle')):
+            name = fields.get(field)
+            if not name:
+                break
+            found = self._find(children, self._key(name), lambda child: child.name)
+            if found is None:
+                break
+            node, level, ids[depth] = found, field, found.id
+            children = found.children
+        if level != 'mahalle':
+            return level, ids, None
+
+        street_name = fields.get('sokak')
+        if street_name:
+            street = self._find(node.streets, self._key(street_name), lambda street: street[0])
+            if street is not None:
+                level, ids[3] = 'sokak', street[1]
+        return level, ids, node
+
+    def _find(self, items: Dict[str, Any], key: str, display: Callable[[Any], str]) -> Any:
+        """
+        Look a name up in a children or streets dict by name_key, then by bare_key.
+
+        Args:
+            items (Dict[str, Any]): Entries keyed by name_key
+            key (str): name_key of the name as written in the input
+            display (Callable[[Any], str]): Name of an entry as written in the data
+
+        Returns:
+            Any: The entry, or None if not found or if its bare_key matches several entries
+        """
+        item = items.get(key)
+        if item is not None:
+            return item
+        cached = self._bare.get(id(items))
+        if cached is None or cached[0] is not items:
+            cached = self._bare[id(items)] = (items, bare_keys(items, display))
+        item = cached[1].get(bare_key(key))
+        return None if item is _AMBIGUOUS else item
+
+    def _key(self, name: str) -> str:
+        """name_key of an input name, cached."""
+        key = self._keys.get(name)
+        if key is None:
+            if len(self._keys) >= 200000:
+                self._keys.clear()
+            key = self._keys[name] = name_key(name)
+        return key
+
+    def resolve_chunk(self, rows: List[Dict[str, str]]) -> List[List[Any]]:
+        """
+        Resolve a chunk of rows.
+
+        Args:
+            rows (List[Dict[str, str]]): Input fields of each row
+
+        Returns:
+            List[List[Any]]: OUTPUT_COLUMNS values of each row
+        """
+        results: List[Optional[List[Any]]] = []
+        nearest_rows: List[int] = []
+        nearest_points: List[Tuple[float, float]] = []
+        index = self.data.index
+
+        for fields in rows:
+            point = _parse_point(fields.get('lat'), fields.get('lng'))
+            level, ids, node = self.resolve_address(fields)
+            if node is not None and len(node.areas):
+                positions = node.areas
+                distances = None
+                if point is not None:
+                    distances = haversine(point[0], point[1], index.lat[positions], index.lng[positions])
+                    order = np.argsort(distances, kind='stable')[:self.k]
+                    positions, distances = positions[order], distances[order]
+                results.append([level, *ids, *self._areas(positions.tolist(), distances)])
+            elif point is not None:
+                # Filled in below with one batched query for the whole chunk
+                nearest_rows.append(len(results))
+                nearest_points.append(point)
+                results.append([level or 'koordinat', *ids])
+            else:
+                results.append([level or 'yok', *ids, '', '', ''])
+
+        if nearest_points:
+            lats, lngs = np.array(nearest_points).T
+            distances, positions = index.nearest_batch(lats, lngs, self.k)
+            for row, row_distances, row_positions in zip(nearest_rows, distances, positions):
+                found = row_positions >= 0
+                results[row].extend(self._areas(row_positions[found].tolist(), row_distances[found]))
+                if results[row][0] != 'koordinat':
+                    # The address was only partly found; the areas come from the coordinates
+                    results[row][0] += '+koordinat'
+        return results
+
+    def _areas(self, positions: List[int], distances: Optional[np.ndarray]) -> List[str]:
+        """alan_idler, alan_adlari and mesafeler_m cells of the given areas."""
+        labels = [self._label(position) for position in positions]
+        return [
+            ';'.join(label[0] for label in labels),
+            ';'.join(label[1] for label in labels),
+            '' if distances is None else ';'.join(f"{distance:.1f}" for distance in distances.tolist()),
+        ]
+
+    def _label(self, position: int) -> Tuple[str, str]:
+        """Id and name of the area at a position in the index, decoded once."""
+        label = self._labels.get(position)
+        if label is None:
+            area = self.data.index.properties(position)
+            label = self._labels[position] = (str(area['id']), str(area.get('tesis_adi', '')))
+        return label
+
+
+def _parse_point(lat: Optional[str], lng: Optional[str]) -> Optional[Tuple[float, float]]:
+    """Coordinates of a row, accepting decimal commas; None if missing or invalid."""
+    if not lat or not lng:
+        return None
+    try:
+        point = float(lat.replace(',', '.')), float(lng.replace(',', '.'))
+    except ValueError:
+        return None
+    if not (-90 <= point[0] <= 90 and -180 <= point[1] <= 180):
+        return None
+    return point
+
+
+def load_data(paths: Optional[List[str]] = None, index_path: Optional[str] = None) -> LookupData:
+    """
+    Load the hierarchy and the spatial index.
+
+    Args:
+        paths (Optional[List[str]]): City files; defaults to iller/*.json
+        index_path (Optional[str]): Prebuilt spatial index (.npz) to use instead of building one
+
+    Returns:
+        LookupData: The loaded data
+    """
+    if paths is None:
+        paths = sorted(glob.glob(os.path.join("iller", "*.json")))
+    index = GatheringAreaIndex.load(index_path) if index_path else None
+    return LookupData.from_json_files(paths, index=index)
+
+
+def _init_worker(paths: Optional[List[str]], index_path: Optional[str]) -> None:
+    """Load the data in a pool process unless it was inherited from the parent."""
+    global _data
+    if _data is None:
+        _data = load_data(paths, index_path)
+
+
+def _resolve_chunk(rows: List[Dict[str, str]], k: int) -> List[List[Any]]:
+    """Resolve a chunk in a pool process, keeping the resolver and its caches between chunks."""
+    global _resolver
+    if _resolver is None or _resolver.k != k:
+        _resolver = Resolver(_data, k)
+    return _resolver.resolve_chunk(rows)
+
+
+def read_chunks(reader: Iterator[List[str]],
+                fields: Dict[str, int],
+                chunk_size: int) -> Iterator[Tuple[List[List[str]], List[Dict[str, str]]]]:
+    """
+    Read input rows lazily in chunks.
+
+    Args:
+        reader (Iterator[List[str]]): CSV reader positioned after the header
+        fields (Dict[str, int]): Input field -> column position
+        chunk_size (int): Rows per chunk
+
+    Yields:
+        Tuple[List[List[str]], List[Dict[str, str]]]: Raw rows and their input fields
+    """
+    raw: List[List[str]] = []
+    for row in reader:
+        raw.append(row)
+        if len(raw) >= chunk_size:
+            yield raw, [_fields(row, fields) for row in raw]
+            raw = []
+    if raw:
+        yield raw, [_fields(row, fields) for row in raw]
+
+
+def _fields(row: List[str], fields: Dict[str, int]) -> Dict[str, str]:
+    """Input fields of a raw row."""
+    return {field: row[position].strip() for field, position in fields.items() if position < len(row)}
+
+
+def map_columns(header: List[str]) -> Dict[str, int]:
+    """
+    Find the input fields in a header row.
+
+    Args:
+        header (List[str]): Header cells
+
+    Returns:
+        Dict[str, int]: Input field -> column position
+
+    Raises:
+        ValueError: If neither address nor coordinate columns are present
+    """
+    keys = [name_key(cell) for cell in header]
+    fields = {}
+    for field, names in COLUMNS.items():
+        for position, key in enumerate(keys):
+            if key in names:
+                fields[field] = position
+                break
+    if 'il' not in fields and not ('lat' in fields and 'lng' in fields):
+        raise ValueError(f"Girdi başlığında il ya da enlem/boylam sütunları bulunamadı: {header}")
+    return fields
+
+
+def resolve_stream(source: Iterable[str],
+                   target: Any,
+                   processes: int = 0,
+                   chunk_size: int = 5000,
+                   k: int = 3,
+                   paths: Optional[List[str]] = None,
+                   index_path: Optional[str] = None,
+                   delimiter: str = ',') -> Counter:
+    """
+    Resolve a CSV stream into another, keeping the input columns and appending OUTPUT_COLUMNS.
+
+    Args:
+        source (Iterable[str]): Input lines
+        target (Any): Writable text file for the output
+        processes (int): Pool processes; 0 resolves in this process
+        chunk_size (int): Rows handed to a process at a time
+        k (int): Nearest areas reported for a row with coordinates
+        paths (Optional[List[str]]): City files; defaults to iller/*.json
+        index_path (Optional[str]): Prebuilt spatial index (.npz)
+        delimiter (str): CSV delimiter of input and output
+
+    Returns:
+        Counter: Number of rows per eslesme value
+    """
+    global _data
+    reader = csv.reader(source, delimiter=delimiter)
+    writer = csv.writer(target, delimiter=delimiter, lineterminator='\n')
+    header = next(reader, None)
+    if header is None:
+        return Counter()
+    fields = map_columns(header)
+    writer.writerow(header + OUTPUT_COLUMNS)
+
+    counts: Counter = Counter()
+
+    def write(raw: List[List[str]], results: List[List[Any]]) -> None:
+        for row, result in zip(raw, results):
+            counts[result[0]] += 1
+            writer.writerow(row + ['' if value is None else value for value in result])
+
+    # Loaded before the pool starts so forked workers share it instead of each parsing the files
+    _data = load_data(paths, index_path)
+    chunks = read_chunks(reader, fields, chunk_size)
+    if processes <= 0:
+        resolver = Resolver(_data, k)
+        for raw, rows in chunks:
+            write(raw, resolver.resolve_chunk(rows))
+        return counts
+
+    context = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else None)
+    with ProcessPoolExecutor(processes, mp_context=context, initializer=_init_worker,
+                             initargs=(paths, index_path)) as executor:
+        # At most two chunks per process are read ahead, which bounds memory whatever the input size
+        pending: Deque[Tuple[List[List[str]], Future]] = deque()
+        for raw, rows in chunks:
+            pending.append((raw, executor.submit(_resolve_chunk, rows, k)))
+            if len(pending) >= 2 * processes:
+                done_raw, future = pending.popleft()
+                write(done_raw, future.result())
+        while pending:
+            done_raw, future = pending.popleft()
+            write(done_raw, future.result())
+    return counts
+
+
+def main() -> None:
+    """Resolve a CSV file from the command line."""
+    parser = argparse.ArgumentParser(description="Adres ve koordinat listelerini toplanma alanlarına çevrimdışı eşler")
+    parser.add_argument("input", help="Girdi CSV dosyası (- : standart girdi); il, ilce, mahalle, sokak ve/veya lat, lng sütunları")
+    parser.add_argument("--output", default="-", help="Çıktı CSV dosyası (varsayılan: standart çıktı)")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1,
+                        help="Eşleştirme süreci sayısı (0: tek süreç)")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Bir sürece tek seferde verilen satır sayısı")
+    parser.add_argument("-k", type=int, default=3, help="Koordinatlı satırlar için raporlanan en yakın toplanma alanı sayısı")
+    parser.add_argument("--delimiter", default=",", help="CSV ayracı")
+    parser.add_argument("--index", help="spatial_index.py build ile oluşturulmuş indeks (.npz)")
+    parser.add_argument("--cities", nargs="+", help="Şehir dosyaları (varsayılan: iller/*.json)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    source = sys.stdin if args.input == "-" else open(args.input, 'r', encoding='utf-8-sig', newline='')
+    target = sys.stdout if args.output == "-" else open(args.output, 'w', encoding='utf-8', newline='')
+    try:
+        counts = resolve_stream(source, target, args.processes, args.chunk_size, args.k,
+                                args.cities, args.index, args.delimiter)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+
+    total = sum(counts.values())
+    elapsed = time.perf_counter() - start
+    summary = ', '.join(f"{level}: {count}" for level, count in counts.most_common())
+    print(f"{total} satır {elapsed:.1f} sn'de eşlendi ({total / max(elapsed, 1e-9):.0f} satır/sn) - {summary}",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""
+Adaptive Polygon Sampler
+
+This module decides where inside a neighborhood polygon `query_point` is
+called. Instead of always querying four extreme vertices and their average,
+sampling runs in rounds: one interior point per polygon part, then the
+extremes of each part, then ever finer interior grid points, continuing only
+while a round keeps turning up enough gathering areas not seen before.
+Small urban blocks stop after the extremes, as before; large rural
+neighborhoods get as many queries as their coverage needs, up to a budget. Polygons with holes
+and MultiPolygons are handled.
+
+The sampler never performs requests itself; an engine drives a session:
+
+    session = sampler.start(areas)
+    while True:
+        points = session.next_batch()
+        if not points:
+            break
+        session.record([query_point(lng, lat) for lng, lat in points])
+    features = session.features()
+"""
+
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# (lng, lat), the GeoJSON coordinate order
+Point = Tuple[float, float]
+Ring = List[Point]
+# Outer ring followed by its holes
+Polygon = List[Ring]
+
+METERS_PER_DEGREE = 111_320.0
+
+
+def polygon_parts(areas: Sequence[Dict[str, Any]]) -> List[Polygon]:
+    """
+    Collect every polygon part of the features returned by fetch_map_areas.
+
+    Args:
+        areas (Sequence[Dict[str, Any]]): GeoJSON features with Polygon or MultiPolygon geometry
+
+    Returns:
+        List[Polygon]: Polygon parts with at least three outer vertices
+    """
+    parts = []
+    for feature in areas:
+        geometry = feature.get('geometry') or {}
+        coordinates = geometry.get('coordinates')
+        if not coordinates:
+            continue
+        multi = geometry.get('type') == 'MultiPolygon' or (
+            geometry.get('type') is None and isinstance(coordinates[0][0][0], list)
+        )
+        for polygon in (coordinates if multi else [coordinates]):
+            rings = [[(float(p[0]), float(p[1])) for p in ring] for ring in polygon if ring]
+            if rings and len(rings[0]) >= 3:
+                parts.append(rings)
+    return parts
+
+
+def ring_extremes(ring: Sequence[Sequence[float]]) -> List[Sequence[float]]:
+    """
+    Find the vertices with minimum x, minimum y, maximum x and maximum y in one pass.
+
+    Ties go to the first vertex, as with the stable sorts this replaces.
+
+    Args:
+        ring (Sequence[Sequence[float]]): Ring vertices
+
+    Returns:
+        List[Sequence[float]]: [min x, min y, max x, max y] vertices
+    """
+    min_x = min_y = max_x = max_y = ring[0]
+    for point in ring:
+        if point[0] < min_x[0]:
+            min_x = point
+        elif point[0] > max_x[0]:
+            max_x = point
+        if point[1] < min_y[1]:
+            min_y = point
+        elif point[1] > max_y[1]:
+            max_y = point
+    return [min_x, min_y, max_x, max_y]
+
+
+def contains(polygon: Polygon, x: float, y: float) -> bool:
+    """Even-odd point-in-polygon test over the outer ring and all holes."""
+    inside = False
+    for ring in polygon:
+        j = len(ring) - 1
+        for i in range(len(ring)):
+            xi, yi = ring[i]
+            xj, yj = ring[j]
+            if (yi > y) != (yj > y) and x < (xj - xi) * (y - yi) / (yj - yi) + xi:
+                inside = not inside
+            j = i
+    return inside
+
+
+def interior_point(polygon: Polygon) -> Point:
+    """
+    A point inside the polygon, preferring its centroid.
+
+    For concave shapes or a centroid in a hole, the midpoint of the widest
+    inside span of the horizontal line through the centroid is used.
+    """
+    ring = polygon[0]
+    area = cx = cy = 0.0
+    for (x0, y0), (x1, y1) in zip(ring, ring[1:] + ring[:1]):
+        cross = x0 * y1 - x1 * y0
+        area += cross
+        cx += (x0 + x1) * cross
+        cy += (y0 + y1) * cross
+    if abs(area) > 1e-18:
+        cx, cy = cx / (3 * area), cy / (3 * area)
+    else:
+        cx = sum(p[0] for p in ring) / len(ring)
+        cy = sum(p[1] for p in ring) / len(ring)
+    if contains(polygon, cx, cy):
+        return (cx, cy)
+
+    crossings = []
+    for r in polygon:
+        for (x0, y0), (x1, y1) in zip(r, r[1:] + r[:1]):
+            if (y0 > cy) != (y1 > cy):
+                crossings.append(x0 + (cy - y0) * (x1 - x0) / (y1 - y0))
+    crossings.sort()
+    spans = [(crossings[i], crossings[i + 1]) for i in range(0, len(crossings) - 1, 2)]
+    if not spans:
+        return ring[0]
+    left, right = max(spans, key=lambda span: span[1] - span[0])
+    return ((left + right) / 2, cy)
+
+
+def _distance_m(a: Point, b: Point) -> float:
+    """Equirectangular distance in meters, accurate enough at neighborhood scale."""
+    dx = (a[0] - b[0]) * math.cos(math.radians((a[1] + b[1]) / 2))
+    return math.hypot(dx, a[1] - b[1]) * METERS_PER_DEGREE
+
+
+class SamplingSession:
+    """
+    Sampling state of one neighborhood.
+
+    next_batch() returns the points of the next round and record() takes
+    the responses of that round in the same order; the session ends when a
+    round after the extremes finds fewer than `min_yield` new area ids per
+    query, nothing worth sampling is left or the budget is spent.
+    """
+
+    def __init__(self, sampler: 'AdaptiveSampler', parts: List[Polygon]):
+        self.sampler = sampler
+        self.parts = parts
+        self.sampled: List[Point] = []
+        self.rounds = 0
+        self._features: Dict[Any, Dict[str, Any]] = {}
+        self._new_ids = 0
+        self._batch_size = 0
+        self._level = 1
+        self._done = False
+
+    @property
+    def calls(self) -> int:
+        """Number of points handed out so far."""
+        return len(self.sampled)
+
+    def _far_enough(self, point: Point, chosen: List[Point]) -> bool:
+        return all(_distance_m(point, other) >= self.sampler.min_spacing_m for other in self.sampled + chosen)
+
+    def _select(self, candidates: List[Point], limit: int) -> List[Point]:
+        """Pick up to `limit` candidates farthest-first, respecting the minimum spacing."""
+        chosen: List[Point] = []
+        remaining = list(candidates)
+        while remaining and len(chosen) < limit:
+            anchors = self.sampled + chosen
+            if anchors:
+                best = max(remaining, key=lambda p: min(_distance_m(p, a) for a in anchors))
+            else:
+                best = remaining[0]
+            remaining.remove(best)
+            if not self._far_enough(best, chosen):
+                # The farthest candidate is already too close, so every other one is as well
+                break
+            chosen.append(best)
+        return chosen
+
+    def _grid(self, level: int) -> List[Point]:
+        """Cell centers of a 2^level grid over each part's bounding box that fall inside the part."""
+        cells = 2 ** level
+        points = []
+        for part in self.parts:
+            xs = [p[0] for p in part[0]]
+            ys = [p[1] for p in part[0]]
+            width = (max(xs) - min(xs)) / cells
+            height = (max(ys) - min(ys)) / cells
+            for i in range(cells):
+                for j in range(cells):
+                    x = min(xs) + (i + 0.5) * width
+                    y = min(ys) + (j + 0.5) * height
+                    if contains(part, x, y):
+                        points.append((x, y))
+        return points
+
+    def next_batch(self) -> List[Point]:
+        """
+        Points to query in the next round.
+
+        Returns:
+            List[Point]: (lng, lat) pairs; empty once sampling is finished
+        """
+        budget = self.sampler.max_points - len(self.sampled)
+        if self._done or budget <= 0:
+            self._done = True
+            return []
+
+        # After the extremes, only go on while the previous round paid for itself
+        if self.rounds >= 2 and self._new_ids < self.sampler.min_yield * self._batch_size:
+            self._done = True
+            return []
+
+        if self.rounds == 0:
+            batch = self._select([interior_point(part) for part in self.parts], budget)
+        elif self.rounds == 1:
+            extremes = [tuple(p) for part in self.parts for p in ring_extremes(part[0])]
+            batch = self._select(extremes, budget)
+        else:
+            batch = []
+            limit = min(budget, self.sampler.round_size)
+            while not batch and self._level < self.sampler.max_level:
+                self._level += 1
+                batch = self._select(self._grid(self._level), limit)
+
+        self.rounds += 1
+        self._new_ids = 0
+        self._batch_size = len(batch)
+        if not batch:
+            self._done = True
+        self.sampled.extend(batch)
+        return batch
+
+    def record(self, results: Sequence[Optional[Dict[str, Any]]]) -> int:
+        """
+        Take the query_point responses of the last batch.
+
+        Args:
+            results (Sequence[Optional[Dict[str, Any]]]): Responses, None for failed queries
+
+        Returns:
+            int: Number of area ids seen for the first time
+        """
+        for result in results:
+            if not result:
+                continue
+            for feature in result.get('features') or []:
+                area_id = feature.get('properties', {}).get('id')
+                if area_id not in self._features:
+                    self._features[area_id] = feature
+                    self._new_ids += 1
+        return self._new_ids
+
+    def features(self) -> List[Dict[str, Any]]:
+        """Distinct gathering area features found, in discovery order."""
+        return list(self._features.values())
+
+
+class AdaptiveSampler:
+    """
+    Settings of the coverage-driven sampling; start() opens a session per neighborhood.
+    """
+
+    def __init__(self,
+                 min_spacing_m: float = 50.0,
+                 max_points: int = 24,
+                 round_size: int = 2,
+                 max_level: int = 4,
+                 min_yield: float = 0.5):
+        """
+        Initialize the sampler.
+
+        Args:
+            min_spacing_m (float): Points closer than this to an earlier sample are skipped
+            max_points (int): Maximum number of query_point calls per neighborhood
+            round_size (int): Maximum number of grid points added per round after the extremes
+            max_level (int): Finest interior grid, 2^max_level cells per side of a part
+            min_yield (float): New area ids per query a round must find for sampling to go on
+        """
+        self.min_spacing_m = min_spacing_m
+        self.max_points = max_points
+        self.round_size = round_size
+        self.max_level = max_level
+        self.min_yield = min_yield
+
+    def start(self, areas: Optional[Sequence[Dict[str, Any]]]) -> Optional[SamplingSession]:
+        """
+        Open a sampling session for a neighborhood.
+
+        Args:
+            areas (Optional[Sequence[Dict[str, Any]]]): Features returned by fetch_map_areas
+
+        Returns:
+            Optional[SamplingSession]: Session, or None if the features contain no polygon
+        """
+        parts = polygon_parts(areas or [])
+        if not parts:
+            return None
+        return SamplingSession(self, parts)
@@ -0,0 +1,262 @@
+"""
+Polygon Sampler Benchmark
+
+This module compares the fixed five-point sampling
+(`AFADScraper._extract_significant_vertices`) with AdaptiveSampler: query_point
+calls per neighborhood against the number of distinct gathering areas found.
+
+Neighborhood polygons come from a JSONL recording made with `record`
+(one `fetch_map_areas` result per line) or, without one, are synthesized
+around the neighborhoods in `iller/*.json`. query_point is answered offline
+by a GatheringAreaIndex over the collected areas: a point returns its
+`--oracle-k` nearest areas, which is how the live service behaves. The areas
+reachable from a dense interior grid serve as the ground truth for recall.
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+import random
+import statistics
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from city_stream import iter_neighborhoods
+from sampler import AdaptiveSampler, Point, contains, polygon_parts
+from scraper import AFADScraper
+from spatial_index import GatheringAreaIndex
+
+SIZE_BUCKETS = [(0, 500, "< 500 m"), (500, 2000, "500 m - 2 km"), (2000, 8000, "2 - 8 km"), (8000, math.inf, "> 8 km")]
+
+
+class IndexOracle:
+    """Answer query_point offline with the k nearest collected areas."""
+
+    def __init__(self, index: GatheringAreaIndex, k: int = 3):
+        self.index = index
+        self.k = k
+
+    def ids(self, points: List[Point]) -> set:
+        """Distinct area ids returned for the given (lng, lat) points."""
+        if not points:
+            return set()
+        lngs, lats = np.array(points, dtype=np.float64).T
+        _, positions = self.index.nearest_batch(lats, lngs, self.k)
+        return {int(self.index.ids[p]) for p in positions.ravel() if p >= 0}
+
+    def query_point(self, lng: float, lat: float) -> Dict[str, Any]:
+        """Response in the shape of AFADScraper.query_point."""
+        _, positions = self.index.nearest_batch(np.array([lat]), np.array([lng]), self.k)
+        return {'features': [
+            {'properties': {'id': int(self.index.ids[p])}} for p in positions[0] if p >= 0
+        ]}
+
+
+def synthesize_polygons(paths: Iterable[str], count: int, seed: int) -> List[Dict[str, Any]]:
+    """
+    Build irregular neighborhood polygons around collected neighborhoods.
+
+    Sizes follow a log-normal distribution from urban blocks to rural
+    villages; some polygons get a hole and some a second part.
+
+    Args:
+        paths (Iterable[str]): City files
+        count (int): Number of polygons
+        seed (int): Random seed
+
+    Returns:
+        List[Dict[str, Any]]: Records with an `areas` feature list
+    """
+    centers = []
+    for path in paths:
+        for district, neighborhood, data in iter_neighborhoods(path):
+            coordinates = [(a['x'], a['y']) for a in data['toplanmaAlanlari'].values() if a.get('x') is not None]
+            if coordinates:
+                centers.append((neighborhood, tuple(np.mean(coordinates, axis=0))))
+
+    rng = random.Random(seed)
+    records = []
+    for name, (x, y) in rng.sample(centers, min(count, len(centers))):
+        radius_m = min(max(rng.lognormvariate(math.log(700), 1.0), 80), 15000)
+
+        def ring(cx: float, cy: float, r_m: float, vertices: int) -> List[List[float]]:
+            points = []
+            for i in range(vertices):
+                angle = 2 * math.pi * i / vertices
+                r = r_m * rng.uniform(0.55, 1.0) / 111_320
+                points.append([cx + r * math.cos(angle) / math.cos(math.radians(cy)), cy + r * math.sin(angle)])
+            return points + [points[0]]
+
+        polygon = [ring(x, y, radius_m, rng.randint(8, 60))]
+        if rng.random() < 0.15:
+            polygon.append(ring(x, y, radius_m * 0.25, 8))
+        geometry = {'type': 'Polygon', 'coordinates': polygon}
+        if rng.random() < 0.10:
+            offset = 2.2 * radius_m / 111_320
+            geometry = {'type': 'MultiPolygon', 'coordinates': [polygon, [ring(x + offset, y, radius_m * 0.4, 12)]]}
+        records.append({'mahalle': name, 'areas': [{'type': 'Feature', 'geometry': geometry}]})
+    return records
+
+
+def polygon_size_m(areas: List[Dict[str, Any]]) -> float:
+    """Bounding box diagonal of all parts in meters."""
+    points = [p for part in polygon_parts(areas) for p in part[0]]
+    xs, ys = [p[0] for p in points], [p[1] for p in points]
+    dx = (max(xs) - min(xs)) * math.cos(math.radians(statistics.mean(ys)))
+    return math.hypot(dx, max(ys) - min(ys)) * 111_320
+
+
+def reachable_ids(oracle: IndexOracle, areas: List[Dict[str, Any]], cells: int = 32) -> set:
+    """Areas reachable from all vertices and a dense interior grid of every part."""
+    points = []
+    for part in polygon_parts(areas):
+        points.extend(part[0])
+        xs, ys = [p[0] for p in part[0]], [p[1] for p in part[0]]
+        for i in range(cells):
+            for j in range(cells):
+                x = min(xs) + (i + 0.5) * (max(xs) - min(xs)) / cells
+                y = min(ys) + (j + 0.5) * (max(ys) - min(ys)) / cells
+                if contains(part, x, y):
+                    points.append((x, y))
+    return oracle.ids(points)
+
+
+def run_fixed(oracle: IndexOracle, areas: List[Dict[str, Any]]) -> Tuple[int, set]:
+    """The previous strategy: five points of the first feature's outer ring."""
+    geometry = areas[0]['geometry']
+    coordinates = geometry['coordinates']
+    if geometry.get('type') == 'MultiPolygon':
+        # The old code did not understand MultiPolygons; credit it with their first part
+        coordinates = coordinates[0]
+    points = AFADScraper._extract_significant_vertices(coordinates)
+    return len(points), oracle.ids([tuple(p) for p in points])
+
+
+def run_adaptive(oracle: IndexOracle, sampler: AdaptiveSampler, areas: List[Dict[str, Any]]) -> Tuple[int, set]:
+    """AdaptiveSampler driven by the oracle."""
+    session = sampler.start(areas)
+    while True:
+        points = session.next_batch()
+        if not points:
+            break
+        session.record([oracle.query_point(lng, lat) for lng, lat in points])
+    return session.calls, {f['properties']['id'] for f in session.features()}
+
+
+def summarize(rows: List[Dict[str, Any]], key: str) -> Dict[str, Any]:
+    """Aggregate per-neighborhood results of one strategy."""
+    calls = [row[key]['calls'] for row in rows]
+    found = [row[key]['found'] for row in rows]
+    recall = [row[key]['found'] / row['reachable'] for row in rows if row['reachable']]
+    return {
+        'sorgu_ort': round(statistics.mean(calls), 2),
+        'sorgu_p90': sorted(calls)[int(0.9 * (len(calls) - 1))],
+        'alan_ort': round(statistics.mean(found), 2),
+        'sorgu_basina_alan': round(sum(found) / max(sum(calls), 1), 3),
+        'kapsama_ort': round(statistics.mean(recall), 3) if recall else None,
+        'toplam_sorgu': sum(calls),
+    }
+
+
+def benchmark(records: List[Dict[str, Any]], oracle: IndexOracle, sampler: AdaptiveSampler) -> Dict[str, Any]:
+    """
+    Run both strategies over the polygons.
+
+    Args:
+        records (List[Dict[str, Any]]): Records with an `areas` feature list
+        oracle (IndexOracle): Offline query_point
+        sampler (AdaptiveSampler): Sampler under test
+
+    Returns:
+        Dict[str, Any]: Overall and per-size summaries of both strategies
+    """
+    rows = []
+    for record in records:
+        areas = record['areas']
+        if not polygon_parts(areas):
+            continue
+        fixed_calls, fixed_ids = run_fixed(oracle, areas)
+        adaptive_calls, adaptive_ids = run_adaptive(oracle, sampler, areas)
+        rows.append({
+            'size': polygon_size_m(areas),
+            'reachable': len(reachable_ids(oracle, areas)),
+            'sabit': {'calls': fixed_calls, 'found': len(fixed_ids)},
+            'uyarlanabilir': {'calls': adaptive_calls, 'found': len(adaptive_ids)},
+        })
+
+    result = {'mahalle': len(rows), 'genel': {}, 'boyuta_gore': {}}
+    for key in ('sabit', 'uyarlanabilir'):
+        result['genel'][key] = summarize(rows, key)
+    for low, high, label in SIZE_BUCKETS:
+        bucket = [row for row in rows if low <= row['size'] < high]
+        if bucket:
+            result['boyuta_gore'][label] = {
+                'mahalle': len(bucket),
+                **{key: summarize(bucket, key) for key in ('sabit', 'uyarlanabilir')},
+            }
+    return result
+
+
+def record_polygons(city_code: int, output: str, limit: Optional[int]) -> None:
+    """Fetch and store the neighborhood polygons of a city for later benchmark runs."""
+    scraper = AFADScraper()
+    written = 0
+    with open(output, 'a', encoding='utf-8') as f:
+        districts = scraper.get_data(f"ilKodu={city_code}&islem=ilceKodu")['data']['dataArr']
+        for district in districts:
+            neighborhoods = scraper.get_data(
+                f"ilKodu={city_code}&ilceKodu={district['id']}&islem=mahalleKodu"
+            )['data']['dataArr']
+            for neighborhood in neighborhoods:
+                areas = scraper.fetch_map_areas(city_code, district['id'], neighborhood['id'])
+                if areas:
+                    f.write(json.dumps({
+                        'ilId': city_code, 'ilceId': district['id'], 'mahalleId': neighborhood['id'],
+                        'mahalle': neighborhood['name'], 'areas': areas,
+                    }, ensure_ascii=False) + '\n')
+                    written += 1
+                if limit is not None and written >= limit:
+                    return
+
+
+def main() -> None:
+    """Record polygons or run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description="Sabit ve uyarlanabilir nokta seçimini karşılaştırır")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    record = subparsers.add_parser("record", help="Bir ilin mahalle sınırlarını JSONL olarak kaydet")
+    record.add_argument("--city", type=int, required=True, help="İl kodu")
+    record.add_argument("--output", default="polygons.jsonl", help="Kayıt dosyası")
+    record.add_argument("--limit", type=int, help="En fazla kaydedilecek mahalle sayısı")
+
+    run = subparsers.add_parser("run", help="Karşılaştırmayı çalıştır")
+    run.add_argument("--polygons", help="record ile oluşturulmuş JSONL (varsayılan: iller/ üzerinden sentetik)")
+    run.add_argument("--synthetic", type=int, default=1000, help="Sentetik mahalle sayısı")
+    run.add_argument("--seed", type=int, default=7, help="Sentetik sınırlar için rastgele tohum")
+    run.add_argument("--oracle-k", type=int, default=3, help="Bir nokta sorgusunun döndürdüğü alan sayısı")
+    run.add_argument("--min-spacing", type=float, default=50.0, help="Örnek noktalar arası en kısa mesafe (m)")
+    run.add_argument("--max-points", type=int, default=24, help="Mahalle başına en fazla sorgu")
+    run.add_argument("files", nargs="*", help="Şehir dosyaları (varsayılan: iller/*.json)")
+
+    args = parser.parse_args()
+    if args.command == "record":
+        record_polygons(args.city, args.output, args.limit)
+        return
+
+    paths = args.files or sorted(glob.glob(os.path.join("iller", "*.json")))
+    if args.polygons:
+        with open(args.polygons, 'r', encoding='utf-8') as f:
+            records = [json.loads(line) for line in f if line.strip()]
+    else:
+        records = synthesize_polygons(paths, args.synthetic, args.seed)
+
+    oracle = IndexOracle(GatheringAreaIndex.from_json_files(paths), k=args.oracle_k)
+    sampler = AdaptiveSampler(min_spacing_m=args.min_spacing, max_points=args.max_points)
+    print(json.dumps(benchmark(records, oracle, sampler), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,17 +6,381 @@ This module provides a class-based interface to scrape and interact with the off
 about emergency gathering areas in Turkey.
 """
 
+import contextvars
 import json
+import os
 import re
+import threading
 import warnings
-from typing import Any, Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlsplit
 
 import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import MetricsRegistry
+from point_cache import PointCache
+from rate_control import AdaptiveLimiter
+from sampler import AdaptiveSampler, ring_extremes
 
 # Disable SSL warnings for development purposes
 warnings.filterwarnings("ignore", message="Unverified HTTPS request")
 
 
+class Transport:
+    """
+    Interface through which AFADScraper sends every HTTP request.
+    
+    SessionPool talks to the server; RecordingTransport and ReplayTransport
+    capture and serve back its responses so the scraper and the collectors
+    can run without network access.
+    """
+    
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """
+        Send a request.
+        
+        Args:
+            method (str): HTTP method
+            url (str): Request URL
+            **kwargs: Arguments of requests.Session.request
+            
+        Returns:
+            requests.Response: The response
+        """
+        raise NotImplementedError
+    
+    def stats(self) -> Dict[str, int]:
+        """Counters reported in AFADScraper.stats()."""
+        return {}
+    
+    def close(self) -> None:
+        """Release resources held by the transport."""
+
+
+class SessionPool(Transport):
+    """
+    A pool of keep-alive sessions handed out to one worker at a time.
+    
+    Each checked-out session owns its own connection pool, so workers never
+    contend on a shared socket, while idle sessions are reused across thread
+    pool generations and keep their TLS connections warm. All sessions share
+    one cookie jar so the server-side session behind the token stays the same.
+    """
+    
+    def __init__(self, max_idle: int = 10) -> None:
+        """
+        Initialize the pool.
+        
+        Args:
+            max_idle (int): Maximum number of idle sessions kept for reuse
+        """
+        self.max_idle = max_idle
+        self.cookies = requests.cookies.RequestsCookieJar()
+        self._idle: List[requests.Session] = []
+        self._all: List[requests.Session] = []
+        # Counts of sessions already closed, so stats() still covers them
+        self._closed = {'sessions': 0, 'connections': 0, 'requests': 0}
+        self._lock = threading.Lock()
+    
+    def _new_session(self) -> requests.Session:
+        """Create a keep-alive session wired to the shared cookie jar."""
+        session = requests.Session()
+        session.verify = False
+        session.cookies = self.cookies
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        self._all.append(session)
+        return session
+    
+    @contextmanager
+    def session(self) -> Iterator[requests.Session]:
+        """
+        Check out a session for the duration of one request.
+        
+        Yields:
+            requests.Session: A session not used by any other worker meanwhile
+        """
+        with self._lock:
+            session = self._idle.pop() if self._idle else self._new_session()
+        try:
+            yield session
+        finally:
+            with self._lock:
+                if len(self._idle) < self.max_idle:
+                    self._idle.append(session)
+                else:
+                    self._all.remove(session)
+                    self._retire(session)
+                    session.close()
+    
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """Send a request over a checked-out session."""
+        with self.session() as session:
+            return session.request(method, url, **kwargs)
+    
+    def close(self) -> None:
+        """Close every session of the pool."""
+        with self._lock:
+            sessions, self._all, self._idle = self._all, [], []
+            for session in sessions:
+                self._retire(session)
+        for session in sessions:
+            session.close()
+    
+    @staticmethod
+    def _counts(session: requests.Session) -> Tuple[int, int]:
+        """Connections opened and requests sent by a session."""
+        connections = 0
+        requests_sent = 0
+        # The same adapter is mounted for both schemes
+        for adapter in {id(a): a for a in session.adapters.values()}.values():
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is not None:
+                    connections += pool.num_connections
+                    requests_sent += pool.num_requests
+        return connections, requests_sent
+    
+    def _retire(self, session: requests.Session) -> None:
+        """Add the counts of a session about to be closed to the pool totals; the caller holds the lock."""
+        connections, requests_sent = self._counts(session)
+        self._closed['sessions'] += 1
+        self._closed['connections'] += connections
+        self._closed['requests'] += requests_sent
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Report how many TCP+TLS handshakes keep-alive saved.
+        
+        Returns:
+            Dict[str, int]: Session counts of the pool, and connection and request counts
+            including those of sessions closed beyond max_idle
+        """
+        with self._lock:
+            sessions = list(self._all)
+            closed = dict(self._closed)
+        
+        connections = closed['connections']
+        requests_sent = closed['requests']
+        for session in sessions:
+            session_connections, session_requests = self._counts(session)
+            connections += session_connections
+            requests_sent += session_requests
+        
+        return {
+            'sessions': len(sessions),
+            'closed_sessions': closed['sessions'],
+            'connections': connections,
+            'requests': requests_sent,
+            'handshakes_saved': max(requests_sent - connections, 0),
+        }
+
+
+def exchange_key(method: str, url: str, data: Any = None) -> str:
+    """
+    Identify a request independently of the server it was sent to and the token it carried.
+    
+    Args:
+        method (str): HTTP method
+        url (str): Request URL
+        data (Any): Form body as a dict or an urlencoded string
+    
+    Returns:
+        str: Key shared by all requests that get the same answer
+    """
+    parts = urlsplit(url)
+    if isinstance(data, dict):
+        fields = [(str(k), str(v)) for k, v in data.items()]
+    elif data:
+        fields = parse_qsl(data, keep_blank_values=True)
+    else:
+        fields = []
+    fields = sorted((k, v) for k, v in fields if k != 'token')
+    return json.dumps([method.upper(), f"{parts.path}?{parts.query}", fields], ensure_ascii=False)
+
+
+def build_response(status: int, content_type: str, text: str, url: str = '') -> requests.Response:
+    """Build a requests.Response from stored parts."""
+    response = requests.Response()
+    response.status_code = status
+    response.headers['Content-Type'] = content_type
+    response._content = text.encode('utf-8')
+    response.encoding = 'utf-8'
+    response.url = url
+    return response
+
+
+class RecordingTransport(Transport):
+    """
+    Pass requests through to another transport and append every exchange to a JSONL file.
+    
+    Token pages, get_data JSON, map pages and query_point JSON are all kept,
+    failed answers included, so a replay meets the same conditions.
+    """
+    
+    def __init__(self, path: str, inner: Transport) -> None:
+        """
+        Initialize the recorder.
+        
+        Args:
+            path (str): Recording file; appended to if it exists
+            inner (Transport): Transport that actually sends the requests
+        """
+        self.path = path
+        self.inner = inner
+        self.recorded = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+    
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """Send the request through the inner transport and record the answer."""
+        response = self.inner.request(method, url, **kwargs)
+        line = json.dumps({
+            'key': exchange_key(method, url, kwargs.get('data')),
+            'status': response.status_code,
+            'content_type': response.headers.get('Content-Type', ''),
+            'text': response.text,
+        }, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+            self.recorded += 1
+        return response
+    
+    def stats(self) -> Dict[str, int]:
+        return {**self.inner.stats(), 'recorded': self.recorded}
+    
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+        self.inner.close()
+
+
+class ReplayTransport(Transport):
+    """
+    Answer requests from a recording made by RecordingTransport.
+    
+    Answers to the same request are served in recorded order, the last one
+    repeating once they run out. A request missing from the recording gets a
+    404 text page, which the scraper treats like any other failed request.
+    """
+    
+    def __init__(self, path: str) -> None:
+        """
+        Load a recording.
+        
+        Args:
+            path (str): Recording file
+        """
+        self._answers: Dict[str, List[Tuple[int, str, str]]] = {}
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                exchange = json.loads(line)
+                self._answers.setdefault(exchange['key'], []).append(
+                    (exchange['status'], exchange['content_type'], exchange['text'])
+                )
+        self._served: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.replayed = 0
+        self.misses = 0
+    
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """Serve the recorded answer to the request."""
+        key = exchange_key(method, url, kwargs.get('data'))
+        with self._lock:
+            answers = self._answers.get(key)
+            if not answers:
+                self.misses += 1
+                return build_response(404, 'text/plain', 'Kayıtta yanıt yok', url)
+            served = self._served.get(key, 0)
+            self._served[key] = served + 1
+            self.replayed += 1
+        status, content_type, text = answers[min(served, len(answers) - 1)]
+        return build_response(status, content_type, text, url)
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'exchanges': sum(len(a) for a in self._answers.values()),
+                    'replayed': self.replayed, 'misses': self.misses}
+
+
+class TokenManager:
+    """
+    Holds the shared auth token and coalesces concurrent refreshes.
+    
+    Workers report the token their request failed with. Only the first report
+    for a given token triggers a landing page fetch; everyone else who was
+    waiting on the lock picks up the fresh token instead.
+    """
+    
+    def __init__(self, fetch: Callable[[], str]) -> None:
+        """
+        Initialize the manager.
+        
+        Args:
+            fetch (Callable[[], str]): Function that fetches a new token from the server
+        """
+        self._fetch = fetch
+        self._lock = threading.Lock()
+        self._token: Optional[str] = None
+        self.fetches = 0
+        self.refreshes_requested = 0
+        self.refreshes_avoided = 0
+    
+    @property
+    def token(self) -> str:
+        """Current token, fetched on first use."""
+        token = self._token
+        if token is None:
+            token = self.refresh(None)
+        return token
+    
+    def refresh(self, stale_token: Optional[str]) -> str:
+        """
+        Replace a token that was rejected by the server.
+        
+        Args:
+            stale_token (Optional[str]): Token the failed request was sent with
+            
+        Returns:
+            str: A token newer than stale_token
+        """
+        with self._lock:
+            if stale_token is not None:
+                self.refreshes_requested += 1
+            if self._token is not None and self._token != stale_token:
+                # Somebody else already refreshed while we were waiting
+                self.refreshes_avoided += 1
+                return self._token
+            self._token = self._fetch()
+            self.fetches += 1
+            return self._token
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Report token fetch counters.
+        
+        Returns:
+            Dict[str, int]: Landing page fetches, refresh requests and coalesced refreshes
+        """
+        with self._lock:
+            return {
+                'fetches': self.fetches,
+                'refreshes_requested': self.refreshes_requested,
+                'refreshes_avoided': self.refreshes_avoided,
+            }
+
+
 class AFADScraper:
     """
     A class to interact with AFAD emergency gathering areas API.
@@ -27,22 +391,132 @@ class AFADScraper:
     
     # Constants
     BASE_URL = "https://www.turkiye.gov.tr"
-    TOPLANMA_ALANI_URL = f"{BASE_URL}/afet-ve-acil-durum-yonetimi-acil-toplanma-alani-sorgulama"
+    TOPLANMA_ALANI_PATH = "/afet-ve-acil-durum-yonetimi-acil-toplanma-alani-sorgulama"
+    TOPLANMA_ALANI_URL = f"{BASE_URL}{TOPLANMA_ALANI_PATH}"
+    
+    # Attempts get_data makes when the server answers with a non-JSON page
+    MAX_TOKEN_RETRIES = 5
     
     # Common headers for API requests
     BASE_HEADERS = {
         'Host': 'www.turkiye.gov.tr',
         'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/109.0.0.0 Safari/537.36',
         'Accept-Language': 'en-US,en;q=0.9,tr-TR;q=0.8,tr;q=0.7',
-        'Connection': 'close',
+        'Connection': 'keep-alive',
         'Dnt': '1',
     }
     
-    def __init__(self) -> None:
-        """Initialize the scraper with a new session and auth token."""
-        self.session = requests.Session()
-        self.session.verify = False
-        self.token = self._get_token()
+    def __init__(self,
+                 pool_size: int = 10,
+                 max_concurrency: Optional[int] = None,
+                 point_cache: Optional[PointCache] = None,
+                 limiter: Optional[AdaptiveLimiter] = None,
+                 sampler: Optional[AdaptiveSampler] = None,
+                 transport: Optional[Transport] = None,
+                 base_url: Optional[str] = None,
+                 metrics: Optional[MetricsRegistry] = None) -> None:
+        """
+        Initialize the scraper with a session pool.
+        
+        No request is made here; the auth token is fetched by the first request that needs it.
+        
+        Args:
+            pool_size (int): Maximum number of idle keep-alive sessions to keep
+            max_concurrency (Optional[int]): Largest window of the default limiter; defaults to pool_size.
+                                             It may exceed pool_size, sessions beyond it are closed after use
+            point_cache (Optional[PointCache]): Cache consulted before each query_point request
+            limiter (Optional[AdaptiveLimiter]): Concurrency controller shared by all requests;
+                                                 defaults to a window that starts at a quarter of
+                                                 max_concurrency and grows towards it while the server keeps up
+            sampler (Optional[AdaptiveSampler]): Decides which points of a neighborhood polygon are queried
+            transport (Optional[Transport]): Sends the requests; defaults to a SessionPool of pool_size
+            base_url (Optional[str]): Server to talk to instead of BASE_URL, e.g. a local mock_afad.py
+            metrics (Optional[MetricsRegistry]): Registry request metrics are recorded into
+        """
+        self.point_cache = point_cache
+        if limiter is None:
+            max_limit = max_concurrency or pool_size
+            limiter = AdaptiveLimiter(initial=max(1, max_limit // 4), max_limit=max_limit)
+        self.limiter = limiter
+        self.sampler = sampler or AdaptiveSampler()
+        self.transport = transport if transport is not None else SessionPool(max_idle=pool_size)
+        self.base_url = (base_url or self.BASE_URL).rstrip('/')
+        self.toplanma_alani_url = f"{self.base_url}{self.TOPLANMA_ALANI_PATH}"
+        self.base_headers = {**self.BASE_HEADERS, 'Host': urlsplit(self.base_url).netloc}
+        self._init_metrics(metrics if metrics is not None else MetricsRegistry())
+        self.tokens = TokenManager(self._get_token)
+    
+    def _init_metrics(self, metrics: MetricsRegistry) -> None:
+        """Register the request metrics, labelled by endpoint (token, get_data, map, query_point)."""
+        self.metrics = metrics
+        self._latency = metrics.histogram('afad_request_seconds', 'AFAD isteklerinin süresi (sn)', ('endpoint',))
+        self._queue_wait = metrics.histogram(
+            'afad_limiter_wait_seconds', 'İsteklerin eşzamanlılık penceresinde bekleme süresi (sn)', ('endpoint',)
+        )
+        self._requests = metrics.counter('afad_requests_total', 'Gönderilen AFAD istekleri', ('endpoint',))
+        self._errors = metrics.counter(
+            'afad_request_errors_total', 'Hata kodu, beklenmeyen içerik türü ya da bağlantı hatasıyla biten istekler',
+            ('endpoint',)
+        )
+        self._bytes = metrics.counter('afad_response_bytes_total', 'Alınan yanıt gövdesi baytları', ('endpoint',))
+        self._in_flight = metrics.gauge('afad_in_flight_requests', 'Yanıtı beklenen AFAD istekleri', ('endpoint',))
+        self._retries = metrics.counter('afad_retries_total', 'Yeniden denenen istekler', ('endpoint', 'reason'))
+        self._token_fetches = metrics.counter('afad_token_fetches_total', 'Jeton için çekilen giriş sayfaları')
+        self._token_refreshes = metrics.counter(
+            'afad_token_refresh_requests_total', 'Reddedilen jeton nedeniyle istenen yenilemeler'
+        )
+        metrics.gauge('afad_limiter_window', 'AIMD eşzamanlılık penceresi', function=lambda: self.limiter.window)
+    
+    def count_retry(self, endpoint: str, reason: str) -> None:
+        """
+        Count a retried request.
+        
+        Args:
+            endpoint (str): Endpoint label of the request
+            reason (str): "token" for a rejected token, "error" for a failed request
+        """
+        self._retries.inc(endpoint=endpoint, reason=reason)
+    
+    @property
+    def token(self) -> str:
+        """Current authentication token."""
+        return self.tokens.token
+    
+    def _request(self,
+                 endpoint: str,
+                 method: str,
+                 url: str,
+                 expect: Optional[str] = None,
+                 **kwargs: Any) -> requests.Response:
+        """
+        Send a request through the transport within the limiter's window.
+        
+        Args:
+            endpoint (str): Endpoint label the request's metrics are recorded under
+            method (str): HTTP method
+            url (str): Request URL
+            expect (Optional[str]): Content-Type prefix of a healthy response
+            **kwargs: Extra arguments for requests.Session.request
+            
+        Returns:
+            requests.Response: The server response
+        """
+        with self._queue_wait.time(endpoint=endpoint):
+            ticket = self.limiter.acquire()
+        self._requests.inc(endpoint=endpoint)
+        ok = False
+        try:
+            with self._in_flight.track(endpoint=endpoint), self._latency.time(endpoint=endpoint):
+                response = self.transport.request(method, url, **kwargs)
+            self._bytes.inc(len(response.content), endpoint=endpoint)
+            ok = response.status_code < 400 and (
+                expect is None or response.headers.get('Content-Type', '').startswith(expect)
+            )
+            return response
+        finally:
+            if not ok:
+                self._errors.inc(endpoint=endpoint)
+            self.limiter.release(ticket, ok)
     
     def _get_token(self) -> str:
         """
@@ -55,7 +529,9 @@ class AFADScraper:
             ValueError: If token cannot be found in the response
         """
         try:
-            response = self.session.get(self.TOPLANMA_ALANI_URL, headers=self.BASE_HEADERS)
+            self._token_fetches.inc()
+            response = self._request('token', 'GET', self.toplanma_alani_url, expect='text/html',
+                                     headers=self.base_headers)
             token_match = re.search(r'data-token=\"([^"]*)\"', response.text)
             
             if not token_match:
@@ -65,9 +541,30 @@ class AFADScraper:
         except requests.RequestException as e:
             raise ConnectionError(f"AFAD sunucusuna bağlanırken hata oluştu: {e}")
     
-    def refresh_token(self) -> None:
-        """Refresh the authentication token."""
-        self.token = self._get_token()
+    def refresh_token(self, stale_token: Optional[str] = None) -> None:
+        """
+        Refresh the authentication token.
+        
+        Concurrent callers that pass the same stale token share a single fetch.
+        
+        Args:
+            stale_token (Optional[str]): Token that was rejected; defaults to the current one
+        """
+        self._token_refreshes.inc()
+        self.tokens.refresh(stale_token if stale_token is not None else self.tokens.token)
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Report token, connection reuse and rate control counters.
+        
+        Returns:
+            Dict[str, Dict[str, Any]]: Token manager, session pool and limiter statistics
+        """
+        return {
+            'token': self.tokens.stats(),
+            'transport': self.transport.stats(),
+            'limiter': self.limiter.snapshot(),
+        }
     
     def get_data(self, payload: str) -> Dict[str, Any]:
         """
@@ -80,25 +577,33 @@ class AFADScraper:
             Dict[str, Any]: JSON response data
         """
         headers = {
-            **self.BASE_HEADERS, 
+            **self.base_headers, 
             'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8'
         }
         
-        data = f"token={self.token}&ajax=1&pn=/afet-ve-acil-durum-yonetimi-acil-toplanma-alani-sorgulama&{payload}"
-        
         try:
-            response = self.session.post(
-                f"{self.TOPLANMA_ALANI_URL}?submit", 
-                headers=headers, 
-                data=data
-            )
-            
-            # If response is not JSON, token might be expired; refresh and retry
-            if not response.headers['Content-Type'].startswith('application/json'):
-                self.refresh_token()
-                return self.get_data(payload)
+            for attempt in range(self.MAX_TOKEN_RETRIES):
+                token = self.token
+                data = f"token={token}&ajax=1&pn=/afet-ve-acil-durum-yonetimi-acil-toplanma-alani-sorgulama&{payload}"
+                response = self._request(
+                    'get_data',
+                    'POST',
+                    f"{self.toplanma_alani_url}?submit", 
+                    expect='application/json',
+                    headers=headers, 
+                    data=data
+                )
+                
+                # If response is not JSON, token might be expired; refresh and retry
+                if not response.headers.get('Content-Type', '').startswith('application/json'):
+                    if attempt + 1 < self.MAX_TOKEN_RETRIES:
+                        self.count_retry('get_data', 'token')
+                        self.refresh_token(token)
+                    continue
+                
+                return json.loads(response.text)
             
-            return json.loads(response.text)
+            raise ValueError(f"{self.MAX_TOKEN_RETRIES} jeton yenilemesine rağmen API yanıtı JSON değil")
             
         except requests.RequestException as e:
             raise ConnectionError(f"API isteği sırasında bağlantı hatası: {e}")
@@ -117,19 +622,24 @@ class AFADScraper:
             Optional[Dict[str, Any]]: JSON response containing gathering area information
                                      or None if not found
         """
+        if self.point_cache is not None:
+            cached = self.point_cache.get(lng, lat)
+            if cached is not None:
+                return cached
+        
         headers = {
-            **self.BASE_HEADERS,
+            **self.base_headers,
             'Sec-Ch-Ua': '"Not_A Brand";v="99", "Google Chrome";v="109", "Chromium";v="109"',
             'Sec-Ch-Ua-Mobile': '?0',
             'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8',
             'Accept': 'application/json, text/javascript, */*; q=0.01',
             'X-Requested-With': 'XMLHttpRequest',
             'Sec-Ch-Ua-Platform': '"macOS"',
-            'Origin': self.BASE_URL,
+            'Origin': self.base_url,
             'Sec-Fetch-Site': 'same-origin',
             'Sec-Fetch-Mode': 'cors',
             'Sec-Fetch-Dest': 'empty',
-            'Referer': f"{self.TOPLANMA_ALANI_URL}?harita=goster",
+            'Referer': f"{self.toplanma_alani_url}?harita=goster",
         }
 
         data = {
@@ -142,19 +652,83 @@ class AFADScraper:
         }
 
         try:
-            response = self.session.post(
-                f"{self.TOPLANMA_ALANI_URL}?harita=goster&submit",
+            response = self._request(
+                'query_point',
+                'POST',
+                f"{self.toplanma_alani_url}?harita=goster&submit",
+                expect='application/json',
                 headers=headers,
                 data=data,
             )
             
-            return response.json()
+            result = response.json()
         except (requests.RequestException, json.JSONDecodeError) as e:
             return None
+        
+        if self.point_cache is not None and isinstance(result, dict) and 'features' in result:
+            self.point_cache.set(lng, lat, result)
+        return result
     
-    def get_from_map(self, il_code: int, district_code: int, neighborhood_code: int) -> Optional[List[Dict[str, Any]]]:
+    def query_point_with_retry(self, lng: float, lat: float, max_retries: int = 3) -> Optional[Dict[str, Any]]:
         """
-        Get gathering area data from the map for the specified location.
+        Query a point, refreshing the token between failed attempts.
+        
+        Args:
+            lng (float): Longitude of the point
+            lat (float): Latitude of the point
+            max_retries (int): Maximum number of attempts
+            
+        Returns:
+            Optional[Dict[str, Any]]: JSON response or None if every attempt failed
+        """
+        result = None
+        retry_count = 0
+        
+        while result is None and retry_count < max_retries:
+            token = self.token
+            result = self.query_point(lng, lat)
+            retry_count += 1
+            if result is None and retry_count < max_retries:
+                self.count_retry('query_point', 'error')
+                self.refresh_token(token)
+                self.limiter.sleep_backoff(retry_count - 1)
+        
+        return result
+    
+    def query_points(self,
+                     points: Sequence[Tuple[float, float]],
+                     max_workers: Optional[int] = None) -> List[Optional[Dict[str, Any]]]:
+        """
+        Query many points concurrently.
+        
+        Identical coordinates are queried once. Requests go through the same
+        limiter window as every other request, so max_workers only bounds the
+        number of threads waiting on it.
+        
+        Args:
+            points (Sequence[Tuple[float, float]]): (lng, lat) pairs
+            max_workers (Optional[int]): Threads to fan out to; defaults to the limiter's maximum window
+            
+        Returns:
+            List[Optional[Dict[str, Any]]]: query_point_with_retry results in input order
+        """
+        unique = list(dict.fromkeys((float(lng), float(lat)) for lng, lat in points))
+        if not unique:
+            return []
+        
+        workers = min(max_workers or self.limiter.max_limit, len(unique))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Each call runs in a copy of the caller's context so scoped cache counters keep working
+            futures = [
+                executor.submit(contextvars.copy_context().run, self.query_point_with_retry, lng, lat)
+                for lng, lat in unique
+            ]
+            results = dict(zip(unique, (future.result() for future in futures)))
+        return [results[(float(lng), float(lat))] for lng, lat in points]
+    
+    def fetch_map_areas(self, il_code: int, district_code: int, neighborhood_code: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Fetch the neighborhood boundary features embedded in the map page.
         
         Args:
             il_code (int): City/province code
@@ -162,7 +736,7 @@ class AFADScraper:
             neighborhood_code (int): Neighborhood code
             
         Returns:
-            Optional[List[Dict[str, Any]]]: List of gathering areas or None if not found
+            Optional[List[Dict[str, Any]]]: GeoJSON features of the neighborhood or None if not found
         """
         data = {
             'ilKodu': il_code,
@@ -174,9 +748,12 @@ class AFADScraper:
         }
         
         try:
-            response = self.session.post(
-                f"{self.TOPLANMA_ALANI_URL}?submit", 
-                headers=self.BASE_HEADERS, 
+            response = self._request(
+                'map',
+                'POST',
+                f"{self.toplanma_alani_url}?submit", 
+                expect='text/html',
+                headers=self.base_headers, 
                 data=data
             )
             
@@ -187,42 +764,52 @@ class AFADScraper:
                 return None
 
             areas = json.loads(toplanma_alanlari_match.group(1))
-            if not areas:
-                return None
-
-            return self._process_gathering_areas(areas[0]['geometry']['coordinates'])
+            return areas or None
             
-        except (requests.RequestException, json.JSONDecodeError, IndexError) as e:
+        except (requests.RequestException, json.JSONDecodeError) as e:
             return None
     
-    def _process_gathering_areas(self, coordinates: List) -> List[Dict[str, Any]]:
+    def get_from_map(self, il_code: int, district_code: int, neighborhood_code: int) -> Optional[List[Dict[str, Any]]]:
         """
-        Process gathering area coordinates and get detailed information.
+        Get gathering area data from the map for the specified location.
         
         Args:
-            coordinates (List): List of coordinate points defining the area
+            il_code (int): City/province code
+            district_code (int): District code
+            neighborhood_code (int): Neighborhood code
             
         Returns:
-            List[Dict[str, Any]]: Processed gathering area information
+            Optional[List[Dict[str, Any]]]: List of gathering areas or None if not found
+        """
+        return self.query_map_areas(self.fetch_map_areas(il_code, district_code, neighborhood_code))
+    
+    def query_map_areas(self, areas: Optional[List[Dict[str, Any]]]) -> Optional[List[Dict[str, Any]]]:
         """
-        significant_points = self._extract_significant_vertices(coordinates)
-        query_results = []
+        Query the gathering areas of a neighborhood polygon fetched with fetch_map_areas.
         
-        for point in significant_points:
-            result = None
-            retry_count = 0
-            max_retries = 3
-            
-            while result is None and retry_count < max_retries:
-                result = self.query_point(point[0], point[1])
-                if result is None:
-                    self.refresh_token()
-                    retry_count += 1
+        Every part of every feature is sampled, in rounds, until a round finds
+        too few new gathering areas (see AdaptiveSampler).
+        
+        Args:
+            areas (Optional[List[Dict[str, Any]]]): GeoJSON features of the neighborhood
             
-            if result:
-                query_results.extend(result['features'])
+        Returns:
+            Optional[List[Dict[str, Any]]]: Distinct gathering areas or None if not found
+        """
+        try:
+            session = self.sampler.start(areas)
+        except (IndexError, KeyError, TypeError, ValueError):
+            return None
+        if session is None:
+            return None
+        
+        while True:
+            points = session.next_batch()
+            if not points:
+                break
+            session.record([self.query_point_with_retry(lng, lat) for lng, lat in points])
         
-        return query_results
+        return session.features()
     
     @staticmethod
     def _extract_significant_vertices(polygon: List) -> List[Tuple[float, float]]:
@@ -230,7 +817,8 @@ class AFADScraper:
         Extract significant vertices from a polygon to optimize API calls.
         
         This function extracts key points such as extremes and center to
-        represent the area efficiently with fewer API calls.
+        represent the area efficiently with fewer API calls. Superseded by
+        AdaptiveSampler; kept as the fixed five-point baseline.
         
         Args:
             polygon (List): Polygon coordinates
@@ -242,12 +830,8 @@ class AFADScraper:
         if len(points) < 6:
             return points
 
-        result = []
-        # Get extreme points (min/max in both X and Y dimensions)
-        for key in ['min', 'max']:
-            points_x = sorted(points, key=lambda x: x[0], reverse=(key=='max'))
-            points_y = sorted(points, key=lambda x: x[1], reverse=(key=='max'))
-            result.extend([points_x[0], points_y[0]])
+        # Get extreme points (min/max in both X and Y dimensions) in a single pass
+        result = ring_extremes(points)
 
         # Calculate and add the center point
         center_x = sum(p[0] for p in result) / 4
@@ -258,36 +842,41 @@ class AFADScraper:
 
 
 # For backward compatibility with existing code
-_instance = None
+_instance: Optional[AFADScraper] = None
+_instance_lock = threading.Lock()
+
+def shared_instance() -> AFADScraper:
+    """Return the scraper behind the legacy functions, creating it on first use."""
+    global _instance
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                _instance = AFADScraper()
+    return _instance
 
 def __init__() -> AFADScraper:
     """Initialize a global scraper instance for backward compatibility."""
     global _instance
-    _instance = AFADScraper()
+    with _instance_lock:
+        _instance = AFADScraper()
     return _instance
 
 def getData(payload: str) -> Dict[str, Any]:
     """Legacy function for backward compatibility."""
-    global _instance
-    if _instance is None:
-        _instance = AFADScraper()
-    return _instance.get_data(payload)
+    return shared_instance().get_data(payload)
 
 def getFromMap(il_code: int, district_code: int, neighborhood_code: int) -> Optional[List[Dict[str, Any]]]:
     """Legacy function for backward compatibility."""
-    global _instance
-    if _instance is None:
-        _instance = AFADScraper()
-    return _instance.get_from_map(il_code, district_code, neighborhood_code)
+    return shared_instance().get_from_map(il_code, district_code, neighborhood_code)
 
-# For compatibility
-get_token = lambda: _instance._get_token() if _instance else AFADScraper()._get_token()
-queryPoint = lambda lng, lat: _instance.query_point(lng, lat) if _instance else AFADScraper().query_point(lng, lat)
+def get_token() -> str:
+    """Legacy function for backward compatibility; fetches a fresh token."""
+    return shared_instance()._get_token()
 
+def queryPoint(lng: float, lat: float) -> Optional[Dict[str, Any]]:
+    """Legacy function for backward compatibility."""
+    return shared_instance().query_point(lng, lat)
 
-if __name__ == '__main__':
-    try:
-        scraper = AFADScraper()
-        print(f"Token başarıyla alındı: {scraper.token[:10]}...")
-    except Exception as e:
-        print(f"Hata oluştu: {e}")
\ No newline at end of file
+def queryPoints(points: Sequence[Tuple[float, float]]) -> List[Optional[Dict[str, Any]]]:
+    """Query many (lng, lat) points concurrently with the shared scraper; see AFADScraper.query_points."""
+    return shared_instance().query_points(points)
@@ -0,0 +1,400 @@
+"""
+Gathering Area Lookup Service
+
+This module provides a small self-hosted HTTP service over the collected
+`iller/*.json` files. All data is loaded once into memory: gathering areas
+live in a GatheringAreaIndex (each property dict stored once as encoded JSON)
+and the il/ilçe/mahalle/sokak hierarchy only holds names, ids and positions
+into that index. Requests are served by a plain asyncio server with HTTP/1.1
+keep-alive, so no extra web framework is needed.
+
+Endpoints:
+    GET  /nearest?lat=..&lng=..&k=..          k nearest gathering areas
+    POST /nearest                             {"points": [[lat, lng], ...], "k": 1}
+    GET  /iller                               city names
+    GET  /iller/<il>[/<ilce>[/<mahalle>[/<sokak>]]]
+    GET  /health
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import numpy as np
+
+from city_format import load_city_file, name_key
+from spatial_index import GatheringAreaIndex
+
+MAX_K = 50
+MAX_BATCH_POINTS = 10_000
+MAX_BODY_BYTES = 8 * 1024 * 1024
+MAX_HEADER_BYTES = 16 * 1024
+
+STATUS_TEXT = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+    413: 'Payload Too Large', 500: 'Internal Server Error',
+}
+
+
+class HTTPError(Exception):
+    """An error that is reported to the client with the given status code."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class Node:
+    """One level of the il/ilçe/mahalle hierarchy."""
+
+    __slots__ = ('name', 'id', 'children', 'streets', 'areas')
+
+    def __init__(self, name: str, node_id: int):
+        self.name = name
+        self.id = node_id
+        self.children: Dict[str, 'Node'] = {}
+        # Only set on neighborhoods: name key -> (street name, street id), index positions of areas
+        self.streets: Optional[Dict[str, Tuple[str, int]]] = None
+        self.areas: Optional[np.ndarray] = None
+
+
+class LookupData:
+    """
+    In-memory gathering area data shared by all requests.
+
+    Everything is read-only after construction, so request handlers and
+    executor threads can use it without locking.
+    """
+
+    def __init__(self, index: GatheringAreaIndex, cities: Dict[str, Node]):
+        """
+        Initialize from a built index and hierarchy.
+
+        Args:
+            index (GatheringAreaIndex): Spatial index of the deduplicated areas
+            cities (Dict[str, Node]): City nodes keyed by name_key()
+        """
+        self.index = index
+        self.cities = cities
+
+    @classmethod
+    def from_json_files(cls,
+                        paths: Optional[Iterable[str]] = None,
+                        index: Optional[GatheringAreaIndex] = None,
+                        cell_size: float = 0.05) -> 'LookupData':
+        """
+        Load city files, parsing each of them only once.
+
+        Args:
+            paths (Optional[Iterable[str]]): City files; defaults to iller/*.json
+            index (Optional[GatheringAreaIndex]): Prebuilt index to use instead of building one
+            cell_size (float): Grid cell size in degrees if the index is built here
+
+        Returns:
+            LookupData: The loaded data
+        """
+        if paths is None:
+            paths = sorted(glob.glob(os.path.join("iller", "*.json")))
+
+        cities: Dict[str, Node] = {}
+        neighborhoods: List[Tuple[Node, List[int]]] = []
+        areas: List[Dict[str, Any]] = []
+
+        for path in paths:
+            for city_name, city in load_city_file(path).items():
+                city_node = cities.setdefault(name_key(city_name), Node(city_name, city['ilId']))
+                for district_name, district in city['ilceler'].items():
+                    district_node = city_node.children.setdefault(
+                        name_key(district_name), Node(district_name, district['ilceId'])
+                    )
+                    for neighborhood_name, neighborhood in district['mahalleler'].items():
+                        node = Node(neighborhood_name, neighborhood['mahalleId'])
+                        node.streets = {
+                            name_key(street_name): (street_name, street['sokakId'])
+                            for street_name, street in neighborhood['sokaklar'].items()
+                        }
+                        district_node.children[name_key(neighborhood_name)] = node
+                        neighborhoods.append((node, [int(area_id) for area_id in neighborhood['toplanmaAlanlari']]))
+                        if index is None:
+                            areas.extend(neighborhood['toplanmaAlanlari'].values())
+
+        if index is None:
+            index = GatheringAreaIndex.from_areas(areas, cell_size)
+
+        positions = {area_id: position for position, area_id in enumerate(index.ids.tolist())}
+        for node, area_ids in neighborhoods:
+            node.areas = np.array([positions[area_id] for area_id in area_ids if area_id in positions], dtype=np.int32)
+
+        return cls(index, cities)
+
+    def _area_json(self, positions: Iterable[int]) -> bytes:
+        """Encoded JSON array of the areas at the given index positions."""
+        return b'[' + b','.join(self.index.raw_properties(p) for p in positions) + b']'
+
+    def _nearest_json(self, distances: np.ndarray, positions: np.ndarray) -> bytes:
+        """Encoded JSON array of one query's results, skipping missing neighbors."""
+        items = [
+            b'{"mesafe_m":%.1f,"alan":%s}' % (distance, self.index.raw_properties(position))
+            for distance, position in zip(distances.tolist(), positions.tolist())
+            if position >= 0
+        ]
+        return b'[' + b','.join(items) + b']'
+
+    def nearest(self, lat: float, lng: float, k: int) -> bytes:
+        """
+        Encoded response of a single nearest query.
+
+        Args:
+            lat (float): Latitude in degrees
+            lng (float): Longitude in degrees
+            k (int): Number of areas
+
+        Returns:
+            bytes: JSON response body
+        """
+        distances, positions = self.index.nearest_batch(np.array([lat]), np.array([lng]), k)
+        return b'{"sonuclar":' + self._nearest_json(distances[0], positions[0]) + b'}'
+
+    def nearest_batch(self, lats: np.ndarray, lngs: np.ndarray, k: int) -> bytes:
+        """
+        Encoded response of a batch nearest query, one result list per point.
+
+        Args:
+            lats (np.ndarray): Latitudes in degrees
+            lngs (np.ndarray): Longitudes in degrees
+            k (int): Number of areas per point
+
+        Returns:
+            bytes: JSON response body
+        """
+        distances, positions = self.index.nearest_batch(lats, lngs, k)
+        rows = [self._nearest_json(distances[i], positions[i]) for i in range(len(lats))]
+        return b'{"sonuclar":[' + b','.join(rows) + b']}'
+
+    def lookup(self, names: List[str]) -> bytes:
+        """
+        Encoded response of a hierarchical lookup.
+
+        Args:
+            names (List[str]): Up to four names: il, ilçe, mahalle, sokak
+
+        Returns:
+            bytes: JSON response body
+
+        Raises:
+            HTTPError: If a name is not found
+        """
+        labels = ('il', 'ilçe', 'mahalle')
+        if not names:
+            body = {'iller': [{'ad': city.name, 'ilId': city.id} for city in self.cities.values()]}
+            return json.dumps(body, ensure_ascii=False).encode('utf-8')
+
+        node = None
+        children = self.cities
+        for label, name in zip(labels, names[:3]):
+            node = children.get(name_key(name))
+            if node is None:
+                raise HTTPError(404, f"{label} bulunamadı: {name}")
+            children = node.children
+
+        if len(names) == 1:
+            body = {'il': node.name, 'ilId': node.id,
+                    'ilceler': [{'ad': d.name, 'ilceId': d.id} for d in node.children.values()]}
+        elif len(names) == 2:
+            body = {'ilce': node.name, 'ilceId': node.id,
+                    'mahalleler': [{'ad': n.name, 'mahalleId': n.id, 'alanSayisi': len(n.areas)}
+                                   for n in node.children.values()]}
+        elif len(names) == 3:
+            head = {'mahalle': node.name, 'mahalleId': node.id,
+                    'sokaklar': [{'ad': street, 'sokakId': street_id} for street, street_id in node.streets.values()]}
+            return self._with_areas(head, node)
+        else:
+            street = node.streets.get(name_key(names[3]))
+            if street is None:
+                raise HTTPError(404, f"sokak bulunamadı: {names[3]}")
+            head = {'sokak': street[0], 'sokakId': street[1], 'mahalle': node.name, 'mahalleId': node.id}
+            return self._with_areas(head, node)
+        return json.dumps(body, ensure_ascii=False).encode('utf-8')
+
+    def _with_areas(self, head: Dict[str, Any], node: Node) -> bytes:
+        """Append a neighborhood's areas to a response object without re-encoding them."""
+        encoded = json.dumps(head, ensure_ascii=False).encode('utf-8')
+        return encoded[:-1] + b',"toplanmaAlanlari":' + self._area_json(node.areas.tolist()) + b'}'
+
+
+class LookupServer:
+    """
+    A minimal HTTP/1.1 server for LookupData.
+
+    Single queries are answered directly on the event loop; a batch query
+    runs in a worker thread so that large batches do not stall the small
+    requests of other clients.
+    """
+
+    def __init__(self, data: LookupData, host: str = "127.0.0.1", port: int = 8080):
+        """
+        Initialize the server.
+
+        Args:
+            data (LookupData): Data to serve
+            host (str): Address to listen on
+            port (int): Port to listen on
+        """
+        self.data = data
+        self.host = host
+        self.port = port
+        self.requests = 0
+
+    def _parse_k(self, value: Any) -> int:
+        """Validate the requested number of areas."""
+        try:
+            k = int(value)
+        except (TypeError, ValueError):
+            raise HTTPError(400, "k bir tam sayı olmalı")
+        if not 1 <= k <= MAX_K:
+            raise HTTPError(400, f"k 1 ile {MAX_K} arasında olmalı")
+        return k
+
+    async def route(self, method: str, target: str, body: bytes) -> bytes:
+        """
+        Dispatch a request to its handler.
+
+        Args:
+            method (str): HTTP method
+            target (str): Request target (path and query string)
+            body (bytes): Request body
+
+        Returns:
+            bytes: JSON response body
+
+        Raises:
+            HTTPError: On invalid requests
+        """
+        url = urlsplit(target)
+        parts = [unquote(part) for part in url.path.split('/') if part]
+
+        if parts == ['nearest']:
+            if method == 'GET':
+                query = parse_qs(url.query)
+                try:
+                    lat = float(query['lat'][0])
+                    lng = float(query['lng'][0])
+                except (KeyError, ValueError):
+                    raise HTTPError(400, "lat ve lng sayısal olmalı")
+                if not np.isfinite([lat, lng]).all():
+                    raise HTTPError(400, "lat ve lng sayısal olmalı")
+                return self.data.nearest(lat, lng, self._parse_k(query.get('k', ['1'])[0]))
+            if method == 'POST':
+                try:
+                    payload = json.loads(body)
+                    points = np.asarray(payload['points'], dtype=np.float64)
+                except (ValueError, KeyError, TypeError):
+                    raise HTTPError(400, 'Gövde {"points": [[lat, lng], ...]} biçiminde olmalı')
+                if points.ndim != 2 or points.shape[1] != 2 or not np.isfinite(points).all():
+                    raise HTTPError(400, "points [lat, lng] çiftlerinden oluşmalı")
+                if len(points) > MAX_BATCH_POINTS:
+                    raise HTTPError(413, f"En fazla {MAX_BATCH_POINTS} nokta gönderilebilir")
+                k = self._parse_k(payload.get('k', 1))
+                return await asyncio.get_running_loop().run_in_executor(
+                    None, self.data.nearest_batch, points[:, 0], points[:, 1], k
+                )
+            raise HTTPError(405, "Yalnızca GET ve POST desteklenir")
+
+        if method != 'GET':
+            raise HTTPError(405, "Yalnızca GET desteklenir")
+        if parts == ['health']:
+            return json.dumps({'durum': 'ok', 'alanSayisi': len(self.data.index), 'istek': self.requests}).encode()
+        if parts and parts[0] == 'iller' and len(parts) <= 5:
+            return self.data.lookup(parts[1:])
+        raise HTTPError(404, "Bilinmeyen adres")
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve requests of one keep-alive connection."""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    return
+
+                lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, target, version = lines[0].split(' ')
+                except ValueError:
+                    return
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(':')
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                length = headers.get('content-length', '0') or '0'
+                # The body cannot be skipped without a valid length, so the connection is closed after an error
+                if not (length.isascii() and length.isdigit()):
+                    status, body, keep_alive = 400, b'{"hata":"Gecersiz Content-Length"}', False
+                elif int(length) > MAX_BODY_BYTES:
+                    status, body, keep_alive = 413, b'{"hata":"Istek govdesi cok buyuk"}', False
+                else:
+                    length = int(length)
+                    request_body = await reader.readexactly(length) if length else b''
+                    self.requests += 1
+                    try:
+                        status, body = 200, await self.route(method, target, request_body)
+                    except HTTPError as e:
+                        status, body = e.status, json.dumps({'hata': str(e)}, ensure_ascii=False).encode('utf-8')
+                    except Exception as e:
+                        logging.exception(f"{method} {target} işlenirken hata: {e}")
+                        status, body = 500, b'{"hata":"Sunucu hatasi"}'
+
+                writer.write(
+                    f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    return
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self) -> None:
+        """Listen and serve until cancelled."""
+        server = await asyncio.start_server(self.handle, self.host, self.port, limit=MAX_HEADER_BYTES)
+        logging.info(f"{len(self.data.index)} toplanma alanı http://{self.host}:{self.port} adresinde sunuluyor")
+        async with server:
+            await server.serve_forever()
+
+
+def main() -> None:
+    """Load the data and run the service."""
+    parser = argparse.ArgumentParser(description="Toplanma alanı sorgu servisi")
+    parser.add_argument("--host", default="127.0.0.1", help="Dinlenecek adres")
+    parser.add_argument("--port", type=int, default=8080, help="Dinlenecek port")
+    parser.add_argument("--index", help="spatial_index.py ile oluşturulmuş .npz indeksi (varsayılan: JSON'dan oluştur)")
+    parser.add_argument("files", nargs="*", help="Şehir dosyaları (varsayılan: iller/*.json)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    start_time = time.time()
+    index = GatheringAreaIndex.load(args.index) if args.index else None
+    data = LookupData.from_json_files(args.files or None, index=index)
+    logging.info(f"Veri {time.time() - start_time:.1f} saniyede yüklendi")
+
+    try:
+        asyncio.run(LookupServer(data, args.host, args.port).serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
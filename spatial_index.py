@@ -0,0 +1,417 @@
+"""
+Offline Gathering Area Spatial Index
+
+This module provides a deduplicated spatial index over every gathering area in
+the collected `iller/*.json` files. It answers k-nearest and within-radius
+queries with haversine distances, without a round-trip to turkiye.gov.tr,
+and can be saved to a single .npz file so that startup does not have to parse
+the JSON again.
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from city_stream import iter_neighborhoods
+
+EARTH_RADIUS_M = 6_371_008.8
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS_M / 180
+INDEX_VERSION = 1
+
+
+def haversine(lat1: np.ndarray, lng1: np.ndarray, lat2: np.ndarray, lng2: np.ndarray) -> np.ndarray:
+    """
+    Vectorized great-circle distance in meters; arguments broadcast.
+
+    Args:
+        lat1 (np.ndarray): Latitudes of the first points in degrees
+        lng1 (np.ndarray): Longitudes of the first points in degrees
+        lat2 (np.ndarray): Latitudes of the second points in degrees
+        lng2 (np.ndarray): Longitudes of the second points in degrees
+
+    Returns:
+        np.ndarray: Distances in meters
+    """
+    lat1, lng1, lat2, lng2 = (np.radians(a) for a in (lat1, lng1, lat2, lng2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def iter_city_areas(paths: Iterable[str]) -> Iterable[Dict[str, Any]]:
+    """
+    Yield every gathering area property dict found in the given city files.
+
+    Args:
+        paths (Iterable[str]): Paths of city files in either the nested or the normalized format
+
+    Yields:
+        Dict[str, Any]: Gathering area properties (duplicates included)
+    """
+    for path in paths:
+        for _, _, neighborhood in iter_neighborhoods(path):
+            yield from neighborhood['toplanmaAlanlari'].values()
+
+
+class GatheringAreaIndex:
+    """
+    A uniform grid over deduplicated gathering areas.
+
+    Points are sorted by grid cell so that each cell is a contiguous slice of
+    the coordinate arrays. Queries gather candidates from rings of cells
+    around the query cell and grow the ring until no point outside it can be
+    closer than the current k-th candidate, which keeps results exact.
+    """
+
+    def __init__(self,
+                 ids: np.ndarray,
+                 lat: np.ndarray,
+                 lng: np.ndarray,
+                 properties: List[bytes],
+                 cell_size: float = 0.05):
+        """
+        Build the index from coordinate arrays.
+
+        Args:
+            ids (np.ndarray): Gathering area ids
+            lat (np.ndarray): Latitudes (`y`) in degrees
+            lng (np.ndarray): Longitudes (`x`) in degrees
+            properties (List[bytes]): UTF-8 JSON encoded property dict of every area
+            cell_size (float): Grid cell size in degrees
+        """
+        self.cell_size = cell_size
+        rows = np.floor(np.asarray(lat, dtype=np.float64) / cell_size).astype(np.int64)
+        cols = np.floor(np.asarray(lng, dtype=np.float64) / cell_size).astype(np.int64)
+        order = np.lexsort((cols, rows))
+
+        self.ids = np.asarray(ids, dtype=np.int64)[order]
+        self.lat = np.asarray(lat, dtype=np.float64)[order]
+        self.lng = np.asarray(lng, dtype=np.float64)[order]
+        self._properties = [properties[i] for i in order]
+        self._rows = rows[order]
+        self._cols = cols[order]
+
+        # Occupied cells as parallel arrays; each cell is the slice [start, end) of the points
+        if len(self.ids):
+            boundaries = np.flatnonzero((np.diff(self._rows) != 0) | (np.diff(self._cols) != 0)) + 1
+            self._cell_starts = np.concatenate(([0], boundaries)).astype(np.int64)
+            self._cell_ends = np.concatenate((boundaries, [len(self.ids)])).astype(np.int64)
+        else:
+            self._cell_starts = self._cell_ends = np.empty(0, dtype=np.int64)
+        self._cell_rows = self._rows[self._cell_starts]
+        self._cell_cols = self._cols[self._cell_starts]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_json_files(cls, paths: Optional[Iterable[str]] = None, cell_size: float = 0.05) -> 'GatheringAreaIndex':
+        """
+        Build an index from published city files, deduplicating areas by id.
+
+        Args:
+            paths (Optional[Iterable[str]]): City files; defaults to iller/*.json
+            cell_size (float): Grid cell size in degrees
+
+        Returns:
+            GatheringAreaIndex: The built index
+        """
+        if paths is None:
+            paths = sorted(glob.glob(os.path.join("iller", "*.json")))
+        return cls.from_areas(iter_city_areas(paths), cell_size)
+
+    @classmethod
+    def from_areas(cls, areas: Iterable[Dict[str, Any]], cell_size: float = 0.05) -> 'GatheringAreaIndex':
+        """
+        Build an index from gathering area property dicts, deduplicating them by id.
+
+        Args:
+            areas (Iterable[Dict[str, Any]]): Gathering area properties, duplicates allowed
+            cell_size (float): Grid cell size in degrees
+
+        Returns:
+            GatheringAreaIndex: The built index
+        """
+        seen = set()
+        ids, lat, lng, properties = [], [], [], []
+        for area in areas:
+            area_id = int(area['id'])
+            if area_id in seen or area.get('x') is None or area.get('y') is None:
+                continue
+            seen.add(area_id)
+            ids.append(area_id)
+            lat.append(float(area['y']))
+            lng.append(float(area['x']))
+            properties.append(json.dumps(area, ensure_ascii=False).encode('utf-8'))
+
+        return cls(np.array(ids, dtype=np.int64), np.array(lat), np.array(lng), properties, cell_size)
+
+    def save(self, path: str) -> None:
+        """
+        Save the prebuilt index to an .npz file.
+
+        Args:
+            path (str): Output path
+        """
+        lengths = np.array([len(p) for p in self._properties], dtype=np.int64)
+        offsets = np.concatenate(([0], np.cumsum(lengths)))
+        blob = np.frombuffer(b''.join(self._properties), dtype=np.uint8)
+        np.savez(
+            path,
+            version=np.array(INDEX_VERSION),
+            cell_size=np.array(self.cell_size),
+            ids=self.ids, lat=self.lat, lng=self.lng,
+            property_offsets=offsets, property_blob=blob,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> 'GatheringAreaIndex':
+        """
+        Load an index saved with save().
+
+        Args:
+            path (str): Path of the .npz file
+
+        Returns:
+            GatheringAreaIndex: The loaded index
+
+        Raises:
+            ValueError: If the file was written by an incompatible version
+        """
+        with np.load(path) as data:
+            if int(data['version']) != INDEX_VERSION:
+                raise ValueError(f"Desteklenmeyen indeks sürümü: {int(data['version'])}")
+            offsets = data['property_offsets'].tolist()
+            blob = data['property_blob'].tobytes()
+            properties = [blob[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+            return cls(data['ids'], data['lat'], data['lng'], properties, float(data['cell_size']))
+
+    def properties(self, index: int) -> Dict[str, Any]:
+        """
+        Decode the property dict of the area at a position in the index.
+
+        Args:
+            index (int): Position returned by a query
+
+        Returns:
+            Dict[str, Any]: Gathering area properties
+        """
+        return json.loads(self.raw_properties(index))
+
+    def raw_properties(self, index: int) -> bytes:
+        """
+        UTF-8 JSON encoding of the property dict of the area at a position in the index.
+
+        Args:
+            index (int): Position returned by a query
+
+        Returns:
+            bytes: Encoded gathering area properties
+        """
+        return self._properties[index]
+
+    def _cell_points(self, cells: np.ndarray) -> np.ndarray:
+        """Positions of all points in the given occupied cells."""
+        starts = self._cell_starts[cells]
+        lengths = self._cell_ends[cells] - starts
+        offsets = np.cumsum(lengths) - lengths
+        return np.repeat(starts - offsets, lengths) + np.arange(lengths.sum())
+
+    def _cells_by_ring(self, row: int, col: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Occupied cells ordered by their ring (Chebyshev distance in cells) around a cell.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Sorted ring numbers and the matching cell positions
+        """
+        rings = np.maximum(np.abs(self._cell_rows - row), np.abs(self._cell_cols - col))
+        order = np.argsort(rings, kind='stable')
+        return rings[order], order
+
+    def _ring_clearance(self, row: int, ring: int) -> float:
+        """Lower bound in meters of the distance from a cell to anything outside `ring`."""
+        # Longitude degrees shrink towards the poles, so use the widest latitude of the ring;
+        # the 0.99 covers great circles bowing poleward of the parallels
+        max_lat = min(90.0, (max(abs(row - ring), abs(row + ring + 1))) * self.cell_size)
+        return 0.99 * ring * self.cell_size * METERS_PER_DEGREE * math.cos(math.radians(max_lat))
+
+    def _group_by_cell(self, lats: np.ndarray, lngs: np.ndarray) -> Iterable[Tuple[int, int, np.ndarray]]:
+        """Yield (row, col, query positions) for every grid cell holding queries."""
+        rows = np.floor(lats / self.cell_size).astype(np.int64)
+        cols = np.floor(lngs / self.cell_size).astype(np.int64)
+        order = np.lexsort((cols, rows))
+        boundaries = np.flatnonzero((np.diff(rows[order]) != 0) | (np.diff(cols[order]) != 0)) + 1
+        for group in np.split(order, boundaries):
+            yield int(rows[group[0]]), int(cols[group[0]]), group
+
+    def nearest_batch(self, lats: np.ndarray, lngs: np.ndarray, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the k nearest areas of many points at once.
+
+        Queries falling in the same grid cell share one candidate set, so the
+        distance computation is a single vectorized step per occupied cell.
+
+        Args:
+            lats (np.ndarray): Query latitudes in degrees
+            lngs (np.ndarray): Query longitudes in degrees
+            k (int): Number of neighbors
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Distances in meters and index positions, both of
+            shape (n, k), sorted by distance; missing neighbors are inf / -1
+        """
+        lats = np.atleast_1d(np.asarray(lats, dtype=np.float64))
+        lngs = np.atleast_1d(np.asarray(lngs, dtype=np.float64))
+        distances = np.full((len(lats), k), np.inf)
+        positions = np.full((len(lats), k), -1, dtype=np.int64)
+        if not len(self.ids) or not len(lats):
+            return distances, positions
+
+        k_eff = min(k, len(self.ids))
+        for row, col, pending in self._group_by_cell(lats, lngs):
+            rings, cells = self._cells_by_ring(row, col)
+            taken = 0
+            reach = 0
+            candidates = np.empty(0, dtype=np.int64)
+            while True:
+                # Take in the next occupied ring, or every ring up to the reach the current
+                # k-th distances call for; empty rings are skipped altogether
+                end = np.searchsorted(rings, max(rings[taken], reach), side='right')
+                candidates = np.concatenate((candidates, self._cell_points(cells[taken:end])))
+                taken = end
+                if len(candidates) < k_eff:
+                    continue
+
+                d = haversine(lats[pending, None], lngs[pending, None], self.lat[candidates], self.lng[candidates])
+                top = np.argpartition(d, k_eff - 1, axis=1)[:, :k_eff]
+                top_d = np.take_along_axis(d, top, axis=1)
+                sort = np.argsort(top_d, axis=1)
+                top_d = np.take_along_axis(top_d, sort, axis=1)
+                top = candidates[np.take_along_axis(top, sort, axis=1)]
+
+                if taken == len(cells):
+                    done = np.ones(len(pending), dtype=bool)
+                else:
+                    # Everything not taken yet lies outside ring rings[taken] - 1
+                    done = top_d[:, -1] <= self._ring_clearance(row, int(rings[taken]) - 1)
+                distances[pending[done], :k_eff] = top_d[done]
+                positions[pending[done], :k_eff] = top[done]
+                pending = pending[~done]
+                if not len(pending):
+                    break
+
+                worst = top_d[~done, -1].max()
+                reach = int(rings[taken])
+                while reach < rings[-1] and self._ring_clearance(row, reach) < worst:
+                    reach += 1
+
+        return distances, positions
+
+    def nearest(self, lat: float, lng: float, k: int = 1) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Find the k nearest gathering areas of a point.
+
+        Args:
+            lat (float): Latitude in degrees
+            lng (float): Longitude in degrees
+            k (int): Number of neighbors
+
+        Returns:
+            List[Tuple[Dict[str, Any], float]]: (properties, distance in meters), nearest first
+        """
+        distances, positions = self.nearest_batch(np.array([lat]), np.array([lng]), k)
+        return [
+            (self.properties(int(p)), float(d))
+            for d, p in zip(distances[0], positions[0]) if p >= 0
+        ]
+
+    def within_radius_batch(self, lats: np.ndarray, lngs: np.ndarray, radius_m: float) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Find all areas within a radius of many points.
+
+        Args:
+            lats (np.ndarray): Query latitudes in degrees
+            lngs (np.ndarray): Query longitudes in degrees
+            radius_m (float): Radius in meters
+
+        Returns:
+            List[Tuple[np.ndarray, np.ndarray]]: Per query, distances and index positions sorted by distance
+        """
+        lats = np.atleast_1d(np.asarray(lats, dtype=np.float64))
+        lngs = np.atleast_1d(np.asarray(lngs, dtype=np.float64))
+        results: List[Tuple[np.ndarray, np.ndarray]] = [
+            (np.empty(0), np.empty(0, dtype=np.int64)) for _ in range(len(lats))
+        ]
+        if not len(self.ids):
+            return results
+
+        for row, col, group in self._group_by_cell(lats, lngs):
+            rings, cells = self._cells_by_ring(row, col)
+            last = 0
+            while self._ring_clearance(row, last) < radius_m and last < rings[-1]:
+                last += 1
+            candidates = self._cell_points(cells[:np.searchsorted(rings, last, side='right')])
+            if not len(candidates):
+                continue
+            d = haversine(lats[group, None], lngs[group, None], self.lat[candidates], self.lng[candidates])
+            for i, query in enumerate(group):
+                hits = np.flatnonzero(d[i] <= radius_m)
+                hits = hits[np.argsort(d[i, hits])]
+                results[query] = (d[i, hits], candidates[hits])
+
+        return results
+
+    def within_radius(self, lat: float, lng: float, radius_m: float) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Find all gathering areas within a radius of a point.
+
+        Args:
+            lat (float): Latitude in degrees
+            lng (float): Longitude in degrees
+            radius_m (float): Radius in meters
+
+        Returns:
+            List[Tuple[Dict[str, Any], float]]: (properties, distance in meters), nearest first
+        """
+        distances, positions = self.within_radius_batch(np.array([lat]), np.array([lng]), radius_m)[0]
+        return [(self.properties(int(p)), float(d)) for d, p in zip(distances, positions)]
+
+
+def main() -> None:
+    """Build, save and query the index from the command line."""
+    parser = argparse.ArgumentParser(description="Toplanma alanları için çevrimdışı konum indeksi")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build = subparsers.add_parser("build", help="iller/*.json dosyalarından indeks oluştur")
+    build.add_argument("--output", default="toplanma_alanlari.npz", help="İndeks dosyası")
+    build.add_argument("--cell-size", type=float, default=0.05, help="Izgara hücre boyutu (derece)")
+    build.add_argument("files", nargs="*", help="Şehir dosyaları (varsayılan: iller/*.json)")
+
+    query = subparsers.add_parser("query", help="Bir noktaya en yakın toplanma alanlarını bul")
+    query.add_argument("lat", type=float)
+    query.add_argument("lng", type=float)
+    query.add_argument("-k", type=int, default=3, help="Döndürülecek alan sayısı")
+    query.add_argument("--radius", type=float, help="Bu yarıçap (metre) içindeki tüm alanları döndür")
+    query.add_argument("--index", default="toplanma_alanlari.npz", help="İndeks dosyası")
+
+    args = parser.parse_args()
+    if args.command == "build":
+        index = GatheringAreaIndex.from_json_files(args.files or None, cell_size=args.cell_size)
+        index.save(args.output)
+        print(f"{len(index)} toplanma alanı indekslendi: {args.output}")
+    else:
+        index = GatheringAreaIndex.load(args.index)
+        if args.radius is not None:
+            results = index.within_radius(args.lat, args.lng, args.radius)
+        else:
+            results = index.nearest(args.lat, args.lng, args.k)
+        for area, distance in results:
+            print(json.dumps({**area, 'mesafe_m': round(distance, 1)}, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
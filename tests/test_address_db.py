@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from address_db import AddressDatabase
+
+
+def _area(area_id, name, x, y):
+    return {'id': area_id, 'tesis_adi': name, 'il_adi': 'KİLİS', 'ilce_adi': 'MERKEZ', 'mahalle_adi': 'ŞEHİTLER',
+            'sokak_adi': None, 'acik_adres': None, 'tabela_kod': None, 'x': x, 'y': y}
+
+
+def _write_city(path, areas):
+    city = {'Kilis': {'ilId': 79, 'ilceler': {'MERKEZ': {'ilceId': 1, 'mahalleler': {
+        'ŞEHİTLER': {'mahalleId': 10, 'sokaklar': {'ATATÜRK CAD.': {'sokakId': 100}},
+                     'toplanmaAlanlari': {str(area['id']): area for area in areas}},
+        'YENİ': {'mahalleId': 11, 'sokaklar': {}, 'toplanmaAlanlari': {str(areas[0]['id']): areas[0]}},
+    }}}}}
+    path.write_text(json.dumps(city, ensure_ascii=False), encoding='utf-8')
+
+
+def test_reimport_keeps_areas_searchable(tmp_path):
+    city_file = tmp_path / 'Kilis.json'
+    _write_city(city_file, [_area(1, 'ŞEHİT PARKI', 37.1, 36.7), _area(2, 'OKUL BAHÇESİ', 37.2, 36.8)])
+    database = AddressDatabase(str(tmp_path / 'adres.sqlite3'))
+    database.import_city(str(city_file))
+    database.import_city(str(city_file))
+
+    assert [result['id'] for result in database.search('park', kind='alan')] == [1]
+    assert {result['id'] for result in database.search('sehit bahce', kind='alan')} == {2}
+
+    # Changed fields replace the old ones and removed areas disappear
+    _write_city(city_file, [_area(1, 'MİLLET PARKI', 37.3, 36.9)])
+    database.import_city(str(city_file))
+    assert [result['ad'] for result in database.search('park', kind='alan')] == ['MİLLET PARKI']
+    assert [area['id'] for area in database.areas_in_box(37.25, 36.85, 37.35, 36.95)] == [1]
+    assert database.stats()['areas'] == 1
+    database.close()
+
+
+def test_search_rejects_unknown_kind(tmp_path):
+    database = AddressDatabase(str(tmp_path / 'adres.sqlite3'))
+    with pytest.raises(ValueError):
+        database.search('park', kind='alan" OR name : "x')
+    assert database.search('park', kind='alan') == []
+    database.close()
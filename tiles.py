@@ -0,0 +1,386 @@
+"""
+Precomputed Gathering Area Map Tiles
+
+This module cuts the deduplicated gathering areas into slippy map tiles
+(Web Mercator z/x/y), so map clients fetch the few KB of the tiles in view
+instead of whole `iller/*.json` files.
+
+The areas form a linear quadtree: each one gets the Morton code of its tile
+at KEY_ZOOM and they are sorted by it, which makes every tile of every zoom
+level a contiguous slice of the sorted arrays. Tiles up to `cluster_max_zoom`
+hold clusters, one per occupied quadtree node `cluster_depth` levels below
+the tile, with their member count and mean position; deeper tiles hold the
+areas themselves. Tiles are written as GeoJSON or in a compact binary form:
+
+    "ATIL" | version u8 | zoom u8 | reserved u16 | feature count u32
+    | per feature: lat e6 i32, lng e6 i32, count u32, area id i64 (-1 for clusters)
+    | per feature: name length u16 and UTF-8 name (empty for clusters)
+
+A manifest with the SHA-256 of every tile is written next to them; on the
+next run tiles whose content did not change are not rewritten and tiles
+that disappeared are removed, so a sync of the output directory only moves
+what changed.
+
+    python tiles.py build --output-dir tiles
+    python tiles.py build --store iller.bin --format binary --max-zoom 15
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import struct
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from spatial_index import iter_city_areas
+
+TILES_VERSION = 1
+KEY_ZOOM = 24
+MAX_LATITUDE = 85.05112878
+BINARY_HEADER = struct.Struct('<4sBBHI')
+BINARY_MAGIC = b'ATIL'
+EXTENSIONS = {'geojson': '.geojson', 'binary': '.bin'}
+# Properties of an area kept in point tiles; the rest is one /iller lookup away
+POINT_PROPERTIES = ('id', 'tesis_adi', 'acik_adres')
+
+
+class TilePoints:
+    """Deduplicated areas sorted along the quadtree."""
+
+    def __init__(self, ids: np.ndarray, lat: np.ndarray, lng: np.ndarray, properties: List[Dict[str, Any]]):
+        """
+        Sort the areas by their Morton code.
+
+        Args:
+            ids (np.ndarray): Gathering area ids
+            lat (np.ndarray): Latitudes (`y`) in degrees
+            lng (np.ndarray): Longitudes (`x`) in degrees
+            properties (List[Dict[str, Any]]): POINT_PROPERTIES of every area
+        """
+        lat = np.asarray(lat, dtype=np.float64)
+        lng = np.asarray(lng, dtype=np.float64)
+        tile_x, tile_y = tile_coordinates(lat, lng, KEY_ZOOM)
+        keys = _interleave(tile_x, tile_y)
+        # Ties broken by id so that the same data always gives byte-identical tiles
+        order = np.lexsort((np.asarray(ids, dtype=np.int64), keys))
+
+        self.keys = keys[order]
+        self.ids = np.asarray(ids, dtype=np.int64)[order]
+        self.lat = lat[order]
+        self.lng = lng[order]
+        self.properties = [properties[i] for i in order]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_areas(cls, areas: Iterable[Dict[str, Any]]) -> 'TilePoints':
+        """
+        Collect areas from property dicts, deduplicating them by id.
+
+        Args:
+            areas (Iterable[Dict[str, Any]]): Gathering area properties, duplicates allowed
+
+        Returns:
+            TilePoints: The sorted areas
+        """
+        seen = set()
+        ids, lat, lng, properties = [], [], [], []
+        for area in areas:
+            area_id = int(area['id'])
+            if area_id in seen or area.get('x') is None or area.get('y') is None:
+                continue
+            seen.add(area_id)
+            ids.append(area_id)
+            lat.append(float(area['y']))
+            lng.append(float(area['x']))
+            properties.append({key: area.get(key) for key in POINT_PROPERTIES})
+        return cls(np.array(ids, dtype=np.int64), np.array(lat), np.array(lng), properties)
+
+    @classmethod
+    def from_store(cls, path: str) -> 'TilePoints':
+        """
+        Collect areas from a binary store written by area_store.py, without parsing any JSON.
+
+        Args:
+            path (str): Path of the store
+
+        Returns:
+            TilePoints: The sorted areas
+        """
+        from area_store import AreaStore
+
+        with AreaStore(path) as store:
+            _, rows = np.unique(store.area_id, return_index=True)
+            rows = rows[~(np.isnan(store.area_x[rows]) | np.isnan(store.area_y[rows]))]
+            properties = [{key: store.area(int(row)).get(key) for key in POINT_PROPERTIES} for row in rows]
+            return cls(store.area_id[rows].copy(), store.area_y[rows].copy(), store.area_x[rows].copy(), properties)
+
+    def tiles(self, zoom: int) -> Iterable[Tuple[int, int, int, int]]:
+        """
+        Yield the occupied tiles of a zoom level.
+
+        Args:
+            zoom (int): Zoom level, at most KEY_ZOOM
+
+        Yields:
+            Tuple[int, int, int, int]: Tile x, tile y and the slice [start, end) of its areas
+        """
+        if not len(self.keys):
+            return
+        tile_keys = self.keys >> np.uint64(2 * (KEY_ZOOM - zoom))
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(tile_keys)) + 1))
+        ends = np.concatenate((starts[1:], [len(tile_keys)]))
+        tile_x, tile_y = _deinterleave(tile_keys[starts])
+        yield from zip(tile_x.tolist(), tile_y.tolist(), starts.tolist(), ends.tolist())
+
+    def clusters(self, zoom: int, start: int, end: int, depth: int) -> List[Dict[str, Any]]:
+        """
+        Cluster the areas of one tile by the quadtree nodes `depth` levels below it.
+
+        Args:
+            zoom (int): Zoom level of the tile
+            start (int): First area of the tile
+            end (int): End of the tile's slice
+            depth (int): Levels below the tile; a tile has at most 4 ** depth clusters
+
+        Returns:
+            List[Dict[str, Any]]: Features with lat, lng, count and, for single areas, their properties
+        """
+        node_keys = self.keys[start:end] >> np.uint64(2 * (KEY_ZOOM - min(zoom + depth, KEY_ZOOM)))
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(node_keys)) + 1))
+        counts = np.diff(np.concatenate((starts, [len(node_keys)])))
+        lat = np.add.reduceat(self.lat[start:end], starts) / counts
+        lng = np.add.reduceat(self.lng[start:end], starts) / counts
+
+        features = []
+        for first, count, cluster_lat, cluster_lng in zip(starts.tolist(), counts.tolist(), lat.tolist(), lng.tolist()):
+            if count == 1:
+                features.append(self.point(start + first))
+            else:
+                features.append({'lat': cluster_lat, 'lng': cluster_lng, 'count': count, 'properties': None})
+        return features
+
+    def points(self, start: int, end: int) -> List[Dict[str, Any]]:
+        """Features of the areas of one tile."""
+        return [self.point(i) for i in range(start, end)]
+
+    def point(self, i: int) -> Dict[str, Any]:
+        """Feature of a single area."""
+        return {'lat': float(self.lat[i]), 'lng': float(self.lng[i]), 'count': 1, 'properties': self.properties[i]}
+
+
+def tile_coordinates(lat: np.ndarray, lng: np.ndarray, zoom: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Web Mercator tile of each point at a zoom level.
+
+    Args:
+        lat (np.ndarray): Latitudes in degrees
+        lng (np.ndarray): Longitudes in degrees
+        zoom (int): Zoom level
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Tile x and y (uint64), y growing southwards
+    """
+    n = 2 ** zoom
+    lat = np.radians(np.clip(lat, -MAX_LATITUDE, MAX_LATITUDE))
+    x = np.floor((np.asarray(lng) + 180.0) / 360.0 * n)
+    y = np.floor((1.0 - np.log(np.tan(lat) + 1.0 / np.cos(lat)) / np.pi) / 2.0 * n)
+    return np.clip(x, 0, n - 1).astype(np.uint64), np.clip(y, 0, n - 1).astype(np.uint64)
+
+
+def _spread(v: np.ndarray) -> np.ndarray:
+    """Insert a zero bit above each of the low 32 bits."""
+    v = v & np.uint64(0x00000000FFFFFFFF)
+    for shift, mask in ((16, 0x0000FFFF0000FFFF), (8, 0x00FF00FF00FF00FF), (4, 0x0F0F0F0F0F0F0F0F),
+                        (2, 0x3333333333333333), (1, 0x5555555555555555)):
+        v = (v | (v << np.uint64(shift))) & np.uint64(mask)
+    return v
+
+
+def _compact(v: np.ndarray) -> np.ndarray:
+    """Inverse of _spread: keep every other bit."""
+    v = v & np.uint64(0x5555555555555555)
+    for shift, mask in ((1, 0x3333333333333333), (2, 0x0F0F0F0F0F0F0F0F), (4, 0x00FF00FF00FF00FF),
+                        (8, 0x0000FFFF0000FFFF), (16, 0x00000000FFFFFFFF)):
+        v = (v | (v >> np.uint64(shift))) & np.uint64(mask)
+    return v
+
+
+def _interleave(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Morton code of tile coordinates; the code of the parent tile is the code shifted right by 2."""
+    return _spread(x) | (_spread(y) << np.uint64(1))
+
+
+def _deinterleave(keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Tile coordinates of Morton codes."""
+    return _compact(keys), _compact(keys >> np.uint64(1))
+
+
+def encode_geojson(features: List[Dict[str, Any]]) -> bytes:
+    """Encode tile features as a GeoJSON FeatureCollection."""
+    collection = {
+        'type': 'FeatureCollection',
+        'features': [
+            {
+                'type': 'Feature',
+                'geometry': {'type': 'Point', 'coordinates': [round(f['lng'], 6), round(f['lat'], 6)]},
+                'properties': f['properties'] if f['count'] == 1 else {'cluster': True, 'count': f['count']},
+            }
+            for f in features
+        ],
+    }
+    return json.dumps(collection, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def encode_binary(features: List[Dict[str, Any]], zoom: int) -> bytes:
+    """Encode tile features in the compact binary form described in the module docstring."""
+    records = np.zeros(len(features), dtype=[('lat', '<i4'), ('lng', '<i4'), ('count', '<u4'), ('id', '<i8')])
+    names = []
+    for i, f in enumerate(features):
+        records[i] = (round(f['lat'] * 1e6), round(f['lng'] * 1e6), f['count'],
+                      f['properties']['id'] if f['count'] == 1 else -1)
+        name = (f['properties'] or {}).get('tesis_adi') or ''
+        names.append(name.encode('utf-8')[:0xFFFF])
+    header = BINARY_HEADER.pack(BINARY_MAGIC, TILES_VERSION, zoom, 0, len(features))
+    return header + records.tobytes() + b''.join(struct.pack('<H', len(name)) + name for name in names)
+
+
+def load_manifest(path: str) -> Dict[str, Any]:
+    """The manifest of a previous run, or an empty one."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'tiles': {}}
+
+
+def build_tiles(points: TilePoints,
+                output_dir: str,
+                min_zoom: int = 5,
+                max_zoom: int = 14,
+                cluster_max_zoom: int = 11,
+                cluster_depth: int = 3,
+                output_format: str = 'geojson') -> Dict[str, int]:
+    """
+    Write the tiles of all zoom levels and their manifest, skipping unchanged tiles.
+
+    Args:
+        points (TilePoints): Areas to cut into tiles
+        output_dir (str): Directory of z/x/y tiles and manifest.json
+        min_zoom (int): First zoom level
+        max_zoom (int): Last zoom level, at most KEY_ZOOM
+        cluster_max_zoom (int): Last zoom level whose tiles hold clusters instead of areas
+        cluster_depth (int): Quadtree levels between a tile and its clusters
+        output_format (str): 'geojson' or 'binary'
+
+    Returns:
+        Dict[str, int]: Number of tiles written, unchanged, removed and in total, and bytes written
+    """
+    if not 0 <= min_zoom <= max_zoom <= KEY_ZOOM:
+        raise ValueError(f"Yakınlaştırma seviyeleri 0 ile {KEY_ZOOM} arasında olmalı: {min_zoom}-{max_zoom}")
+    manifest_path = os.path.join(output_dir, 'manifest.json')
+    previous = load_manifest(manifest_path).get('tiles', {})
+    extension = EXTENSIONS[output_format]
+    tiles: Dict[str, Dict[str, Any]] = {}
+    stats = {'yazilan': 0, 'degismeyen': 0, 'silinen': 0, 'toplam': 0, 'bayt': 0}
+
+    for zoom in range(min_zoom, max_zoom + 1):
+        for x, y, start, end in points.tiles(zoom):
+            if zoom <= cluster_max_zoom:
+                features = points.clusters(zoom, start, end, cluster_depth)
+            else:
+                features = points.points(start, end)
+            content = encode_geojson(features) if output_format == 'geojson' else encode_binary(features, zoom)
+            name = f"{zoom}/{x}/{y}{extension}"
+            digest = hashlib.sha256(content).hexdigest()
+            tiles[name] = {'sha256': digest, 'bytes': len(content), 'areas': end - start}
+
+            path = os.path.join(output_dir, name)
+            if previous.get(name, {}).get('sha256') == digest and os.path.exists(path):
+                stats['degismeyen'] += 1
+                continue
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path + '.tmp', 'wb') as f:
+                f.write(content)
+            os.replace(path + '.tmp', path)
+            stats['yazilan'] += 1
+            stats['bayt'] += len(content)
+
+    for name in previous.keys() - tiles.keys():
+        path = os.path.join(output_dir, name)
+        try:
+            os.remove(path)
+            stats['silinen'] += 1
+        except FileNotFoundError:
+            continue
+        try:
+            # Drop the z/x directories the last tile was removed from; stops at the first non-empty one
+            os.removedirs(os.path.dirname(path))
+        except OSError:
+            pass
+    stats['toplam'] = len(tiles)
+
+    manifest = {
+        'version': TILES_VERSION, 'format': output_format, 'min_zoom': min_zoom, 'max_zoom': max_zoom,
+        'cluster_max_zoom': cluster_max_zoom, 'cluster_depth': cluster_depth, 'areas': len(points),
+        'generated': time.strftime('%Y-%m-%dT%H:%M:%S'), 'tiles': tiles,
+    }
+    os.makedirs(output_dir, exist_ok=True)
+    with open(manifest_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(manifest_path + '.tmp', manifest_path)
+    return stats
+
+
+def load_points(paths: Optional[List[str]] = None, store_path: Optional[str] = None) -> TilePoints:
+    """
+    Load the areas to tile from a binary store if given, from the city files otherwise.
+
+    Args:
+        paths (Optional[List[str]]): City files; defaults to iller/*.json
+        store_path (Optional[str]): Binary store written by area_store.py
+
+    Returns:
+        TilePoints: The sorted areas
+    """
+    if store_path:
+        return TilePoints.from_store(store_path)
+    if paths is None:
+        paths = sorted(glob.glob(os.path.join("iller", "*.json")))
+    return TilePoints.from_areas(iter_city_areas(paths))
+
+
+def main() -> None:
+    """Build map tiles from the command line."""
+    parser = argparse.ArgumentParser(description="Toplanma alanları için önceden hesaplanmış harita karoları")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build = subparsers.add_parser("build", help="Karoları oluştur, değişmeyenleri atla")
+    build.add_argument("--output-dir", default="tiles", help="Karoların ve manifest.json'un yazılacağı klasör")
+    build.add_argument("--format", dest="output_format", choices=list(EXTENSIONS), default="geojson",
+                       help="Karo biçimi")
+    build.add_argument("--min-zoom", type=int, default=5, help="İlk yakınlaştırma seviyesi")
+    build.add_argument("--max-zoom", type=int, default=14, help="Son yakınlaştırma seviyesi")
+    build.add_argument("--cluster-max-zoom", type=int, default=11,
+                       help="Alanların kümelenerek gösterildiği son yakınlaştırma seviyesi")
+    build.add_argument("--cluster-depth", type=int, default=3,
+                       help="Kümelerin karonun kaç seviye altındaki dörtlü ağaç düğümleri olduğu (karo başına en çok 4^n küme)")
+    build.add_argument("--store", help="JSON yerine okunacak area_store.py deposu")
+    build.add_argument("files", nargs="*", help="Şehir dosyaları (varsayılan: iller/*.json)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    points = load_points(args.files or None, args.store)
+    stats = build_tiles(points, args.output_dir, args.min_zoom, args.max_zoom, args.cluster_max_zoom,
+                        args.cluster_depth, args.output_format)
+    print(f"{len(points)} alan, {stats['toplam']} karo: {stats['yazilan']} yazıldı ({stats['bayt'] / 1024:.0f} KB), "
+          f"{stats['degismeyen']} değişmedi, {stats['silinen']} silindi - {time.perf_counter() - started:.1f} sn")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,653 @@
+"""
+Sharded Collection Work Queue
+
+This module splits a crawl into city or district tasks kept in a shared
+work queue, so any number of worker processes, on one host or several,
+can collect the country in parallel without doing the same work twice.
+
+A worker claims a task by taking a lease on it, renews the lease with a
+heartbeat while collecting and writes the task's neighborhoods to a shard
+file. A lease that is not renewed expires and the task goes back to the
+queue for another worker; a shard is only accepted from the worker that
+still holds the lease. Once every task of a city is done, `merge` joins the
+city's shards, in API district order, into the usual `iller/*.json` file.
+
+    python work_queue.py seed --granularity district
+    python work_queue.py work --processes 4          # on every host
+    python work_queue.py status
+    python work_queue.py merge --format normalized
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import unidecode
+
+from city_stream import CityStreamReader, CityStreamWriter
+from collect import GatheringAreaCollector
+from point_cache import PointCache
+
+GRANULARITIES = ('city', 'district')
+
+
+class WorkQueue:
+    """
+    Interface of the lease-based task queue workers and the merge step use.
+
+    A task is a dict with `task_id`, `city_code`, `city_name`, `district_id`
+    and `district_name` (both None for a whole-city task), `state` (pending,
+    leased, done or failed), `owner`, `attempts`, `shard` and `errors`.
+    SQLiteWorkQueue keeps the tasks in one SQLite file; a queue on a server
+    every host can reach can take its place without changing the workers.
+    """
+
+    def add_tasks(self, tasks: List[Dict[str, Any]]) -> int:
+        """
+        Add tasks that are not in the queue yet.
+
+        Args:
+            tasks (List[Dict[str, Any]]): Tasks with task_id, city and district fields and their positions
+
+        Returns:
+            int: Number of tasks added
+        """
+        raise NotImplementedError
+
+    def claim(self, owner: str) -> Optional[Dict[str, Any]]:
+        """
+        Lease the next pending task, requeueing expired leases first.
+
+        Args:
+            owner (str): Worker ID
+
+        Returns:
+            Optional[Dict[str, Any]]: The leased task, or None if nothing is pending
+        """
+        raise NotImplementedError
+
+    def heartbeat(self, task_id: str, owner: str) -> bool:
+        """
+        Extend a lease.
+
+        Args:
+            task_id (str): Task ID
+            owner (str): Worker ID
+
+        Returns:
+            bool: False if the worker no longer holds the lease
+        """
+        raise NotImplementedError
+
+    def complete(self, task_id: str, owner: str, shard: str, errors: int = 0) -> bool:
+        """
+        Mark a leased task done.
+
+        Args:
+            task_id (str): Task ID
+            owner (str): Worker ID
+            shard (str): Shard file name, relative to the shard directory
+            errors (int): Neighborhoods that failed and are missing from the shard
+
+        Returns:
+            bool: False if the lease was lost and the shard must be discarded
+        """
+        raise NotImplementedError
+
+    def fail(self, task_id: str, owner: str, message: str) -> bool:
+        """
+        Give a leased task back after an error; it fails for good after too many attempts.
+
+        Args:
+            task_id (str): Task ID
+            owner (str): Worker ID
+            message (str): Error description
+
+        Returns:
+            bool: False if the worker no longer held the lease
+        """
+        raise NotImplementedError
+
+    def release(self, task_id: str, owner: str) -> bool:
+        """
+        Give a leased task back without counting the attempt, e.g. on shutdown.
+
+        Args:
+            task_id (str): Task ID
+            owner (str): Worker ID
+
+        Returns:
+            bool: False if the worker no longer held the lease
+        """
+        raise NotImplementedError
+
+    def requeue_failed(self) -> int:
+        """
+        Put failed tasks back into the queue with a fresh attempt budget.
+
+        Returns:
+            int: Number of requeued tasks
+        """
+        raise NotImplementedError
+
+    def tasks(self) -> List[Dict[str, Any]]:
+        """All tasks in city and district order."""
+        raise NotImplementedError
+
+    def counts(self) -> Dict[str, int]:
+        """Number of tasks per state."""
+        counts = {'pending': 0, 'leased': 0, 'done': 0, 'failed': 0}
+        for task in self.tasks():
+            counts[task['state']] += 1
+        return counts
+
+    def close(self) -> None:
+        """Release resources held by the queue."""
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """
+    A work queue in a SQLite file shared by all workers.
+
+    Every state change is a single transaction, claims take the write lock
+    up front, so two workers never lease the same task. Lease expiry uses
+    wall-clock time; the lease must be much longer than the clock skew
+    between hosts. SQLite locking is only reliable on a local disk or a
+    network file system with working locks.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tasks (
+            task_id TEXT PRIMARY KEY,
+            city_code INTEGER NOT NULL,
+            city_name TEXT NOT NULL,
+            city_position INTEGER NOT NULL,
+            district_id INTEGER,
+            district_name TEXT,
+            district_position INTEGER,
+            state TEXT NOT NULL DEFAULT 'pending',
+            owner TEXT,
+            lease_expires REAL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            shard TEXT,
+            errors INTEGER,
+            message TEXT,
+            updated REAL
+        );
+        CREATE INDEX IF NOT EXISTS tasks_state ON tasks (state, city_position, district_position);
+    """
+
+    COLUMNS = ('task_id', 'city_code', 'city_name', 'district_id', 'district_name',
+               'state', 'owner', 'lease_expires', 'attempts', 'shard', 'errors', 'message')
+
+    def __init__(self, path: str = "queue/work.sqlite3", lease_seconds: float = 120.0, max_attempts: int = 3):
+        """
+        Open (or create) the queue.
+
+        Args:
+            path (str): SQLite file path
+            lease_seconds (float): How long a lease lasts without a heartbeat
+            max_attempts (int): Leases a task gets before it is marked failed
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.expired = 0
+
+        self._lock = threading.Lock()
+        # Autocommit mode; transactions that need the write lock are opened explicitly
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=60, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self.SCHEMA)
+
+    def _write(self, sql: str, params: Tuple[Any, ...]) -> int:
+        """Run one statement in a transaction and return the number of changed rows."""
+        with self._lock:
+            return self._conn.execute(sql, params).rowcount
+
+    def add_tasks(self, tasks: List[Dict[str, Any]]) -> int:
+        rows = [
+            (task['task_id'], task['city_code'], task['city_name'], task['city_position'],
+             task.get('district_id'), task.get('district_name'), task.get('district_position'), time.time())
+            for task in tasks
+        ]
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO tasks (task_id, city_code, city_name, city_position, "
+                    "district_id, district_name, district_position, updated) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            return self._conn.total_changes - before
+
+    def claim(self, owner: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                expired = self._conn.execute(
+                    "UPDATE tasks SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                    "owner = NULL, message = 'kira süresi doldu', updated = ? "
+                    "WHERE state = 'leased' AND lease_expires < ?",
+                    (self.max_attempts, now, now)
+                ).rowcount
+                row = self._conn.execute(
+                    "SELECT task_id FROM tasks WHERE state = 'pending' "
+                    "ORDER BY city_position, district_position LIMIT 1"
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE tasks SET state = 'leased', owner = ?, lease_expires = ?, "
+                        "attempts = attempts + 1, updated = ? WHERE task_id = ?",
+                        (owner, now + self.lease_seconds, now, row[0])
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self.expired += expired
+
+        if expired:
+            logging.warning(f"Süresi dolan {expired} kira kuyruğa geri alındı")
+        return None if row is None else self._task(row[0])
+
+    def heartbeat(self, task_id: str, owner: str) -> bool:
+        return self._write(
+            "UPDATE tasks SET lease_expires = ?, updated = ? WHERE task_id = ? AND owner = ? AND state = 'leased'",
+            (time.time() + self.lease_seconds, time.time(), task_id, owner)
+        ) == 1
+
+    def complete(self, task_id: str, owner: str, shard: str, errors: int = 0) -> bool:
+        return self._write(
+            "UPDATE tasks SET state = 'done', shard = ?, errors = ?, message = NULL, updated = ? "
+            "WHERE task_id = ? AND owner = ? AND state = 'leased'",
+            (shard, errors, time.time(), task_id, owner)
+        ) == 1
+
+    def fail(self, task_id: str, owner: str, message: str) -> bool:
+        return self._write(
+            "UPDATE tasks SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "owner = NULL, message = ?, updated = ? WHERE task_id = ? AND owner = ? AND state = 'leased'",
+            (self.max_attempts, message, time.time(), task_id, owner)
+        ) == 1
+
+    def release(self, task_id: str, owner: str) -> bool:
+        return self._write(
+            "UPDATE tasks SET state = 'pending', owner = NULL, attempts = attempts - 1, updated = ? "
+            "WHERE task_id = ? AND owner = ? AND state = 'leased'",
+            (time.time(), task_id, owner)
+        ) == 1
+
+    def requeue_failed(self) -> int:
+        return self._write(
+            "UPDATE tasks SET state = 'pending', attempts = 0, updated = ? WHERE state = 'failed'",
+            (time.time(),)
+        )
+
+    def _task(self, task_id: str) -> Dict[str, Any]:
+        """Read one task."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM tasks WHERE task_id = ?", (task_id,)
+            ).fetchone()
+        return dict(zip(self.COLUMNS, row))
+
+    def tasks(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM tasks ORDER BY city_position, district_position"
+            ).fetchall()
+        return [dict(zip(self.COLUMNS, row)) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        counts = {'pending': 0, 'leased': 0, 'done': 0, 'failed': 0}
+        with self._lock:
+            for state, count in self._conn.execute("SELECT state, COUNT(*) FROM tasks GROUP BY state"):
+                counts[state] = count
+        return counts
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def seed_queue(queue: WorkQueue,
+               collector: GatheringAreaCollector,
+               cities: List[Tuple[int, str]],
+               granularity: str = 'city') -> int:
+    """
+    Fill the queue with one task per city or per district.
+
+    Args:
+        queue (WorkQueue): Queue to fill; tasks already in it are kept as they are
+        collector (GatheringAreaCollector): Collector used to list the districts of each city
+        cities (List[Tuple[int, str]]): Cities in format [(code, name), ...]
+        granularity (str): "city" or "district"
+
+    Returns:
+        int: Number of tasks added
+    """
+    added = 0
+    for city_position, (city_code, city_name) in enumerate(cities):
+        city = {'city_code': city_code, 'city_name': city_name, 'city_position': city_position}
+        if granularity == 'city':
+            tasks = [{**city, 'task_id': str(city_code)}]
+        else:
+            districts = collector.fetch_data_with_retry(f"ilKodu={city_code}&islem=ilceKodu")['data']['dataArr']
+            tasks = [
+                {**city, 'task_id': f"{city_code}/{district['id']}", 'district_id': district['id'],
+                 'district_name': district['name'], 'district_position': district_position}
+                for district_position, district in enumerate(districts)
+            ]
+        added += queue.add_tasks(tasks)
+        logging.info(f"{city_name} için {len(tasks)} görev kuyrukta")
+    return added
+
+
+class QueueWorker:
+    """
+    Claim tasks from a work queue and collect them until the queue is drained.
+
+    While a task runs, a background thread renews its lease every third of
+    the lease time. The worker keeps polling while other workers hold
+    leases, since an expired lease puts its task back into the queue.
+    """
+
+    def __init__(self,
+                 queue: WorkQueue,
+                 collector: GatheringAreaCollector,
+                 shard_dir: str = "shards",
+                 worker_id: Optional[str] = None,
+                 poll_interval: float = 5.0):
+        """
+        Initialize the worker.
+
+        Args:
+            queue (WorkQueue): Queue tasks are claimed from
+            collector (GatheringAreaCollector): Collector that fetches the districts of a task
+            shard_dir (str): Directory shard files are written to
+            worker_id (Optional[str]): Lease owner name, host name and process ID by default
+            poll_interval (float): Seconds to wait for other workers' leases before polling again
+        """
+        os.makedirs(shard_dir, exist_ok=True)
+        self.queue = queue
+        self.collector = collector
+        self.shard_dir = shard_dir
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.poll_interval = poll_interval
+        self.finished = 0
+        self.lost = 0
+
+    def run(self) -> int:
+        """
+        Work until no task is pending or leased.
+
+        Returns:
+            int: Number of tasks this worker finished
+        """
+        while True:
+            task = self.queue.claim(self.worker_id)
+            if task is not None:
+                self.process(task)
+                continue
+            counts = self.queue.counts()
+            if counts['leased'] == 0:
+                break
+            time.sleep(self.poll_interval)
+        logging.info(f"{self.worker_id} bitti - tamamlanan görev: {self.finished}, kaybedilen kira: {self.lost}")
+        return self.finished
+
+    def process(self, task: Dict[str, Any]) -> None:
+        """
+        Collect one leased task into its shard and report the outcome to the queue.
+
+        Args:
+            task (Dict[str, Any]): The leased task
+        """
+        city_code, city_name = task['city_code'], task['city_name']
+        # Named after the worker so a worker whose lease expired never overwrites its successor's shard
+        shard = f"{city_code}-{task['district_id'] or 'il'}-{self.worker_id}.json"
+        path = os.path.join(self.shard_dir, shard)
+        logging.info(f"{self.worker_id} görevi aldı: {task['task_id']} ({city_name} {task['district_name'] or ''})")
+
+        stop = threading.Event()
+        keeper = threading.Thread(target=self._keep_lease, args=(task['task_id'], stop), daemon=True)
+        keeper.start()
+        errors_before = self._error_count(city_name)
+        try:
+            with CityStreamWriter(path, city_name, city_code) as writer:
+                if task['district_id'] is None:
+                    district_data = self.collector.fetch_data_with_retry(f"ilKodu={city_code}&islem=ilceKodu")
+                    districts = district_data['data']['dataArr']
+                else:
+                    districts = [{'id': task['district_id'], 'name': task['district_name']}]
+                for district in districts:
+                    self.collector.collect_district(city_code, city_name, district, writer)
+        except KeyboardInterrupt:
+            self.queue.release(task['task_id'], self.worker_id)
+            raise
+        except Exception as e:
+            logging.error(f"{task['task_id']} görevi başarısız: {e}")
+            self.queue.fail(task['task_id'], self.worker_id, str(e))
+            return
+        finally:
+            stop.set()
+            keeper.join()
+
+        errors = self._error_count(city_name) - errors_before
+        if errors and task['attempts'] < self.queue.max_attempts:
+            # Another attempt may get the missing neighborhoods; the point cache keeps it cheap
+            os.remove(path)
+            self.queue.fail(task['task_id'], self.worker_id, f"{errors} mahalle alınamadı")
+            return
+        if not self.queue.complete(task['task_id'], self.worker_id, shard, errors):
+            logging.warning(f"{task['task_id']} görevinin kirası kaybedildi, çıktı atılıyor")
+            os.remove(path)
+            self.lost += 1
+            return
+        self.finished += 1
+
+    def _keep_lease(self, task_id: str, stop: threading.Event) -> None:
+        """Renew a lease until stop is set or the lease is lost."""
+        while not stop.wait(self.queue.lease_seconds / 3):
+            if not self.queue.heartbeat(task_id, self.worker_id):
+                logging.warning(f"{task_id} görevinin kirası başka bir işçiye geçti")
+                return
+
+    def _error_count(self, city_name: str) -> int:
+        """Neighborhoods of a city that failed so far in this process."""
+        counter = self.collector.metrics.get('collector_neighborhoods_total')
+        return int(sum(value for labels, value in counter.items()
+                       if labels.get('il') == city_name and labels.get('result') == 'error'))
+
+
+def copy_shard(path: str, writer: CityStreamWriter) -> None:
+    """
+    Append every district of a shard, empty ones included, to an open city writer.
+
+    Args:
+        path (str): Shard file path
+        writer (CityStreamWriter): Writer of the merged city file
+    """
+    reader = CityStreamReader(path)
+    written = set()
+
+    def begin_until(district_name: Optional[str]) -> None:
+        # District codes are parsed before their neighborhoods, so empty districts show up here too
+        for name, district_id in list(reader.district_ids.items()):
+            if name not in written:
+                writer.begin_district(name, district_id)
+                written.add(name)
+            if name == district_name:
+                return
+
+    current = None
+    for district_name, neighborhood_name, data in reader:
+        if district_name != current:
+            begin_until(district_name)
+            current = district_name
+        writer.write_neighborhood(neighborhood_name, data)
+    begin_until(None)
+
+
+def merge(queue: WorkQueue,
+          shard_dir: str = "shards",
+          output_dir: str = "iller",
+          output_format: str = "nested") -> Dict[str, List[str]]:
+    """
+    Join the shards of every finished city into its output file.
+
+    Args:
+        queue (WorkQueue): Queue the shards were collected from
+        shard_dir (str): Directory the workers wrote shards to
+        output_dir (str): Directory of the city files
+        output_format (str): "nested" or "normalized"
+
+    Returns:
+        Dict[str, List[str]]: Written files under "written", cities with unfinished tasks under "incomplete"
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    cities: Dict[int, List[Dict[str, Any]]] = {}
+    for task in queue.tasks():
+        cities.setdefault(task['city_code'], []).append(task)
+
+    result: Dict[str, List[str]] = {'written': [], 'incomplete': []}
+    for city_code, tasks in cities.items():
+        city_name = tasks[0]['city_name']
+        unfinished = [task['task_id'] for task in tasks if task['state'] != 'done']
+        if unfinished:
+            logging.warning(f"{city_name} atlandı, bitmemiş görevler: {', '.join(unfinished)}")
+            result['incomplete'].append(city_name)
+            continue
+
+        path = os.path.join(output_dir, f"{unidecode.unidecode(city_name)}.json")
+        try:
+            with CityStreamWriter(path, city_name, city_code, normalized=output_format == "normalized") as writer:
+                for task in tasks:
+                    copy_shard(os.path.join(shard_dir, task['shard']), writer)
+        except (OSError, ValueError) as e:
+            logging.error(f"{city_name} birleştirilemedi: {e}")
+            result['incomplete'].append(city_name)
+            continue
+        errors = sum(task['errors'] or 0 for task in tasks)
+        logging.info(f"{city_name} birleştirildi: {path}" + (f" ({errors} mahalle eksik)" if errors else ""))
+        result['written'].append(path)
+    return result
+
+
+def make_collector(args: argparse.Namespace) -> GatheringAreaCollector:
+    """A collector for seeding or working, built from the command line options."""
+    point_cache = None
+    if not getattr(args, 'no_cache', True):
+        point_cache = PointCache(args.cache)
+    return GatheringAreaCollector(
+        args.cities_file, max_workers=getattr(args, 'max_workers', 1), point_cache=point_cache,
+        base_url=args.base_url
+    )
+
+
+def run_worker(args: argparse.Namespace) -> None:
+    """Run one worker process until the queue is drained."""
+    collector = make_collector(args)
+    queue = SQLiteWorkQueue(args.queue, lease_seconds=args.lease_seconds, max_attempts=args.max_attempts)
+    try:
+        QueueWorker(queue, collector, args.shard_dir, poll_interval=args.poll_interval).run()
+        logging.info(f"Ölçüm özeti:\n{collector.metrics_summary()}")
+    except KeyboardInterrupt:
+        logging.warning("İşçi durduruldu, görev kuyruğa geri bırakıldı")
+    finally:
+        queue.close()
+        collector.scraper.transport.close()
+        if collector.scraper.point_cache is not None:
+            collector.scraper.point_cache.close()
+
+
+def main() -> None:
+    """Run the queue commands from the command line."""
+    parser = argparse.ArgumentParser(description="Taramayı paylaşılan bir iş kuyruğu üzerinden çok işçiyle yürütür")
+    parser.add_argument("--queue", default="queue/work.sqlite3", help="İş kuyruğunun SQLite dosyası")
+    parser.add_argument("--shard-dir", default="shards", help="İşçilerin görev çıktılarını yazdığı klasör")
+    parser.add_argument("--lease-seconds", type=float, default=120.0, help="Yenilenmeyen bir kiranın süresi (sn)")
+    parser.add_argument("--max-attempts", type=int, default=3, help="Bir görevin başarısız sayılmadan önceki deneme sayısı")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed = commands.add_parser("seed", help="Şehir dosyasındaki şehirleri kuyruğa ekle")
+    seed.add_argument("--cities-file", default="cities.json", help="İşlenecek şehirlerin bulunduğu JSON dosyası")
+    seed.add_argument("--granularity", choices=GRANULARITIES, default="district",
+                      help="Görev birimi: şehir ya da ilçe (ilçe listeleri tohumlama sırasında çekilir)")
+    seed.add_argument("--base-url", help="turkiye.gov.tr yerine kullanılacak sunucu")
+
+    work = commands.add_parser("work", help="Kuyruk boşalana kadar görev al ve topla")
+    work.add_argument("--processes", type=int, default=1, help="Bu makinede çalışacak işçi süreci sayısı")
+    work.add_argument("--max-workers", type=int, default=10, help="İşçi başına aynı anda yapılacak en fazla istek sayısı")
+    work.add_argument("--poll-interval", type=float, default=5.0,
+                      help="Başka işçilerin kiraları beklenirken yoklama aralığı (sn)")
+    work.add_argument("--cities-file", default="cities.json", help=argparse.SUPPRESS)
+    work.add_argument("--cache", default="cache/query_point.sqlite3", help="Nokta sorgusu önbelleğinin SQLite dosyası")
+    work.add_argument("--no-cache", action="store_true", help="Nokta sorgusu önbelleğini kullanma")
+    work.add_argument("--base-url", help="turkiye.gov.tr yerine kullanılacak sunucu")
+
+    commands.add_parser("status", help="Görev durumlarını göster")
+    commands.add_parser("requeue", help="Başarısız görevleri yeniden kuyruğa al")
+
+    merge_command = commands.add_parser("merge", help="Tamamlanan şehirlerin parçalarını iller/*.json olarak birleştir")
+    merge_command.add_argument("--output-dir", default="iller", help="Şehir dosyalarının yazılacağı klasör")
+    merge_command.add_argument("--format", dest="output_format", choices=["nested", "normalized"], default="nested",
+                               help="Çıktı biçimi")
+    args = parser.parse_args()
+
+    if args.command == "work":
+        if args.processes == 1:
+            run_worker(args)
+            return
+        processes = [multiprocessing.Process(target=run_worker, args=(args,)) for _ in range(args.processes)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        return
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    queue = SQLiteWorkQueue(args.queue, lease_seconds=args.lease_seconds, max_attempts=args.max_attempts)
+    try:
+        if args.command == "seed":
+            collector = make_collector(args)
+            added = seed_queue(queue, collector, collector.load_cities(), args.granularity)
+            logging.info(f"Kuyruğa {added} yeni görev eklendi")
+        elif args.command == "status":
+            counts = queue.counts()
+            print(f"bekleyen: {counts['pending']}, kirada: {counts['leased']}, "
+                  f"tamamlanan: {counts['done']}, başarısız: {counts['failed']}")
+            for task in queue.tasks():
+                if task['state'] == 'leased':
+                    remaining = task['lease_expires'] - time.time()
+                    print(f"  {task['task_id']}: {task['owner']} ({remaining:.0f} sn kaldı)")
+                elif task['state'] == 'failed' or task['errors']:
+                    print(f"  {task['task_id']}: {task['state']}, {task['message'] or str(task['errors']) + ' mahalle eksik'}")
+        elif args.command == "requeue":
+            logging.info(f"{queue.requeue_failed()} görev yeniden kuyruğa alındı")
+        elif args.command == "merge":
+            result = merge(queue, args.shard_dir, args.output_dir, args.output_format)
+            logging.info(f"{len(result['written'])} şehir yazıldı, {len(result['incomplete'])} şehir eksik")
+    finally:
+        queue.close()
+
+
+if __name__ == "__main__":
+    main()